@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from event_simulation import EventDrivenSimulation
+from instance_loader import load_instance
+from score_submission import VectorizedScoreSubmissionComputer
+import self_driving_cars_and_rides_v7 as v7
+
+
+class Car:
+    __slots__ = ("next_r", "next_c", "free_by_step", "assigned_rides")
+
+    def __init__(self):
+        self.next_r = 0
+        self.next_c = 0
+        self.free_by_step = 0
+        self.assigned_rides = []
+
+
+class BatchDispatcher:
+    """Hands rides to all the free cars of a decision epoch at once.
+
+    At every step where some cars are free, the value of every free car for
+    every remaining ride is computed as one NumPy matrix, in chunks of cars
+    so that a chunk never holds more than max_cells values. Only the best
+    `candidates` feasible rides of each car are kept, which makes the
+    car-by-ride matrix sparse, and the rides of each chunk are then shared
+    out with a maximum weight matching on the chunk-by-candidate matrix.
+    Cars are sorted by position before chunking so that cars competing for
+    the same rides are matched together.
+
+    A pair is worth the points the ride scores (length, plus B when the car
+    is there by earliest_start) minus idle_weight per step the car spends
+    driving empty or waiting. Values are shifted so that every feasible pair
+    is worth at least 1 and the matching leaves no car idle that could take
+    a ride. Cars without any feasible ride are done, and cars that lost all
+    their candidates to other cars are matched again with the rides left, so
+    that every free car leaves a decision epoch with a ride or done.
+    """
+
+    def __init__(self, rides, B, T, candidates=8, idle_weight=1.0, max_cells=1 << 21):
+        rides = np.asarray(rides, dtype=np.int64).reshape(-1, 6)
+        self.start_r, self.start_c, self.end_r, self.end_c, self.earliest_start, self.latest_finish = rides.T
+        self.length = np.abs(self.start_r - self.end_r) + np.abs(self.start_c - self.end_c)
+        self.latest_arrival = self.latest_finish - self.length - 1
+        self.remaining = np.arange(len(rides))
+        self.assigned = np.zeros(len(rides), dtype=bool)
+        self.B = B
+        self.T = T
+        self.candidates = candidates
+        self.idle_weight = idle_weight
+        self.max_cells = max_cells
+        # SciPy takes longer to import than the rest of the solver, so only a
+        # dispatcher that is actually built loads it.
+        from scipy.optimize import linear_sum_assignment
+        self.linear_sum_assignment = linear_sum_assignment
+
+    def run(self, cars):
+        return EventDrivenSimulation(cars, self.T).run(self.dispatch)
+
+    def dispatch(self, t, free_cars):
+        remaining = self.remaining
+        self.remaining = remaining[~self.assigned[remaining] & (self.latest_arrival[remaining] >= t)]
+        free_cars = sorted(free_cars, key=lambda car: (car.next_r, car.next_c))
+        chunk_cars = max(1, self.max_cells // max(1, len(self.remaining)))
+        for chunk_start in range(0, len(free_cars), chunk_cars):
+            self.__match(t, free_cars[chunk_start:chunk_start + chunk_cars])
+        return len(self.remaining) > 0
+
+    def __match(self, t, cars):
+        rides = self.remaining[~self.assigned[self.remaining]]
+        next_r = np.array([car.next_r for car in cars], dtype=np.int64)[:, None]
+        next_c = np.array([car.next_c for car in cars], dtype=np.int64)[:, None]
+
+        arrivals = t + np.abs(self.start_r[rides] - next_r) + np.abs(self.start_c[rides] - next_c)
+        starts = np.maximum(arrivals, self.earliest_start[rides])
+        length = self.length[rides]
+        values = length + np.where(arrivals <= self.earliest_start[rides], self.B, 0) - \
+            self.idle_weight * (starts - t)
+        feasible = (arrivals <= self.latest_arrival[rides]) & (starts + length <= self.T)
+        values = np.where(feasible, values, -np.inf)
+
+        # Cars that lose all their candidates are matched again with the rides
+        # left until each of them has a ride or nothing it can do: waiting
+        # only ever makes a car arrive later, so a car without any feasible
+        # ride now is done, and one that has some takes it at once instead of
+        # being dispatched again at the next step.
+        pending = np.arange(len(cars))
+        while len(pending) > 0:
+            pending_values = values[pending]
+            if pending_values.shape[1] > self.candidates:
+                best = np.argpartition(-pending_values, self.candidates - 1, axis=1)[:, :self.candidates]
+            else:
+                best = np.broadcast_to(np.arange(pending_values.shape[1]), pending_values.shape)
+            pair_cars = np.repeat(np.arange(len(pending)), best.shape[1])
+            pair_rides = best.ravel()
+            pair_values = pending_values[pair_cars, pair_rides]
+            kept = np.isfinite(pair_values)
+            pair_cars, pair_rides, pair_values = pair_cars[kept], pair_rides[kept], pair_values[kept]
+
+            losing = np.zeros(len(pending), dtype=bool)
+            losing[pair_cars] = True
+            for car_position in pending[~losing]:
+                cars[car_position].free_by_step = self.T
+            if len(pair_cars) == 0:
+                return
+
+            columns, pair_columns = np.unique(pair_rides, return_inverse=True)
+            weights = np.zeros((len(pending), len(columns)))
+            weights[pair_cars, pair_columns] = pair_values - pair_values.min() + 1
+            for pending_position, column in zip(*self.linear_sum_assignment(weights, maximize=True)):
+                if weights[pending_position, column] > 0:
+                    car_position, ride = pending[pending_position], columns[column]
+                    self.__assign(cars[car_position], rides[ride], int(starts[car_position, ride]))
+                    values[:, ride] = -np.inf
+                    losing[pending_position] = False
+            pending = pending[losing]
+
+    def __assign(self, car, ride_index, start_step):
+        car.assigned_rides.append(int(ride_index))
+        car.next_r = int(self.end_r[ride_index])
+        car.next_c = int(self.end_c[ride_index])
+        car.free_by_step = start_step + int(self.length[ride_index])
+        self.assigned[ride_index] = True
+
+
+def assign_rides_to_cars(filename, candidates=8, idle_weight=1.0, max_cells=1 << 21):
+    (R, C, F, N, B, T), rides = load_instance(filename)
+    cars = [Car() for _ in range(F)]
+    return BatchDispatcher(rides, B, T, candidates, idle_weight, max_cells).run(cars)
+
+
+write_output_assignements = v7.write_output_assignements
+
+
+def assignment_score(filename, cars):
+    ride_indexes = np.array([ride for car in cars for ride in car.assigned_rides], dtype=np.int64)
+    offsets = np.cumsum([0] + [len(car.assigned_rides) for car in cars])
+    return VectorizedScoreSubmissionComputer.from_instance(*load_instance(filename)).compute_arrays(
+        ride_indexes, offsets)
+
+
+def compare_with_greedy(filename, candidates=8, idle_weight=1.0, max_cells=1 << 21):
+    """Returns ((score, seconds) of v7, (score, seconds) of the batch dispatcher) on an instance."""
+    started_at = time.time()
+    greedy_cars = v7.assign_rides_to_cars(filename)
+    greedy_time = time.time() - started_at
+
+    started_at = time.time()
+    batch_cars = assign_rides_to_cars(filename, candidates, idle_weight, max_cells)
+    batch_time = time.time() - started_at
+
+    return ((assignment_score(filename, greedy_cars), greedy_time),
+            (assignment_score(filename, batch_cars), batch_time))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Compares the batch matching dispatcher with the v7 greedy.")
+    parser.add_argument("instances", nargs="*", default=["files/b_should_be_easy.in", "files/c_no_hurry.in",
+                                                         "files/d_metropolis.in", "files/e_high_bonus.in"])
+    parser.add_argument("--candidates", type=int, default=8, help="rides considered per free car")
+    parser.add_argument("--idle-weight", type=float, default=1.0, help="points lost per empty or waiting step")
+    parser.add_argument("--max-cells", type=int, default=1 << 21, help="largest car-by-ride chunk")
+    args = parser.parse_args(argv[1:])
+
+    print("%-30s %12s %10s %12s %10s %10s" % ("instance", "v7 score", "v7 (s)", "batch score", "batch (s)", "gain"))
+    for filename in args.instances:
+        (greedy_score, greedy_time), (batch_score, batch_time) = compare_with_greedy(
+            filename, args.candidates, args.idle_weight, args.max_cells)
+        print("%-30s %12d %10.2f %12d %10.2f %+10d" % (filename, greedy_score, greedy_time, batch_score, batch_time,
+                                                      batch_score - greedy_score))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
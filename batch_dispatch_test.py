@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from batch_dispatch import BatchDispatcher, Car, assign_rides_to_cars, compare_with_greedy, write_output_assignements
+from instance_generator import InstanceGenerator
+from score_submission import ScoreSubmissionComputer
+
+
+class TestBatchDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.instance = os.path.join(self.directory, "small.in")
+        InstanceGenerator(200, 200, 20, 600, 10, 3000, seed=4, spatial="metropolis").write(self.instance)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def reference_score(self, instance, cars):
+        output = os.path.join(self.directory, "output.out")
+        write_output_assignements(output, cars)
+        return ScoreSubmissionComputer().compute(open(instance).read(), open(output).read())
+
+    def test_example(self):
+        self.assertEqual(10, self.reference_score("files/a_example.in", assign_rides_to_cars("files/a_example.in")))
+
+    def test_rides_are_assigned_once_and_scored(self):
+        cars = assign_rides_to_cars(self.instance)
+        rides = [ride for car in cars for ride in car.assigned_rides]
+        self.assertEqual(len(rides), len(set(rides)))
+        (greedy_score, _), (batch_score, _) = compare_with_greedy(self.instance)
+        self.assertEqual(batch_score, self.reference_score(self.instance, cars))
+        self.assertGreater(batch_score, greedy_score)
+
+    def test_small_chunks(self):
+        cars = assign_rides_to_cars(self.instance, max_cells=50)
+        rides = [ride for car in cars for ride in car.assigned_rides]
+        self.assertEqual(len(rides), len(set(rides)))
+        self.assertGreater(self.reference_score(self.instance, cars), 0)
+
+    def test_cars_that_lose_their_candidates_are_not_woken_every_step(self):
+        # Ten cars at the origin all want the same two best rides: all of them
+        # get one at step 0, and the first one free again sees none left.
+        rides = [(0, 0, 0, 5 + i, 0, 1000) for i in range(10)]
+        dispatcher = BatchDispatcher(rides, 2, 1000, candidates=2)
+        calls = []
+        dispatch = dispatcher.dispatch
+
+        def counted_dispatch(t, free_cars):
+            calls.append((t, len(free_cars)))
+            return dispatch(t, free_cars)
+
+        dispatcher.dispatch = counted_dispatch
+        cars = dispatcher.run([Car() for _ in range(10)])
+        self.assertEqual([(0, 10), (5, 1)], calls)
+        self.assertEqual(list(range(10)), sorted(ride for car in cars for ride in car.assigned_rides))
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
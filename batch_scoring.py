@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from instance_loader import load_instance
+from score_submission import StreamingScoreSubmissionComputer, SubmissionReport
+from solution_format import is_binary_file, is_binary_path, read_solution
+
+LEADERBOARD_FIELDS = ("rank", "instance", "submission", "score", "valid", "violations", "cars", "rides",
+                      "score_time")
+
+# Scorers already built by this process, by instance path.
+scorers = {}
+
+
+def scorer_for(instance):
+    """Returns the scorer of an instance, parsing it (or loading its cache sidecar) once per process."""
+    if instance not in scorers:
+        scorers[instance] = StreamingScoreSubmissionComputer.from_instance(*load_instance(instance))
+    return scorers[instance]
+
+
+def find_submissions(paths):
+    """Returns the .out and binary solutions among paths, and in the directories among them, sorted."""
+    submissions = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, directories, names in os.walk(path):
+                # Skips the instance_loader cache, whose sidecars are .npy files too.
+                directories[:] = [name for name in directories if not name.startswith(".")]
+                submissions.extend(os.path.join(directory, name) for name in names
+                                   if name.endswith(".out") or is_binary_path(name))
+        else:
+            submissions.append(path)
+    return sorted(submissions)
+
+
+def instance_for(submission, instances):
+    """Returns the path of the instance of a submission, or None.
+
+    instances maps instance names to .in paths. A submission belongs to the
+    instance with the longest name its file name starts with, so that
+    b_should_be_easy.out and b_should_be_easy_176877.out both belong to
+    b_should_be_easy.
+    """
+    name = os.path.splitext(os.path.basename(submission))[0]
+    matches = [instance_name for instance_name in instances if name.startswith(instance_name)]
+    return instances[max(matches, key=len)] if matches else None
+
+
+def score_group(task):
+    """Scores the submissions of one instance and returns a result per submission."""
+    instance, submissions = task
+    scorer = scorer_for(instance)
+    results = []
+    for submission in submissions:
+        started_at = time.perf_counter()
+        if is_binary_file(submission):
+            try:
+                report = scorer.compute_arrays(*read_solution(submission))
+            except ValueError as error:
+                report = SubmissionReport()
+                report.violations.append((0, str(error)))
+        else:
+            with open(submission) as submission_file:
+                report = scorer.compute(submission_file)
+        results.append({
+            "instance": os.path.splitext(os.path.basename(instance))[0], "submission": submission,
+            "score": report.score, "valid": report.is_valid(), "violations": len(report.violations),
+            "cars": report.cars, "rides": report.rides, "score_time": time.perf_counter() - started_at})
+    return results
+
+
+def score_submissions(submissions, instances, processes=None, group_size=64):
+    """Scores many submissions in a process pool and returns the leaderboard.
+
+    Submissions are grouped by instance, in groups of at most group_size, so
+    that every worker parses each instance at most once whatever the number
+    of submissions. Results are ranked by score within their instance, and
+    submissions of no known instance are left out.
+    """
+    by_instance = {}
+    for submission in submissions:
+        instance = instance_for(submission, instances)
+        if instance is not None:
+            by_instance.setdefault(instance, []).append(submission)
+    tasks = [(instance, instance_submissions[start:start + group_size])
+             for instance, instance_submissions in sorted(by_instance.items())
+             for start in range(0, len(instance_submissions), group_size)]
+
+    processes = min(processes or os.cpu_count() or 1, len(tasks)) or 1
+    if processes > 1:
+        with multiprocessing.Pool(processes) as pool:
+            groups = pool.map(score_group, tasks)
+    else:
+        groups = list(map(score_group, tasks))
+
+    results = [result for group in groups for result in group]
+    results.sort(key=lambda result: (result["instance"], -result["score"], result["submission"]))
+    for position, result in enumerate(results):
+        first = position == 0 or results[position - 1]["instance"] != result["instance"]
+        result["rank"] = 1 if first else results[position - 1]["rank"] + 1
+    return results
+
+
+def write_leaderboard(filename, results):
+    """Writes results as JSON, or as CSV when filename ends with .csv."""
+    with open(filename, "w", newline="") as f:
+        if filename.endswith(".csv"):
+            writer = csv.DictWriter(f, LEADERBOARD_FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+        else:
+            json.dump(results, f, indent=2)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Scores many submissions and ranks them per instance.")
+    parser.add_argument("submissions", nargs="+", help=".out or .npy solutions, or directories holding them")
+    parser.add_argument("--instances-dir", default="files", help="where the .in files are")
+    parser.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--output", help="write the leaderboard to this .csv or .json file")
+    args = parser.parse_args(argv[1:])
+
+    instances = dict((os.path.splitext(name)[0], os.path.join(args.instances_dir, name))
+                     for name in os.listdir(args.instances_dir) if name.endswith(".in"))
+    started_at = time.time()
+    results = score_submissions(find_submissions(args.submissions), instances, args.processes)
+
+    print("%4s %-20s %12s %6s %9s  %s" % ("rank", "instance", "score", "valid", "time (s)", "submission"))
+    for result in results:
+        print("%4d %-20s %12d %6s %9.3f  %s" % (result["rank"], result["instance"], result["score"],
+                                                "yes" if result["valid"] else "no", result["score_time"],
+                                                result["submission"]))
+    print("\n %d submissions scored in %.2fs" % (len(results), time.time() - started_at))
+    if args.output:
+        write_leaderboard(args.output, results)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import batch_scoring
+from batch_scoring import find_submissions, instance_for, score_submissions, write_leaderboard
+
+INSTANCES = dict((os.path.splitext(name)[0], os.path.join("files", name))
+                 for name in os.listdir("files") if name.endswith(".in"))
+
+
+class TestBatchScoring(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_instance_for(self):
+        self.assertEqual("files/b_should_be_easy.in", instance_for("out/v7/b_should_be_easy.out", INSTANCES))
+        self.assertEqual("files/b_should_be_easy.in", instance_for("b_should_be_easy_176877.out", INSTANCES))
+        self.assertIsNone(instance_for("z_unknown.out", INSTANCES))
+
+    def test_ranks_the_golden_submissions(self):
+        golden = find_submissions(["score_submission_test_files"])
+        worse = os.path.join(self.directory, "b_should_be_easy_worse.out")
+        with open(golden[1]) as f:
+            lines = f.read().splitlines()
+        with open(worse, "w") as f:
+            f.write("\n".join(["0"] + lines[1:]) + "\n")
+        broken = os.path.join(self.directory, "b_should_be_easy_broken.out")
+        with open(broken, "w") as f:
+            f.write("2 0\n")
+
+        batch_scoring.scorers.clear()
+        results = score_submissions(golden + [worse, broken], INSTANCES, processes=1, group_size=2)
+        self.assertEqual(len(INSTANCES), len(batch_scoring.scorers))
+        for result in results:
+            if result["submission"] in golden:
+                expected = int(os.path.splitext(result["submission"])[0].rsplit("_", 1)[1])
+                self.assertEqual((expected, 1, True), (result["score"], result["rank"], result["valid"]))
+        b_results = [result for result in results if result["instance"] == "b_should_be_easy"]
+        self.assertEqual([golden[1], worse, broken], [result["submission"] for result in b_results])
+        self.assertEqual([1, 2, 3], [result["rank"] for result in b_results])
+        self.assertEqual((0, False), (b_results[2]["score"], b_results[2]["valid"]))
+
+        pooled = score_submissions(golden + [worse, broken], INSTANCES, processes=2, group_size=2)
+        strip = lambda rows: [dict((key, value) for key, value in row.items() if key != "score_time") for row in rows]
+        self.assertEqual(strip(results), strip(pooled))
+
+        leaderboard = os.path.join(self.directory, "leaderboard.csv")
+        write_leaderboard(leaderboard, results)
+        with open(leaderboard) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([str(result["score"]) for result in results], [row["score"] for row in rows])
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+import argparse
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+
+from instance_loader import load_instance
+import self_driving_cars_and_rides_v7 as v7
+
+# Problem arrays of the worker processes, set once by init_worker.
+problem = None
+# Car arrays of the states of the beam, shared with the worker processes:
+# beams[buffer, row] holds the next_r, next_c and free_by_step of a state.
+beams = None
+
+
+class BeamProblem:
+    """Rides of an instance in v7 order (by earliest start), as NumPy columns."""
+
+    def __init__(self, header, rides, branch, depth):
+        self.R, self.C, self.F, self.N, self.B, self.T = header
+        order = np.argsort(rides[:, 4], kind="stable")
+        self.index = order
+        self.start_r, self.start_c, self.end_r, self.end_c, self.earliest_start, self.latest_finish = \
+            np.asarray(rides, dtype=np.int64)[order].T
+        self.length = np.abs(self.start_r - self.end_r) + np.abs(self.start_c - self.end_c)
+        self.branch = branch
+        self.depth = depth
+
+    def candidates(self, next_r, next_c, free_by_step, position):
+        """Returns the slots, points and new free steps of the best cars for a ride.
+
+        Cars that score the ride are ranked by points, then by the steps
+        they would spend driving empty or waiting; at most `branch` of them
+        are returned.
+        """
+        arrivals = free_by_step + np.abs(next_r - self.start_r[position]) + np.abs(next_c - self.start_c[position])
+        starts = np.maximum(arrivals, self.earliest_start[position])
+        free = starts + self.length[position]
+        scored = np.flatnonzero((arrivals + self.length[position] < self.latest_finish[position]) & (free <= self.T))
+        points = self.length[position] + np.where(arrivals[scored] <= self.earliest_start[position], self.B, 0)
+        ranked = np.lexsort((starts[scored] - free_by_step[scored], -points))[:self.branch]
+        return scored[ranked], points[ranked], free[scored[ranked]]
+
+    def rollout(self, next_r, next_c, free_by_step, position):
+        """Returns the points the best-car greedy scores on the next depth rides.
+
+        The cars the greedy moves are put back where they were, so the
+        arrays are left as they came.
+        """
+        moved = []
+        total = 0
+        for position in range(position, min(position + self.depth, self.N)):
+            slots, points, free = self.candidates(next_r, next_c, free_by_step, position)
+            if len(slots) == 0:
+                continue
+            slot = slots[0]
+            moved.append((slot, next_r[slot], next_c[slot], free_by_step[slot]))
+            next_r[slot], next_c[slot], free_by_step[slot] = self.end_r[position], self.end_c[position], free[0]
+            total = total + int(points[0])
+        for slot, slot_r, slot_c, slot_free in reversed(moved):
+            next_r[slot], next_c[slot], free_by_step[slot] = slot_r, slot_c, slot_free
+        return total
+
+
+class FleetState:
+    """A partial solution of the beam.
+
+    The car arrays of the state are row `row` of the current beam buffer,
+    and the assignments are a linked list of (slot, ride position,
+    previous) tuples shared by all the descendants.
+    """
+
+    __slots__ = ("row", "score", "free_sum", "assignments")
+
+    def __init__(self, row, score=0, free_sum=0, assignments=None):
+        self.row = row
+        self.score = score
+        self.free_sum = free_sum
+        self.assignments = assignments
+
+    def with_ride(self, row, slot, position, points, free_sum):
+        return FleetState(row, self.score + points, free_sum, (slot, position, self.assignments))
+
+    def rides_by_slot(self, F):
+        rides = [[] for _ in range(F)]
+        assignments = self.assignments
+        while assignments is not None:
+            slot, position, assignments = assignments
+            rides[slot].append(position)
+        for slot_rides in rides:
+            slot_rides.reverse()
+        return rides
+
+
+def init_worker(beam_problem, shared_beams, width):
+    global problem, beams
+    problem = beam_problem
+    beams = np.frombuffer(shared_beams, dtype=np.int64).reshape(2, width, 3, beam_problem.F)
+
+
+def expand(task):
+    """Returns the children of a state as (slot, points, free, lookahead) tuples.
+
+    task is the buffer and row of the state in beams, and the position of
+    the ride. Slot -1 is the child that leaves the ride unassigned.
+    lookahead is what the greedy scores on the depth rides after this one
+    from the child; children only move their car in a copy of the state
+    arrays, and put it back once their lookahead is known.
+    """
+    buffer, row, position = task
+    next_r, next_c, free_by_step = beams[buffer, row].copy()
+    children = [(-1, 0, 0, problem.rollout(next_r, next_c, free_by_step, position + 1))]
+    slots, points, free = problem.candidates(next_r, next_c, free_by_step, position)
+    for slot, slot_points, slot_free in zip(slots.tolist(), points.tolist(), free.tolist()):
+        moved = next_r[slot], next_c[slot], free_by_step[slot]
+        next_r[slot], next_c[slot], free_by_step[slot] = problem.end_r[position], problem.end_c[position], slot_free
+        lookahead = problem.rollout(next_r, next_c, free_by_step, position + 1)
+        next_r[slot], next_c[slot], free_by_step[slot] = moved
+        children.append((slot, slot_points, slot_free, lookahead))
+    return children
+
+
+def beam_search(header, rides, width=4, branch=3, depth=4, processes=1):
+    """Builds a solution ride by ride, keeping the width best partial fleet states.
+
+    Each state branches on the branch best cars for the next ride, plus
+    leaving it unassigned. Children are ranked by their score plus what the
+    greedy would score on the next depth rides, then by the total steps at
+    which their cars are free. With more than one process the states of the
+    beam are expanded in parallel.
+
+    Returns the ride indexes of every car.
+    """
+    beam_problem = BeamProblem(header, rides, branch, depth)
+    F = beam_problem.F
+    # Two buffers of width states: the beam of a position is read from one
+    # while the beam of the next one is written to the other.
+    shared_beams = multiprocessing.RawArray("q", 2 * width * 3 * F)
+    init_worker(beam_problem, shared_beams, width)
+    buffer = 0
+    beam = [FleetState(0)]
+
+    pool = multiprocessing.Pool(processes, init_worker, (beam_problem, shared_beams, width)) \
+        if processes > 1 else None
+    try:
+        for position in range(beam_problem.N):
+            tasks = [(buffer, state.row, position) for state in beam]
+            expansions = pool.map(expand, tasks) if pool is not None else list(map(expand, tasks))
+
+            children = []
+            for state, state_children in zip(beam, expansions):
+                for slot, points, free, lookahead in state_children:
+                    child_free_sum = state.free_sum if slot < 0 else \
+                        state.free_sum - int(beams[buffer, state.row, 2, slot]) + free
+                    children.append((state.score + points + lookahead, -child_free_sum, state, slot, points, free))
+            children.sort(key=lambda child: child[:2], reverse=True)
+            children = children[:width]
+
+            # Kept children copy the arrays of their parent in one gather and
+            # then move their car.
+            next_buffer = 1 - buffer
+            beams[next_buffer, :len(children)] = beams[buffer, [child[2].row for child in children]]
+            beam = []
+            for row, (_, negative_free_sum, state, slot, points, free) in enumerate(children):
+                if slot < 0:
+                    beam.append(FleetState(row, state.score, state.free_sum, state.assignments))
+                else:
+                    beams[next_buffer, row, :, slot] = beam_problem.end_r[position], beam_problem.end_c[position], free
+                    beam.append(state.with_ride(row, slot, position, points, -negative_free_sum))
+            buffer = next_buffer
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    best = max(beam, key=lambda state: state.score)
+    return [[int(beam_problem.index[position]) for position in slot_rides] for slot_rides in best.rides_by_slot(F)]
+
+
+def assign_rides_to_cars(filename, width=4, branch=3, depth=4, processes=1):
+    header, rides = load_instance(filename)
+    cars = v7.build_cars(header[2])
+    for car, car_rides in zip(cars, beam_search(header, rides, width, branch, depth, processes)):
+        car.assigned_rides = car_rides
+    return cars
+
+
+write_output_assignements = v7.write_output_assignements
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Solves instances with a beam search over the v7 ride order.")
+    parser.add_argument("instances", nargs="*", default=["files/e_high_bonus.in"])
+    parser.add_argument("--width", type=int, default=4, help="partial fleet states kept")
+    parser.add_argument("--branch", type=int, default=3, help="cars tried per ride")
+    parser.add_argument("--depth", type=int, default=4, help="rides of greedy lookahead")
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count(),
+                        help="processes expanding the beam (default: one per CPU)")
+    parser.add_argument("--output-dir", default="files", help="where to write the .out files")
+    args = parser.parse_args(argv[1:])
+
+    from runner import instance_name
+    from score_submission import VectorizedScoreSubmissionComputer
+
+    for filename in args.instances:
+        started_at = time.time()
+        cars = assign_rides_to_cars(filename, args.width, args.branch, args.depth, args.processes)
+        output = "%s/%s.out" % (args.output_dir, instance_name(filename))
+        write_output_assignements(output, cars)
+        score = VectorizedScoreSubmissionComputer.from_instance(*load_instance(filename)).compute(open(output).read())
+        print("%s %d %.2fs" % (output, score, time.time() - started_at))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from beam_search import BeamProblem, assign_rides_to_cars, beam_search, expand, init_worker, write_output_assignements
+from instance_generator import InstanceGenerator
+from instance_loader import load_instance
+from score_submission import ScoreSubmissionComputer
+
+
+class TestBeamSearch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.instance = os.path.join(self.directory, "small.in")
+        InstanceGenerator(100, 100, 5, 150, 20, 2000, seed=2).write(self.instance)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def reference_score(self, instance, cars):
+        output = os.path.join(self.directory, "output.out")
+        write_output_assignements(output, cars)
+        return ScoreSubmissionComputer().compute(open(instance).read(), open(output).read())
+
+    def test_example(self):
+        self.assertEqual(10, self.reference_score("files/a_example.in", assign_rides_to_cars("files/a_example.in")))
+
+    def test_rides_are_assigned_once(self):
+        for car_rides in (beam_search(*load_instance(self.instance), width=1, branch=1, depth=0),
+                          beam_search(*load_instance(self.instance), width=6, branch=3, depth=3)):
+            rides = [ride for slot_rides in car_rides for ride in slot_rides]
+            self.assertEqual(len(rides), len(set(rides)))
+            self.assertGreater(len(rides), 0)
+
+    def test_parallel_expansion_gives_the_same_solution(self):
+        serial = beam_search(*load_instance(self.instance), width=4, branch=2, depth=2, processes=1)
+        parallel = beam_search(*load_instance(self.instance), width=4, branch=2, depth=2, processes=2)
+        self.assertEqual(serial, parallel)
+
+    def test_expansion_leaves_the_shared_state_as_it_was(self):
+        header, rides = load_instance(self.instance)
+        problem = BeamProblem(header, rides, 3, 4)
+        shared_beams = multiprocessing.RawArray("q", 2 * 1 * 3 * problem.F)
+        init_worker(problem, shared_beams, 1)
+        state = np.frombuffer(shared_beams, dtype=np.int64).reshape(2, 1, 3, problem.F)[0, 0]
+        state[0] = np.arange(problem.F) * 7
+        state[1] = np.arange(problem.F) * 3
+        state[2] = np.arange(problem.F) * 11
+        before = state.copy()
+
+        children = expand((0, 0, 10))
+        self.assertEqual(before.tolist(), state.tolist())
+        self.assertEqual(-1, children[0][0])
+        self.assertEqual(problem.rollout(*(before.copy()), position=11), children[0][3])
+        for slot, points, free, lookahead in children[1:]:
+            child = before.copy()
+            child[:, slot] = problem.end_r[10], problem.end_c[10], free
+            self.assertEqual(problem.rollout(*child, position=11), lookahead)
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from carsandrides import STRATEGIES, load_strategy
+from instance_generator import SPATIAL_DISTRIBUTIONS, InstanceGenerator
+from runner import default_instances, instance_name
+
+SCORERS = ("reference", "vectorized")
+GOLDEN_SUBMISSIONS = "score_submission_test_files"
+SYNTHETIC_DIRECTORY = "bench_instances"
+DEFAULT_SYNTHETIC_SIZES = "10000:100,100000:1000,1000000:10000"
+
+
+def peak_rss_mb():
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0)
+
+
+def benchmark_solver(strategy, instance_path, output_directory):
+    """Times a strategy on an instance.
+
+    parse_time is a cold parse of the instance text, for reference;
+    solve_time is assign_rides_to_cars end to end, with whatever parsing
+    or cache loading the strategy does on its own.
+    """
+    from instance_loader import load_instance
+    from score_submission import VectorizedScoreSubmissionComputer
+
+    module = load_strategy(strategy)
+    started_at = time.time()
+    load_instance(instance_path, use_cache=False)
+    parse_time = time.time() - started_at
+
+    started_at = time.time()
+    cars = module.assign_rides_to_cars(instance_path)
+    solve_time = time.time() - started_at
+
+    output_path = os.path.join(output_directory, strategy + "_" + instance_name(instance_path) + ".out")
+    module.write_output_assignements(output_path, cars)
+    started_at = time.time()
+    score = VectorizedScoreSubmissionComputer.from_instance(*load_instance(instance_path)).compute(
+        open(output_path).read())
+    score_time = time.time() - started_at
+
+    return {"parse_time": parse_time, "solve_time": solve_time, "score_time": score_time, "score": score}
+
+
+def benchmark_scorer(scorer, instance_path, submission_path):
+    from score_submission import ScoreSubmissionComputer, VectorizedScoreSubmissionComputer
+
+    problem = open(instance_path).read()
+    submission = open(submission_path).read()
+    started_at = time.time()
+    if scorer == "reference":
+        score = ScoreSubmissionComputer().compute(problem, submission)
+    else:
+        score = VectorizedScoreSubmissionComputer(problem).compute(submission)
+    return {"score_time": time.time() - started_at, "score": score}
+
+
+def run_case(case, results):
+    try:
+        if case["kind"] == "solver":
+            result = benchmark_solver(case["name"], case["instance_path"], case["output_directory"])
+        else:
+            result = benchmark_scorer(case["name"], case["instance_path"], case["submission_path"])
+    except Exception as error:
+        result = {"error": type(error).__name__ + ": " + str(error)}
+    result["peak_rss_mb"] = peak_rss_mb()
+    results.put(result)
+
+
+def run_cases(cases, timeout):
+    """Runs every case alone in a fresh process, one after the other, so timings don't interfere."""
+    measurements = []
+    for case in cases:
+        results = multiprocessing.Queue()
+        process = multiprocessing.Process(target=run_case, args=(case, results))
+        process.start()
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+            result = {"error": "timeout after " + str(timeout) + "s"}
+        else:
+            result = results.get() if not results.empty() else {"error": "exit code " + str(process.exitcode)}
+
+        measurement = {"case": case["kind"] + ":" + case["name"] + ":" + instance_name(case["instance_path"]),
+                       "kind": case["kind"], "name": case["name"], "instance": instance_name(case["instance_path"])}
+        measurement.update(result)
+        measurements.append(measurement)
+        print(format_measurement(measurement))
+        sys.stdout.flush()
+    return measurements
+
+
+def synthetic_instances(sizes, spatial="uniform", directory=SYNTHETIC_DIRECTORY):
+    os.makedirs(directory, exist_ok=True)
+    instances = []
+    for size in sizes.split(","):
+        N, F = [int(val) for val in size.split(":")]
+        filename = os.path.join(directory, "synthetic_%s_n%d_f%d.in" % (spatial, N, F))
+        if not os.path.exists(filename):
+            InstanceGenerator(10000, 10000, F, N, 10, 1000000, spatial=spatial).write(filename)
+        instances.append(filename)
+    return instances
+
+
+def build_cases(strategies, scorers, instances, output_directory):
+    cases = []
+    for instance_path in instances:
+        for strategy in strategies:
+            cases.append({"kind": "solver", "name": strategy, "instance_path": instance_path,
+                          "output_directory": output_directory})
+        golden = [name for name in sorted(os.listdir(GOLDEN_SUBMISSIONS))
+                  if name.startswith(instance_name(instance_path) + "_")]
+        for scorer in scorers:
+            for submission in golden:
+                cases.append({"kind": "scorer", "name": scorer, "instance_path": instance_path,
+                              "submission_path": os.path.join(GOLDEN_SUBMISSIONS, submission)})
+    return cases
+
+
+def compare(measurements, baseline, tolerance, noise_floor):
+    """Returns the regressions of the measurements against a baseline report.
+
+    A timing regresses when it is more than tolerance slower than the
+    baseline and the difference is above noise_floor seconds; a score
+    regresses when it is lower.
+    """
+    baseline_by_case = dict((measurement["case"], measurement) for measurement in baseline["measurements"])
+    regressions = []
+    for measurement in measurements:
+        previous = baseline_by_case.get(measurement["case"])
+        if previous is None:
+            continue
+        if "error" in measurement and "error" not in previous:
+            regressions.append((measurement["case"], "error", previous.get("score"), measurement["error"]))
+            continue
+        for metric in ("parse_time", "solve_time", "score_time"):
+            if metric in measurement and metric in previous and \
+                    measurement[metric] > previous[metric] * (1 + tolerance) and \
+                    measurement[metric] - previous[metric] > noise_floor:
+                regressions.append((measurement["case"], metric, previous[metric], measurement[metric]))
+        if "score" in measurement and "score" in previous and measurement["score"] < previous["score"]:
+            regressions.append((measurement["case"], "score", previous["score"], measurement["score"]))
+    return regressions
+
+
+def format_measurement(measurement):
+    if "error" in measurement:
+        return "%-45s %s" % (measurement["case"], measurement["error"])
+    timings = " ".join("%s=%.3fs" % (metric, measurement[metric])
+                       for metric in ("parse_time", "solve_time", "score_time") if metric in measurement)
+    return "%-45s score=%-10d %s rss=%.1fMB" % (measurement["case"], measurement["score"], timings,
+                                                measurement["peak_rss_mb"])
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmarks the solvers and the scorers.")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES), help="comma separated strategies")
+    parser.add_argument("--scorers", default=",".join(SCORERS), help="comma separated scorers")
+    parser.add_argument("--instances", help="comma separated .in paths (default: files/*.in)")
+    parser.add_argument("--synthetic", nargs="?", const=DEFAULT_SYNTHETIC_SIZES,
+                        help="also run on synthetic instances of the given N:F sizes (default: %s)"
+                             % DEFAULT_SYNTHETIC_SIZES)
+    parser.add_argument("--spatial", choices=SPATIAL_DISTRIBUTIONS, default="uniform",
+                        help="where the synthetic rides start")
+    parser.add_argument("--timeout", type=float, default=600.0, help="seconds allowed per case")
+    parser.add_argument("--output", default="bench_output.json", help="JSON report to write")
+    parser.add_argument("--output-dir", help="keep the solutions of the solvers here (default: a temporary "
+                                             "directory removed at the end)")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--noise-floor", type=float, default=0.05, help="ignored slowdown in seconds")
+    args = parser.parse_args(argv[1:])
+
+    instances = args.instances.split(",") if args.instances else default_instances()
+    if args.synthetic:
+        instances = instances + synthetic_instances(args.synthetic, args.spatial)
+    output_directory = args.output_dir or tempfile.mkdtemp(prefix="bench_outputs_")
+    os.makedirs(output_directory, exist_ok=True)
+
+    cases = build_cases([name for name in args.strategies.split(",") if name],
+                        [name for name in args.scorers.split(",") if name], instances, output_directory)
+    try:
+        measurements = run_cases(cases, args.timeout)
+    finally:
+        if args.output_dir is None:
+            shutil.rmtree(output_directory)
+    report = {
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpu_count": os.cpu_count()},
+        "measurements": measurements,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.baseline:
+        regressions = compare(report["measurements"], json.load(open(args.baseline)),
+                              args.tolerance, args.noise_floor)
+        for case, metric, previous, current in regressions:
+            print("REGRESSION " + case + " " + metric + ": " + str(previous) + " -> " + str(current))
+        if regressions:
+            return 1
+        print("\n No regression against " + args.baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
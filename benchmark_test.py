@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import benchmark
+from benchmark import benchmark_solver, compare
+
+
+def measurement(case, **values):
+    return dict({"case": case}, **values)
+
+
+class TestBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_solver_times_are_end_to_end(self):
+        for strategy in ("v7", "batch"):
+            result = benchmark_solver(strategy, "files/b_should_be_easy.in", self.directory)
+            self.assertEqual(176877, result["score"])
+            self.assertGreater(result["solve_time"], 0.0)
+            self.assertGreater(result["parse_time"], 0.0)
+            self.assertTrue(os.path.exists(os.path.join(self.directory, strategy + "_b_should_be_easy.out")))
+
+    def test_compare_flags_slowdowns_above_tolerance_and_noise_floor(self):
+        baseline = {"measurements": [
+            measurement("solver:v7:b", solve_time=1.0, score_time=0.01, score=100),
+            measurement("solver:v7:c", solve_time=1.0, score=100),
+            measurement("solver:v7:d", solve_time=1.0, score=100),
+        ]}
+        measurements = [
+            # 20% slower: within the 25% tolerance.
+            measurement("solver:v7:b", solve_time=1.2, score_time=0.04, score=100),
+            # 50% slower, and a lower score.
+            measurement("solver:v7:c", solve_time=1.5, score=90),
+            measurement("solver:v7:d", error="timeout after 600s"),
+            # Not in the baseline.
+            measurement("solver:v7:e", solve_time=100.0, score=1),
+        ]
+        self.assertEqual([("solver:v7:c", "solve_time", 1.0, 1.5), ("solver:v7:c", "score", 100, 90),
+                          ("solver:v7:d", "error", 100, "timeout after 600s")],
+                         compare(measurements, baseline, tolerance=0.25, noise_floor=0.05))
+        # score_time went 0.01 -> 0.04, 300% slower but under the noise floor, until the floor is lowered.
+        self.assertIn(("solver:v7:b", "score_time", 0.01, 0.04),
+                      compare(measurements, baseline, tolerance=0.25, noise_floor=0.001))
+
+    def test_main_fails_on_a_regression(self):
+        output = os.path.join(self.directory, "bench.json")
+        arguments = ["benchmark", "--strategies", "v7", "--scorers", "vectorized", "--instances",
+                     "files/a_example.in", "--output", output, "--output-dir", self.directory]
+        self.assertEqual(0, benchmark.main(arguments))
+        report = json.load(open(output))
+        self.assertEqual(["solver:v7:a_example", "scorer:vectorized:a_example"],
+                         [measurement["case"] for measurement in report["measurements"]])
+
+        for measurement_ in report["measurements"]:
+            measurement_["score"] = measurement_["score"] + 1
+        baseline = os.path.join(self.directory, "baseline.json")
+        with open(baseline, "w") as f:
+            json.dump(report, f)
+        self.assertEqual(1, benchmark.main(arguments + ["--baseline", baseline]))
+        self.assertEqual(0, benchmark.main(arguments + ["--baseline", output]))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "v7_a_example.out")))
+
+    def test_main_removes_its_temporary_outputs(self):
+        before = set(os.listdir(tempfile.gettempdir()))
+        output = os.path.join(self.directory, "bench.json")
+        self.assertEqual(0, benchmark.main(["benchmark", "--strategies", "v7", "--scorers", "vectorized",
+                                            "--instances", "files/a_example.in", "--output", output]))
+        self.assertEqual(before, set(os.listdir(tempfile.gettempdir())))
+        self.assertEqual(["bench.json"], os.listdir(self.directory))
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+import argparse
+import math
+import sys
+
+import numpy as np
+
+from instance_loader import load_instance
+
+
+class RideBounds:
+    """Per ride quantities that hold in every solution, under the ScoreSubmissionComputer rules.
+
+    A car reaches the start of a ride at best at its distance from (0, 0),
+    so a ride can only score if it scores from there, and only get the
+    bonus if it gets it from there; points are then length plus that bonus.
+    A scored ride also keeps its car busy for its length plus the empty
+    drive from wherever the car was: (0, 0) or the end of another ride that
+    can score. min_deadhead is that drive at best, found with a k-d tree of
+    the ride ends in the Manhattan metric in O(N log N); leaving out when
+    the rides are only makes it smaller, so it stays a lower bound. Without
+    min_deadhead it is 0.
+    """
+
+    def __init__(self, header, rides, min_deadhead=True):
+        self.R, self.C, self.F, self.N, self.B, self.T = header
+        rides = np.asarray(rides, dtype=np.int64).reshape(-1, 6)
+        self.start_r, self.start_c, self.end_r, self.end_c, self.earliest_start, self.latest_finish = rides.T
+        self.length = np.abs(self.start_r - self.end_r) + np.abs(self.start_c - self.end_c)
+        self.origin_distance = self.start_r + self.start_c
+        self.scorable = (self.origin_distance + self.length < self.latest_finish) & \
+            (np.maximum(self.origin_distance, self.earliest_start) + self.length <= self.T)
+        self.bonus = self.scorable & (self.origin_distance <= self.earliest_start)
+        self.points = np.where(self.scorable, self.length + np.where(self.bonus, self.B, 0), 0)
+        self.end = self.earliest_start + self.length
+        # Ride j can follow ride i when end_i + deadhead < follow_by_j, and
+        # rides that cannot score never precede or follow anything.
+        never = np.iinfo(np.int64).max // 2
+        self.follow_by = np.where(self.scorable, self.latest_finish - self.length, -never)
+        self.end_if_scorable = np.where(self.scorable, self.end, never)
+        self.coordinates = [column.astype(np.int32) for column in
+                            (self.start_r, self.start_c, self.end_r, self.end_c)]
+
+        self.min_deadhead = np.zeros(len(rides), dtype=np.int64)
+        predecessors = np.flatnonzero(self.scorable)
+        if min_deadhead and len(predecessors) > 0:
+            from scipy.spatial import cKDTree
+
+            tree = cKDTree(np.column_stack((self.end_r[predecessors], self.end_c[predecessors])))
+            distances, nearest = tree.query(np.column_stack((self.start_r, self.start_c)), k=2, p=1)
+            # The nearest end may be the ride's own, then the second one is the
+            # nearest other end, or inf when there is none.
+            own = predecessors[nearest[:, 0]] == np.arange(len(rides))
+            other = np.where(own, distances[:, 1], distances[:, 0])
+            self.min_deadhead = np.minimum(self.origin_distance, other).astype(np.int64)
+
+    def edges(self, predecessors):
+        """Returns the deadhead from each predecessor to every ride, and which of them can follow it."""
+        start_r, start_c, end_r, end_c = self.coordinates
+        deadhead = np.abs(end_r[predecessors][:, None] - start_r) + np.abs(end_c[predecessors][:, None] - start_c)
+        feasible = deadhead < self.follow_by - self.end_if_scorable[predecessors][:, None]
+        feasible[np.arange(len(predecessors)), predecessors] = False
+        return deadhead, feasible
+
+
+def individual_bound(ride_bounds):
+    """Sum of the points of the rides a car coming from (0, 0) would score."""
+    return int(ride_bounds.points.sum())
+
+
+def capacity_bound(ride_bounds):
+    """Best points the fleet can drive in F * t steps for every deadline t.
+
+    Each scored ride takes length + min_deadhead steps of one car, and the
+    rides with latest_finish <= t all take them before t, so for every t
+    they fit in F * t steps. The fractional relaxation of these nested
+    knapsacks is solved exactly by taking rides by points per step.
+    """
+    busy = (ride_bounds.length + ride_bounds.min_deadhead)[ride_bounds.scorable]
+    points = ride_bounds.points[ride_bounds.scorable].astype(np.float64)
+    deadlines = np.minimum(ride_bounds.latest_finish[ride_bounds.scorable], ride_bounds.T)
+    steps = np.unique(deadlines)
+    capacity = ride_bounds.F * steps.astype(np.float64)
+    tree = SuffixMinTree(capacity)
+    positions = np.searchsorted(steps, deadlines)
+
+    total = float(points[busy == 0].sum())
+    for ride in np.lexsort((deadlines, -points / np.maximum(busy, 1))):
+        if busy[ride] == 0:
+            continue
+        taken = min(1.0, tree.minimum(positions[ride]) / busy[ride])
+        if taken <= 0:
+            continue
+        tree.add(positions[ride], -taken * busy[ride])
+        total = total + taken * points[ride]
+    return int(math.floor(total + 1e-6))
+
+
+def matching_bound(ride_bounds, max_edges=1 << 22):
+    """Best points when every scored ride only needs a predecessor of its own.
+
+    Each scored ride follows either one of the F cars leaving (0, 0) or a
+    ride that can precede it, and no ride precedes two. The maximum weight
+    bipartite matching of rides to predecessors bounds every solution.
+    Returns None when there are more than max_edges possible predecessor
+    pairs: on such dense instances nearly every ride finds a predecessor
+    and the matching is not tighter than the other bounds anyway.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+    N, F = ride_bounds.N, ride_bounds.F
+    origin_edges = int(ride_bounds.scorable.sum()) * F
+    heaviest = int(ride_bounds.points.max(initial=0)) + 1
+    rows, columns, costs = [], [], []
+    edge_count = 0
+    rows_per_chunk = max(1, max_edges // max(1, N))
+    for chunk_start in range(0, N, rows_per_chunk):
+        predecessors = np.arange(chunk_start, min(chunk_start + rows_per_chunk, N))
+        deadhead, feasible = ride_bounds.edges(predecessors)
+        predecessor, ride = np.nonzero(feasible)
+        edge_count = edge_count + len(ride)
+        if edge_count + origin_edges > max_edges:
+            return None
+        bonus = ride_bounds.end[predecessors][predecessor] + deadhead[predecessor, ride] <= \
+            ride_bounds.earliest_start[ride]
+        rows.append(ride)
+        columns.append(predecessors[predecessor])
+        costs.append(heaviest - (ride_bounds.length[ride] + np.where(bonus, ride_bounds.B, 0)))
+
+    scorable = np.flatnonzero(ride_bounds.scorable)
+    rows.append(np.repeat(scorable, F))
+    columns.append(N + np.tile(np.arange(F), len(scorable)))
+    costs.append(np.repeat(heaviest - ride_bounds.points[scorable], F))
+    # Every ride can also go without a predecessor, for no points.
+    rows.append(np.arange(N))
+    columns.append(N + F + np.arange(N))
+    costs.append(np.full(N, heaviest))
+
+    graph = coo_matrix((np.concatenate(costs).astype(np.float64), (np.concatenate(rows), np.concatenate(columns))),
+                       shape=(N, 2 * N + F)).tocsr()
+    matched = min_weight_full_bipartite_matching(graph)[1]
+    return int(N * heaviest - graph[np.arange(N), matched].sum())
+
+
+def upper_bounds(header, rides, min_deadhead=True, max_edges=1 << 22):
+    """Returns the individual, capacity and matching bounds of an instance, and the best of them."""
+    ride_bounds = RideBounds(header, rides, min_deadhead)
+    bounds = {
+        "individual": individual_bound(ride_bounds),
+        "capacity": capacity_bound(ride_bounds),
+        "matching": matching_bound(ride_bounds, max_edges),
+    }
+    bounds["best"] = min(bound for bound in bounds.values() if bound is not None)
+    return bounds
+
+
+def optimality_gap(score, bound):
+    """Fraction of the bound a score is short of; 0 means the score is optimal."""
+    return (bound - score) / float(bound) if bound > 0 else 0.0
+
+
+def target_score(bound, gap):
+    """Lowest score within gap of the bound."""
+    return int(math.ceil(bound * (1.0 - gap)))
+
+
+class SuffixMinTree:
+    """Segment tree over values with add and minimum on every suffix [position, end)."""
+
+    def __init__(self, values):
+        self.size = 1
+        while self.size < len(values):
+            self.size = 2 * self.size
+        self.minimums = [float("inf")] * (2 * self.size)
+        self.pending = [0.0] * (2 * self.size)
+        for position, value in enumerate(values):
+            self.minimums[self.size + position] = float(value)
+        for node in range(self.size - 1, 0, -1):
+            self.minimums[node] = min(self.minimums[2 * node], self.minimums[2 * node + 1])
+        self.length = len(values)
+
+    def minimum(self, position):
+        return self.__query(1, 0, self.size, position, self.length)
+
+    def add(self, position, amount):
+        self.__add(1, 0, self.size, position, self.length, amount)
+
+    def __query(self, node, low, high, start, end):
+        if end <= low or high <= start:
+            return float("inf")
+        if start <= low and high <= end:
+            return self.minimums[node]
+        middle = (low + high) // 2
+        return self.pending[node] + min(self.__query(2 * node, low, middle, start, end),
+                                        self.__query(2 * node + 1, middle, high, start, end))
+
+    def __add(self, node, low, high, start, end, amount):
+        if end <= low or high <= start:
+            return
+        if start <= low and high <= end:
+            self.minimums[node] = self.minimums[node] + amount
+            self.pending[node] = self.pending[node] + amount
+            return
+        middle = (low + high) // 2
+        self.__add(2 * node, low, middle, start, end, amount)
+        self.__add(2 * node + 1, middle, high, start, end, amount)
+        self.minimums[node] = self.pending[node] + min(self.minimums[2 * node], self.minimums[2 * node + 1])
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Prints upper bounds on the score of instances.")
+    parser.add_argument("instances", nargs="+", help=".in files")
+    parser.add_argument("--max-edges", type=int, default=1 << 22, help="skip the matching bound above this")
+    args = parser.parse_args(argv[1:])
+
+    print("%-30s %12s %12s %12s %12s" % ("instance", "individual", "capacity", "matching", "best"))
+    for filename in args.instances:
+        bounds = upper_bounds(*load_instance(filename), max_edges=args.max_edges)
+        print("%-30s %12d %12d %12s %12d" % (filename, bounds["individual"], bounds["capacity"],
+                                             bounds["matching"] if bounds["matching"] is not None else "-",
+                                             bounds["best"]))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
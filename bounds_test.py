@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import itertools
+import random
+import sys
+import unittest
+
+import numpy as np
+
+from bounds import (RideBounds, SuffixMinTree, capacity_bound, individual_bound, matching_bound, optimality_gap,
+                    target_score, upper_bounds)
+from instance_loader import load_instance
+from local_search import LocalSearch, Problem
+from score_submission import VectorizedScoreSubmissionComputer
+import self_driving_cars_and_rides_v7
+
+
+def best_score(header, rides):
+    """Tries every split of the rides between the cars and every order on each car."""
+    F, N = header[2], header[3]
+    scorer = VectorizedScoreSubmissionComputer.from_instance(header, rides)
+    best = 0
+    for owners in itertools.product(range(F + 1), repeat=N):
+        groups = [[ride for ride in range(N) if owners[ride] == car] for car in range(F)]
+        for orders in itertools.product(*[itertools.permutations(group) for group in groups]):
+            text = "".join("%d %s\n" % (len(order), " ".join(map(str, order))) for order in orders)
+            best = max(best, scorer.compute(text))
+    return best
+
+
+class TestBounds(unittest.TestCase):
+    def test_bounds_hold_on_tiny_instances(self):
+        generator = random.Random(3)
+        for _ in range(12):
+            header = [6, 6, 2, 5, generator.randint(0, 4), 14]
+            rides = []
+            for _ in range(5):
+                a, b, x, y = [generator.randrange(6) for _ in range(4)]
+                s = generator.randrange(8)
+                rides.append([a, b, x, y, s, s + abs(a - x) + abs(b - y) + generator.randint(1, 6)])
+            rides = np.array(rides)
+            optimum = best_score(header, rides)
+            ride_bounds = RideBounds(header, rides)
+            for bound in (individual_bound(ride_bounds), capacity_bound(ride_bounds), matching_bound(ride_bounds)):
+                self.assertGreaterEqual(bound, optimum)
+            self.assertLessEqual(matching_bound(ride_bounds), individual_bound(ride_bounds))
+
+    def test_bounds_hold_on_the_instances(self):
+        for instance, optimum in (("a_example", 10), ("b_should_be_easy", 176877), ("e_high_bonus", 21465945)):
+            header, rides = load_instance("files/" + instance + ".in")
+            bounds = upper_bounds(header, rides)
+            self.assertEqual(optimum, bounds["best"])
+            self.assertLessEqual(bounds["capacity"], bounds["individual"])
+            cars = self_driving_cars_and_rides_v7.assign_rides_to_cars("files/" + instance + ".in")
+            routes = [list(car.assigned_rides) for car in cars]
+            self.assertLessEqual(LocalSearch(Problem(header, rides), routes).score, bounds["best"])
+
+    def test_min_deadhead_is_the_nearest_other_end(self):
+        header, rides = load_instance("files/b_should_be_easy.in")
+        ride_bounds = RideBounds(header, rides)
+        deadhead, feasible = ride_bounds.edges(np.arange(header[3]))
+        others = ride_bounds.scorable[:, None] & ~np.eye(header[3], dtype=bool)
+        nearest = np.where(others, deadhead, np.iinfo(np.int32).max).min(axis=0)
+        self.assertEqual(np.minimum(ride_bounds.origin_distance, nearest).tolist(), ride_bounds.min_deadhead.tolist())
+        # Rides that can precede one are among the others, so it is a lower bound on their drive.
+        precede = np.where(feasible, deadhead, np.iinfo(np.int32).max).min(axis=0)
+        self.assertTrue((ride_bounds.min_deadhead <= np.minimum(ride_bounds.origin_distance, precede)).all())
+        self.assertEqual([0] * header[3], RideBounds(header, rides, min_deadhead=False).min_deadhead.tolist())
+
+    def test_matching_is_skipped_above_max_edges(self):
+        header, rides = load_instance("files/b_should_be_easy.in")
+        self.assertIsNone(matching_bound(RideBounds(header, rides), max_edges=1000))
+        self.assertIsNotNone(upper_bounds(header, rides, max_edges=1000)["best"])
+
+    def test_gap_and_target(self):
+        self.assertEqual(0.0, optimality_gap(100, 100))
+        self.assertAlmostEqual(0.25, optimality_gap(75, 100))
+        self.assertEqual(99, target_score(100, 0.01))
+        self.assertEqual(100, target_score(100, 0.0))
+
+    def test_suffix_min_tree(self):
+        generator = random.Random(5)
+        values = [generator.randint(0, 50) for _ in range(37)]
+        tree = SuffixMinTree(values)
+        for _ in range(200):
+            position = generator.randrange(len(values))
+            if generator.random() < 0.5:
+                amount = generator.randint(-5, 5)
+                tree.add(position, amount)
+                values[position:] = [value + amount for value in values[position:]]
+            else:
+                self.assertEqual(min(values[position:]), tree.minimum(position))
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Credits: TheSpace team from Melpignano
+
+import heapq
+import math
+
+
+class CarIndex:
+    """Index of the cars by the intersection they are next free at, for Manhattan queries.
+
+    Positions are kept in rotated coordinates u = r + c and v = r - c, where
+    the Manhattan distance |dr| + |dc| is max(|du|, |dv|): the cars within a
+    distance of a point are those in an axis aligned square around it. The
+    rotated plane is cut in square cells of cell_size, and each cell
+    remembers a lower bound on the step its cars are free by, so that a
+    query walks the cells in square rings of increasing distance, skips the
+    cells none of whose cars is free in time, and stops as soon as the
+    remaining rings cannot hold a better car.
+
+    The default cell_size gives about one car per cell when the cars are
+    spread over an R x C grid. Cars are indexed by slot, their position in
+    `cars`; a car that took a ride through assign_ride, or that was marked
+    with moved(slot), is only moved to its new cell by the next query.
+    """
+
+    def __init__(self, cars, R, C, cell_size=None):
+        self.cars = list(cars)
+        self.cell_size = cell_size or max(1, int((R + C) / math.sqrt(max(1, len(self.cars)))))
+        self.max_ring = (R + C) // self.cell_size + 2
+
+        self.cells = {}
+        self.min_free_in_cell = {}
+        self.car_cell = [None] * len(self.cars)
+        self.min_free = 0
+        self.dirty = set(range(len(self.cars)))
+
+    def __len__(self):
+        return len(self.cars)
+
+    def assign_ride(self, slot, ride):
+        self.cars[slot].assign_ride(ride)
+        self.moved(slot)
+
+    def moved(self, slot):
+        self.dirty.add(slot)
+
+    def within(self, r, c, radius):
+        """Returns the (distance, slot) pairs of the cars at most radius away from (r, c), nearest first."""
+        return self.__search(r, c, lambda slot, distance: distance if distance <= radius else None,
+                             lambda ring_distance, cell: ring_distance > radius)
+
+    def nearest(self, r, c, k):
+        """Returns the (distance, slot) pairs of the k cars nearest to (r, c), nearest first."""
+        return self.__search(r, c, lambda slot, distance: distance, lambda ring_distance, cell: False, k)
+
+    def reachable_by(self, r, c, step, limit=None):
+        """Returns the (arrival, slot) pairs of the cars that can reach (r, c) by step, earliest first.
+
+        A car arrives at the step it is free by plus its distance to (r, c).
+        With a limit only the `limit` earliest ones are returned.
+        """
+        def arrival(slot, distance):
+            arrival_step = self.cars[slot].free_by_step() + distance
+            return arrival_step if arrival_step <= step else None
+
+        return self.__search(r, c, arrival,
+                             lambda bound, cell: bound + self.min_free_in_cell.get(cell, self.min_free) > step,
+                             limit)
+
+    def __search(self, r, c, key, too_far, limit=None):
+        """Walks the rings of cells around (r, c) and keeps the cars with the smallest keys.
+
+        key(slot, distance) is None for the cars that do not qualify, and
+        too_far(distance, cell) tells that no car at least distance away,
+        in the cell or, with cell None, anywhere, can qualify. Keys never
+        go below the distance.
+        """
+        self.__refresh()
+        u, v = r + c, r - c
+        cell_u, cell_v = u // self.cell_size, v // self.cell_size
+        candidates = []
+        for ring in range(0, self.max_ring + 1):
+            ring_distance = max(0, (ring - 1) * self.cell_size + 1)
+            if too_far(ring_distance, None):
+                break
+            if limit is not None and len(candidates) == limit and ring_distance > -candidates[0][0]:
+                break
+            for cell in self.__ring_cells(cell_u, cell_v, ring):
+                slots = self.cells.get(cell)
+                if slots is None:
+                    continue
+                cell_distance = self.__distance_to_cell(u, v, cell)
+                if too_far(cell_distance, cell):
+                    continue
+                if limit is not None and len(candidates) == limit and cell_distance > -candidates[0][0]:
+                    continue
+                for slot in slots:
+                    car = self.cars[slot]
+                    car_key = key(slot, abs(car.next_r - r) + abs(car.next_c - c))
+                    if car_key is None:
+                        continue
+                    if limit is None or len(candidates) < limit:
+                        heapq.heappush(candidates, (-car_key, -slot))
+                    elif (-car_key, -slot) > candidates[0]:
+                        heapq.heapreplace(candidates, (-car_key, -slot))
+
+        return sorted((-negative_key, -negative_slot) for negative_key, negative_slot in candidates)
+
+    def __refresh(self):
+        for slot in self.dirty:
+            car = self.cars[slot]
+            cell = ((car.next_r + car.next_c) // self.cell_size, (car.next_r - car.next_c) // self.cell_size)
+            old_cell = self.car_cell[slot]
+            if old_cell != cell:
+                if old_cell is not None:
+                    self.cells[old_cell].discard(slot)
+                    if len(self.cells[old_cell]) == 0:
+                        del self.cells[old_cell]
+                        del self.min_free_in_cell[old_cell]
+                self.cells.setdefault(cell, set()).add(slot)
+                self.car_cell[slot] = cell
+            # Cars are only ever free later, so a bound a car leaves behind
+            # stays a lower bound.
+            self.min_free_in_cell[cell] = min(self.min_free_in_cell.get(cell, car.free_by_step()),
+                                              car.free_by_step())
+        if len(self.dirty) > 0:
+            self.min_free = min(self.min_free_in_cell.values())
+        self.dirty.clear()
+
+    def __ring_cells(self, cell_u, cell_v, ring):
+        if ring == 0:
+            yield cell_u, cell_v
+            return
+        for delta in range(-ring, ring + 1):
+            yield cell_u - ring, cell_v + delta
+            yield cell_u + ring, cell_v + delta
+        for delta in range(-ring + 1, ring):
+            yield cell_u + delta, cell_v - ring
+            yield cell_u + delta, cell_v + ring
+
+    def __distance_to_cell(self, u, v, cell):
+        low_u, low_v = cell[0] * self.cell_size, cell[1] * self.cell_size
+        high_u, high_v = low_u + self.cell_size - 1, low_v + self.cell_size - 1
+        return max(low_u - u, 0, u - high_u, low_v - v, v - high_v)
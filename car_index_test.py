@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import random
+import sys
+import unittest
+
+from car_index import CarIndex
+from ride_index_test import random_rides
+import self_driving_cars_and_rides_v7 as v7
+
+
+def distance(car, r, c):
+    return abs(car.next_r - r) + abs(car.next_c - c)
+
+
+class TestCarIndex(unittest.TestCase):
+    def test_queries_match_brute_force_while_cars_move(self):
+        generator = random.Random(9)
+        rides = random_rides(generator, 300)
+        cars = [v7.Car() for _ in range(50)]
+        index = CarIndex(cars, 200, 100, cell_size=13)
+        for ride in sorted(rides, key=lambda ride: ride.earliest_start):
+            r, c = ride.start_r, ride.start_c
+            expected = sorted((distance(car, r, c), slot) for slot, car in enumerate(cars))
+            self.assertEqual(expected[:7], index.nearest(r, c, 7))
+            self.assertEqual([pair for pair in expected if pair[0] <= 40], index.within(r, c, 40))
+
+            arrivals = sorted((car.free_by_step() + distance(car, r, c), slot) for slot, car in enumerate(cars))
+            step = ride.latest_finish - ride.length()
+            self.assertEqual([pair for pair in arrivals if pair[0] <= step], index.reachable_by(r, c, step))
+            self.assertEqual([pair for pair in arrivals if pair[0] <= step][:3], index.reachable_by(r, c, step, 3))
+
+            reachable = index.reachable_by(r, c, step, 1)
+            if len(reachable) > 0:
+                index.assign_ride(reachable[0][1], ride)
+
+    def test_default_cell_size(self):
+        cars = [v7.Car() for _ in range(400)]
+        index = CarIndex(cars, 10000, 10000)
+        self.assertEqual(1000, index.cell_size)
+        self.assertEqual([(0, slot) for slot in range(5)], index.nearest(0, 0, 5))
+        self.assertEqual([], index.within(5000, 5000, 100))
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+# Credits: TheSpace team from Melpignano
+"""Self driving cars and rides, from Hash Code 2018.
+
+The solvers stay in their own top-level modules; this package is the one
+place that knows them by name, and `python -m carsandrides` is their
+command line. Nothing but the standard library is imported until a
+strategy or a command is actually used.
+"""
+
+import importlib
+
+# Strategy name -> module with assign_rides_to_cars(filename) and
+# write_output_assignements(filename, cars). Any other importable module
+# with those two functions can be used by passing its module name.
+STRATEGIES = {
+    "v1": "self_driving_cars_and_rides",
+    "v2": "self_driving_cars_and_rides_v2",
+    "v3": "self_driving_cars_and_rides_v3",
+    "v4": "self_driving_cars_and_rides_v4",
+    "v5": "self_driving_cars_and_rides_v5",
+    "v6": "self_driving_cars_and_rides_v6",
+    "v7": "self_driving_cars_and_rides_v7",
+    "v8": "self_driving_cars_and_rides_v8",
+    "batch": "batch_dispatch",
+    "beam": "beam_search",
+}
+
+# Seconds a fresh interpreter may take to import any one strategy module.
+STARTUP_BUDGET = 0.5
+
+# Modules that importing a strategy must not load; the features that need
+# them import them when they run.
+HEAVY_MODULES = ("matplotlib", "sympy", "tqdm", "scipy")
+
+
+def load_strategy(name):
+    """Returns the module of a strategy, by strategy name or module name."""
+    return importlib.import_module(STRATEGIES.get(name, name))
+
+
+def solve(strategy, instance, output):
+    """Solves an instance with a strategy, writes the output file and returns the cars.
+
+    An output ending with .npy is written in the binary solution format.
+    """
+    module = load_strategy(strategy)
+    cars = module.assign_rides_to_cars(instance)
+    write_output(module, output, cars)
+    return cars
+
+
+def write_output(module, output, cars):
+    """Writes cars with the writer of their strategy module, or in the binary format, see solution_format."""
+    from solution_format import is_binary_path, write_cars
+
+    if is_binary_path(output):
+        write_cars(output, cars)
+    else:
+        module.write_output_assignements(output, cars)
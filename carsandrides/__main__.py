@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+
+from carsandrides import HEAVY_MODULES, STARTUP_BUDGET, STRATEGIES, solve
+
+# Command -> (module whose main(argv) runs it, what it does). Modules are
+# only imported when their command runs.
+COMMANDS = {
+    "run": ("runner", "run strategies on instances in parallel"),
+    "bench": ("benchmark", "benchmark the solvers and the scorers"),
+    "improve": ("local_search", "improve a solution with local search"),
+    "search": ("metaheuristic", "improve a solution with parallel metaheuristic chains"),
+    "profile": ("instrumentation", "time the phases of a solver"),
+    "bounds": ("bounds", "print upper bounds on the score of instances"),
+    "generate": ("instance_generator", "write a random instance"),
+    "score": ("score_submission", "score the files/*.out solutions"),
+    "leaderboard": ("batch_scoring", "score many solutions and rank them per instance"),
+    "online": ("online_dispatch", "dispatch a feed of rides as they come"),
+}
+
+IMPORT_TIMER = """
+import sys, time
+started_at = time.perf_counter()
+import %s
+print(time.perf_counter() - started_at)
+print(" ".join(sorted(set(name.split(".")[0] for name in sys.modules))))
+"""
+
+
+def measure_import(module_name):
+    """Returns the seconds a fresh interpreter takes to import a module, and the top-level modules it loaded."""
+    output = subprocess.run([sys.executable, "-c", IMPORT_TIMER % module_name], check=True, capture_output=True,
+                            text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    seconds, modules = output.splitlines()
+    return float(seconds), modules.split()
+
+
+def startup(argv):
+    parser = argparse.ArgumentParser(prog="carsandrides startup",
+                                     description="Checks the import time of every strategy against the budget.")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET, help="seconds allowed per strategy import")
+    args = parser.parse_args(argv)
+
+    over_budget = False
+    for name, module_name in [("carsandrides", "carsandrides")] + list(STRATEGIES.items()):
+        seconds, modules = measure_import(module_name)
+        heavy = [module for module in HEAVY_MODULES if module in modules]
+        failed = seconds > args.budget or len(heavy) > 0
+        over_budget = over_budget or failed
+        print("%-14s %6.3fs %s%s" % (name, seconds, "FAIL" if failed else "ok",
+                                     " (loads " + ", ".join(heavy) + ")" if heavy else ""))
+    return 1 if over_budget else 0
+
+
+def solve_command(argv):
+    parser = argparse.ArgumentParser(prog="carsandrides solve", description="Solves instances with a strategy.")
+    parser.add_argument("strategy", help="strategy name (%s) or module name" % ", ".join(STRATEGIES))
+    parser.add_argument("instances", nargs="+", help=".in files")
+    parser.add_argument("--output-dir", default="files", help="where to write the .out files")
+    args = parser.parse_args(argv)
+
+    for instance in args.instances:
+        output = os.path.join(args.output_dir, os.path.splitext(os.path.basename(instance))[0] + ".out")
+        solve(args.strategy, instance, output)
+        print(output)
+    return 0
+
+
+def usage():
+    lines = ["usage: python -m carsandrides <command> [arguments]", "", "commands:",
+             "  %-12s %s" % ("solve", "solve instances with a strategy"),
+             "  %-12s %s" % ("strategies", "list the strategies"),
+             "  %-12s %s" % ("startup", "check the import time of every strategy")]
+    lines.extend("  %-12s %s" % (command, description) for command, (_, description) in COMMANDS.items())
+    return "\n".join(lines)
+
+
+def main(argv):
+    if len(argv) < 2 or argv[1] in ("-h", "--help"):
+        print(usage())
+        return 0 if len(argv) >= 2 else 2
+    command, arguments = argv[1], argv[2:]
+
+    if command == "solve":
+        return solve_command(arguments)
+    if command == "strategies":
+        for name, module_name in STRATEGIES.items():
+            print("%-8s %s" % (name, module_name))
+        return 0
+    if command == "startup":
+        return startup(arguments)
+    if command not in COMMANDS:
+        print(usage())
+        return 2
+    return importlib.import_module(COMMANDS[command][0]).main(["carsandrides " + command] + arguments) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from carsandrides import HEAVY_MODULES, STARTUP_BUDGET, STRATEGIES, load_strategy
+from carsandrides.__main__ import main as carsandrides_main, measure_import
+from score_submission import ScoreSubmissionComputer
+
+
+class TestCarsAndRides(unittest.TestCase):
+    def test_strategies_import_within_the_budget(self):
+        for name, module_name in STRATEGIES.items():
+            seconds, modules = measure_import(module_name)
+            self.assertLess(seconds, STARTUP_BUDGET, name)
+            self.assertEqual([], [module for module in HEAVY_MODULES if module in modules], name)
+
+    def test_every_strategy_has_the_solver_interface(self):
+        for name in STRATEGIES:
+            module = load_strategy(name)
+            self.assertTrue(callable(module.assign_rides_to_cars), name)
+            self.assertTrue(callable(module.write_output_assignements), name)
+
+    def test_solve_command(self):
+        directory = tempfile.mkdtemp()
+        try:
+            self.assertEqual(0, carsandrides_main(["carsandrides", "solve", "v7", "files/a_example.in",
+                                                   "--output-dir", directory]))
+            submission = open(os.path.join(directory, "a_example.out")).read()
+            self.assertEqual(4, ScoreSubmissionComputer().compute(open("files/a_example.in").read(), submission))
+        finally:
+            shutil.rmtree(directory)
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
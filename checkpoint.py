@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Credits: TheSpace team from Melpignano
+
+import json
+import os
+import tempfile
+import time
+
+
+def atomic_write(filename, data):
+    """Writes text or bytes to filename so that readers only ever see the old or the new file.
+
+    The file gets the permissions a plain open() would give it under the
+    current umask, not the 0600 of the temporary file.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(filename) + ".")
+    try:
+        with os.fdopen(handle, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temporary, 0o666 & ~umask)
+        os.replace(temporary, filename)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def state_path(solution_path):
+    return solution_path + ".state.json"
+
+
+def load_checkpoint(solution_path):
+    """Returns the search state saved with a solution, or None when there is none."""
+    if not os.path.exists(state_path(solution_path)):
+        return None
+    with open(state_path(solution_path)) as f:
+        return json.load(f)
+
+
+class Checkpoint:
+    """Saves the best solution of a long search, and what it takes to resume it.
+
+    The routes are written to solution_path with write_routes, in the
+    binary format when it ends with .npy, and the search state, routes
+    included, to solution_path + ".state.json". Both are replaced
+    atomically, so a run killed at any point leaves the last
+    complete checkpoint behind. A checkpoint is due every interval seconds,
+    or as soon as the score has gained min_gain since the last one.
+    """
+
+    def __init__(self, solution_path, interval=60.0, min_gain=None):
+        self.solution_path = solution_path
+        self.interval = interval
+        self.min_gain = min_gain
+        self.saved_at = time.time()
+        self.saved_score = None
+
+    def due(self, score):
+        if self.saved_score is not None and score <= self.saved_score:
+            return False
+        if self.min_gain is not None and self.saved_score is not None and score - self.saved_score >= self.min_gain:
+            return True
+        return time.time() - self.saved_at >= self.interval
+
+    def save(self, score, routes, state):
+        # solution_format writes through atomic_write, so it is imported here.
+        from solution_format import write_routes
+
+        write_routes(self.solution_path, routes)
+        state = dict(state, score=score, routes=routes, saved_at=time.time())
+        atomic_write(state_path(self.solution_path), json.dumps(state))
+        self.saved_at = time.time()
+        self.saved_score = score
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from checkpoint import Checkpoint, atomic_write, load_checkpoint, state_path
+from instance_loader import load_instance
+import local_search
+from local_search import LocalSearch, Problem, read_routes
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.solution = os.path.join(self.directory, "b.out")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_atomic_write_leaves_no_temporary_file(self):
+        atomic_write(self.solution, "old")
+        atomic_write(self.solution, "new")
+        self.assertEqual("new", open(self.solution).read())
+        self.assertEqual(["b.out"], os.listdir(self.directory))
+
+    def test_atomic_write_follows_the_umask(self):
+        umask = os.umask(0o022)
+        try:
+            atomic_write(self.solution, b"binary")
+        finally:
+            os.umask(umask)
+        self.assertEqual(b"binary", open(self.solution, "rb").read())
+        self.assertEqual(0o644, os.stat(self.solution).st_mode & 0o777)
+
+    def test_due_on_interval_or_gain(self):
+        checkpoint = Checkpoint(self.solution, interval=3600.0, min_gain=10)
+        self.assertFalse(checkpoint.due(100))
+        checkpoint.save(100, [[0, 1], []], {"epoch": 1})
+        self.assertFalse(checkpoint.due(105))
+        self.assertTrue(checkpoint.due(110))
+        self.assertEqual("2 0 1\n0 \n", open(self.solution).read())
+        self.assertEqual({"epoch": 1, "score": 100, "routes": [[0, 1], []]},
+                         dict((key, value) for key, value in load_checkpoint(self.solution).items()
+                              if key != "saved_at"))
+        self.assertTrue(Checkpoint(self.solution, interval=0.0).due(100))
+
+    def test_resumed_search_carries_on_identically(self):
+        problem = Problem(*load_instance("files/b_should_be_easy.in"))
+        routes = read_routes("score_submission_test_files/b_should_be_easy_176877.out")
+        search = LocalSearch(problem, [rides[:len(rides) // 2] for rides in routes], seed=3)
+        search.improve(0.2, checkpoint=Checkpoint(self.solution, interval=0.0))
+
+        state = load_checkpoint(self.solution)
+        self.assertEqual(search.score, state["score"])
+        resumed = LocalSearch.resume(problem, state)
+        self.assertEqual(search.score, resumed.score)
+        for _ in range(200):
+            move, resumed_move = search.propose(), resumed.propose()
+            self.assertEqual(move is None, resumed_move is None)
+            if move is not None:
+                self.assertEqual((move.kind, move.delta, move.changes), (resumed_move.kind, resumed_move.delta,
+                                                                         resumed_move.changes))
+                search.apply(move)
+                resumed.apply(resumed_move)
+
+    def test_local_search_command_resumes(self):
+        shutil.copy("score_submission_test_files/b_should_be_easy_176877.out", self.solution)
+        local_search.main(["local_search.py", "files/b_should_be_easy.in", self.solution, "--time-budget", "0.1"])
+        self.assertTrue(os.path.exists(state_path(self.solution)))
+        with open(state_path(self.solution)) as f:
+            iterations = json.load(f)["iterations"]
+        local_search.main(["local_search.py", "files/b_should_be_easy.in", self.solution, "--time-budget", "0.1",
+                           "--resume", "--checkpoint-interval", "0"])
+        self.assertGreater(load_checkpoint(self.solution)["iterations"], iterations)
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
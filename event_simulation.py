@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Credits: TheSpace team from Melpignano
+
+import heapq
+
+
+class EventDrivenSimulation:
+    """Runs a tick based dispatch policy only at the steps where it can act.
+
+    A tick based policy loops over `for t in range(T)` and, at every step,
+    hands rides to the cars whose free_by_step is not after t. Nothing happens
+    at the steps where no car is free, so this simulation keeps a priority
+    queue of car-free events and jumps straight from one to the next: the
+    number of simulated steps depends on the number of rides and cars, not
+    on T.
+    """
+
+    def __init__(self, cars, steps):
+        self.cars = cars
+        self.steps = steps
+
+    def run(self, dispatch):
+        """Calls dispatch(t, free_cars) at every step t where some car is free.
+
+        free_cars are the cars with free_by_step <= t, in fleet order, and
+        dispatch may update their free_by_step. It returns False once there is
+        nothing left to dispatch, which ends the simulation.
+        """
+        events = [(car.free_by_step, car_index) for car_index, car in enumerate(self.cars)]
+        heapq.heapify(events)
+
+        t = 0
+        while events:
+            t = max(t, events[0][0])
+            if t >= self.steps:
+                break
+
+            free_car_indexes = []
+            while events and events[0][0] <= t:
+                free_car_indexes.append(heapq.heappop(events)[1])
+            free_car_indexes.sort()
+
+            keep_going = dispatch(t, [self.cars[car_index] for car_index in free_car_indexes])
+
+            for car_index in free_car_indexes:
+                heapq.heappush(events, (self.cars[car_index].free_by_step, car_index))
+            if not keep_going:
+                break
+            t = t + 1
+
+        return self.cars
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import random
+import sys
+import unittest
+
+from event_simulation import EventDrivenSimulation
+
+
+class SimulatedCar:
+    def __init__(self):
+        self.free_by_step = 0
+
+
+def make_dispatch(durations, decisions):
+    pending = list(durations)
+
+    def dispatch(t, free_cars):
+        for car in free_cars:
+            if len(pending) == 0:
+                return False
+            car.free_by_step = t + pending.pop(0)
+            decisions.append((t, id(car)))
+        return True
+
+    return dispatch
+
+
+class TestEventDrivenSimulation(unittest.TestCase):
+    def test_same_decisions_as_tick_loop(self):
+        generator = random.Random(11)
+        durations = [generator.randint(0, 40) for _ in range(200)]
+
+        tick_cars = [SimulatedCar() for _ in range(6)]
+        tick_decisions = []
+        dispatch = make_dispatch(durations, tick_decisions)
+        for t in range(10 ** 4):
+            free_cars = [car for car in tick_cars if car.free_by_step <= t]
+            if free_cars and not dispatch(t, free_cars):
+                break
+
+        event_cars = [SimulatedCar() for _ in range(6)]
+        event_decisions = []
+        EventDrivenSimulation(event_cars, 10 ** 4).run(make_dispatch(durations, event_decisions))
+
+        car_numbers = dict((id(car), number) for number, car in enumerate(tick_cars + event_cars))
+        self.assertEqual([(t, car_numbers[car] % 6) for t, car in tick_decisions],
+                         [(t, car_numbers[car] % 6) for t, car in event_decisions])
+
+    def test_stops_at_the_last_step(self):
+        cars = [SimulatedCar()]
+        decisions = []
+        EventDrivenSimulation(cars, 50).run(make_dispatch([30] * 10, decisions))
+        self.assertEqual([0, 30], [t for t, car in decisions])
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Credits: TheSpace team from Melpignano
+
+import numpy as np
+
+BONUS_SCORE = 1
+ON_TIME_SCORE = 2
+UNDOABLE_SCORE = 3
+
+
+class Fleet:
+    """State of a fleet of cars kept as NumPy arrays.
+
+    Scores use the same scale as Car.score_for_ride in the v5-v7 dispatchers:
+    1 when the car can start the ride on time, 2 when it can still finish it
+    before latest_finish, 3 when it cannot do the ride at all.
+
+    The fleet also keeps the order in which the cars would be if they were
+    sorted with a stable sort on their score for every evaluated ride, so that
+    best_car_for_ride breaks ties exactly like `cars.sort(key=...)` followed by
+    `cars[0]` did.
+    """
+
+    def __init__(self, cars):
+        self.cars = list(cars)
+        self.next_r = np.array([car.next_r for car in self.cars], dtype=np.int64)
+        self.next_c = np.array([car.next_c for car in self.cars], dtype=np.int64)
+        self.free_by_step = np.array([car.free_by_step() for car in self.cars], dtype=np.int64)
+        self.order = np.arange(len(self.cars))
+
+    def __len__(self):
+        return len(self.cars)
+
+    def arrivals_for_ride(self, ride):
+        """Returns the step at which every car would reach the ride start, by car slot."""
+        distances = np.abs(self.next_r - ride.start_r) + np.abs(self.next_c - ride.start_c)
+        return self.free_by_step + distances
+
+    def score_for_ride(self, ride):
+        """Returns the score of every car for the ride, by car slot."""
+        arrivals = self.arrivals_for_ride(ride)
+        scores = np.full(len(self.cars), UNDOABLE_SCORE, dtype=np.int8)
+        scores[arrivals + ride.length() <= ride.latest_finish] = ON_TIME_SCORE
+        scores[arrivals <= ride.earliest_start] = BONUS_SCORE
+        return scores
+
+    def score_for_rides(self, rides):
+        """Returns a (len(rides), len(fleet)) matrix of scores, by car slot."""
+        start_r = np.array([ride.start_r for ride in rides], dtype=np.int64)[:, None]
+        start_c = np.array([ride.start_c for ride in rides], dtype=np.int64)[:, None]
+        earliest_start = np.array([ride.earliest_start for ride in rides], dtype=np.int64)[:, None]
+        latest_finish = np.array([ride.latest_finish for ride in rides], dtype=np.int64)[:, None]
+        length = np.array([ride.length() for ride in rides], dtype=np.int64)[:, None]
+
+        arrivals = self.free_by_step + np.abs(self.next_r - start_r) + np.abs(self.next_c - start_c)
+        scores = np.full(arrivals.shape, UNDOABLE_SCORE, dtype=np.int8)
+        scores[arrivals + length <= latest_finish] = ON_TIME_SCORE
+        scores[arrivals <= earliest_start] = BONUS_SCORE
+        return scores
+
+    def best_car_for_ride(self, ride):
+        """Returns the slot and score of the best car for the ride.
+
+        The best car is the first one in fleet order with the lowest score.
+        The fleet order is then updated the way a stable sort by score would.
+        """
+        ordered_scores = self.score_for_ride(ride)[self.order]
+        best_position = int(np.argmin(ordered_scores))
+        best_slot = int(self.order[best_position])
+        best_score = int(ordered_scores[best_position])
+
+        self.order = np.concatenate((
+            self.order[ordered_scores == BONUS_SCORE],
+            self.order[ordered_scores == ON_TIME_SCORE],
+            self.order[ordered_scores == UNDOABLE_SCORE]))
+
+        return best_slot, best_score
+
+    def assign_ride(self, slot, ride):
+        car = self.cars[slot]
+        car.assign_ride(ride)
+        self.next_r[slot] = car.next_r
+        self.next_c[slot] = car.next_c
+        self.free_by_step[slot] = car.free_by_step()
+
+    def cars_in_order(self):
+        return [self.cars[slot] for slot in self.order]
+
+
+class PrunedFleet:
+    """State of a fleet of cars kept in the order of the step they are free by.
+
+    A car free by step f reaches any ride start at f at the earliest, so
+    only the cars with f + length <= latest_finish can do a ride, and only
+    the ones with f <= earliest_start can get its bonus; both are prefixes
+    of the order, found by binary search. best_car_for_ride scans the
+    prefix in chunks of `chunk` cars, bonus cars first, and stops as soon as
+    no car left can beat the best one found.
+
+    Scores use the Fleet scale, but the best car is the bonus car that
+    waits the least, or else the car that arrives first, instead of the
+    first car of a stable sort.
+    """
+
+    def __init__(self, cars, chunk=256):
+        self.cars = list(cars)
+        self.chunk = chunk
+        self.next_r = np.array([car.next_r for car in self.cars], dtype=np.int64)
+        self.next_c = np.array([car.next_c for car in self.cars], dtype=np.int64)
+        free_by_step = np.array([car.free_by_step() for car in self.cars], dtype=np.int64)
+        self.sorted_slots = np.argsort(free_by_step, kind="stable")
+        self.sorted_free = free_by_step[self.sorted_slots]
+        self.positions = np.empty(len(self.cars), dtype=np.int64)
+        self.positions[self.sorted_slots] = np.arange(len(self.cars))
+        self.evaluated = 0
+
+    def __len__(self):
+        return len(self.cars)
+
+    def best_car_for_ride(self, ride):
+        """Returns the slot and score of the best car for the ride, or (-1, UNDOABLE_SCORE)."""
+        length = ride.length()
+        reachable = int(np.searchsorted(self.sorted_free, ride.latest_finish - length, "right"))
+        bonus_reachable = min(reachable, int(np.searchsorted(self.sorted_free, ride.earliest_start, "right")))
+
+        # The bonus car free the latest spends the fewest steps driving empty
+        # and waiting, so the bonus cars are scanned from the latest free.
+        for end in range(bonus_reachable, 0, -self.chunk):
+            slots, arrivals = self.__arrivals(max(0, end - self.chunk), end, ride)
+            bonus = np.flatnonzero(arrivals <= ride.earliest_start)
+            if len(bonus) > 0:
+                return int(slots[bonus[-1]]), BONUS_SCORE
+
+        best_on_time = None
+        for start in range(0, reachable, self.chunk):
+            if best_on_time is not None and self.sorted_free[start] >= best_on_time[1]:
+                break
+            slots, arrivals = self.__arrivals(start, min(start + self.chunk, reachable), ride)
+            best_on_time = self.__earliest(slots, arrivals, ride.latest_finish - length, best_on_time)
+        if best_on_time is not None:
+            return best_on_time[0], ON_TIME_SCORE
+        return -1, UNDOABLE_SCORE
+
+    def __arrivals(self, start, end, ride):
+        slots = self.sorted_slots[start:end]
+        self.evaluated = self.evaluated + len(slots)
+        distances = np.abs(self.next_r[slots] - ride.start_r) + np.abs(self.next_c[slots] - ride.start_c)
+        return slots, self.sorted_free[start:end] + distances
+
+    @staticmethod
+    def __earliest(slots, arrivals, latest_arrival, best):
+        on_time = np.flatnonzero(arrivals <= latest_arrival)
+        if len(on_time) == 0:
+            return best
+        position = on_time[np.argmin(arrivals[on_time])]
+        if best is None or arrivals[position] < best[1]:
+            return int(slots[position]), int(arrivals[position])
+        return best
+
+    def assign_ride(self, slot, ride):
+        car = self.cars[slot]
+        car.assign_ride(ride)
+        self.next_r[slot] = car.next_r
+        self.next_c[slot] = car.next_c
+
+        # A car is only ever free later than before, so it moves towards the
+        # end of the order and the cars in between shift back by one.
+        free_by_step = car.free_by_step()
+        old_position = self.positions[slot]
+        new_position = int(np.searchsorted(self.sorted_free, free_by_step, "right")) - 1
+        self.sorted_free[old_position:new_position] = self.sorted_free[old_position + 1:new_position + 1]
+        self.sorted_slots[old_position:new_position] = self.sorted_slots[old_position + 1:new_position + 1]
+        self.positions[self.sorted_slots[old_position:new_position]] = np.arange(old_position, new_position)
+        self.sorted_free[new_position] = free_by_step
+        self.sorted_slots[new_position] = slot
+        self.positions[slot] = new_position
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import random
+import sys
+import unittest
+
+from fleet import Fleet, PrunedFleet
+from score_submission import Car, Ride
+import self_driving_cars_and_rides_v7 as v7
+
+
+def random_ride(generator, index):
+    ride = Ride()
+    ride.start_r, ride.start_c = generator.randint(0, 20), generator.randint(0, 20)
+    ride.end_r, ride.end_c = generator.randint(0, 20), generator.randint(0, 20)
+    ride.earliest_start = generator.randint(0, 100)
+    ride.latest_finish = ride.earliest_start + ride.length() + generator.randint(0, 30)
+    ride.index = index
+    return ride
+
+
+def sort_score(car, ride):
+    arriving_at = car.free_by_step() + abs(car.next_r - ride.start_r) + abs(car.next_c - ride.start_c)
+    if arriving_at <= ride.earliest_start:
+        return 1
+    if arriving_at + ride.length() <= ride.latest_finish:
+        return 2
+    return 3
+
+
+class TestFleet(unittest.TestCase):
+    def test_best_car_matches_stable_sort(self):
+        generator = random.Random(7)
+        rides = [random_ride(generator, i) for i in range(300)]
+        rides.sort(key=lambda ride: ride.earliest_start)
+
+        reference_cars = [Car(0) for _ in range(15)]
+        fleet = Fleet([Car(0) for _ in range(15)])
+        for ride in rides:
+            reference_cars.sort(key=lambda car: sort_score(car, ride))
+            expected_score = sort_score(reference_cars[0], ride)
+            slot, score = fleet.best_car_for_ride(ride)
+            self.assertEqual(expected_score, score)
+            if score < 3:
+                reference_cars[0].assign_ride(ride)
+                fleet.assign_ride(slot, ride)
+
+        self.assertEqual([car.assigned_rides for car in reference_cars],
+                         [car.assigned_rides for car in fleet.cars_in_order()])
+
+    def test_score_for_rides_matches_score_for_ride(self):
+        generator = random.Random(3)
+        rides = [random_ride(generator, i) for i in range(20)]
+        fleet = Fleet([Car(0) for _ in range(5)])
+        for slot, ride in enumerate(rides[:5]):
+            fleet.assign_ride(slot, ride)
+
+        matrix = fleet.score_for_rides(rides)
+        for row, ride in enumerate(rides):
+            self.assertEqual(list(fleet.score_for_ride(ride)), list(matrix[row]))
+
+
+class TestPrunedFleet(unittest.TestCase):
+    def test_best_car_matches_a_scan_of_every_car(self):
+        generator = random.Random(11)
+        rides = [random_ride(generator, i) for i in range(400)]
+        rides.sort(key=lambda ride: ride.earliest_start)
+        cars = [v7.Car() for _ in range(40)]
+        fleet = PrunedFleet(cars, chunk=8)
+        for ride in rides:
+            arrivals = [car.score_and_arrival_for_ride(ride) for car in cars]
+            slot, score = fleet.best_car_for_ride(ride)
+            self.assertEqual(min(car_score for car_score, _ in arrivals), score)
+            if score == 1:
+                self.assertEqual(max(car.free_by_step() for car, (car_score, _) in zip(cars, arrivals)
+                                     if car_score == 1), cars[slot].free_by_step())
+            elif score == 2:
+                self.assertEqual(min(arrival for _, arrival in arrivals), arrivals[slot][1])
+            if score < 3:
+                fleet.assign_ride(slot, ride)
+            self.assertEqual(sorted(car.free_by_step() for car in cars), fleet.sorted_free.tolist())
+            self.assertEqual([cars[slot].free_by_step() for slot in fleet.sorted_slots], fleet.sorted_free.tolist())
+        self.assertLess(fleet.evaluated, len(cars) * len(rides))
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
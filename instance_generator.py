@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+import argparse
+import sys
+
+import numpy as np
+
+CHUNK_SIZE = 65536
+SPATIAL_DISTRIBUTIONS = ("uniform", "metropolis")
+LENGTH_DISTRIBUTIONS = ("independent", "uniform", "exponential")
+SLACK_DISTRIBUTIONS = ("uniform", "exponential")
+
+
+class InstanceGenerator:
+    """Generates Self driving car problems in the files/*.in format.
+
+    Rides are generated and written CHUNK_SIZE at a time, so the size of
+    the instance is only limited by the disk. The same settings and seed
+    always give the same file.
+
+    spatial – where rides start: "uniform" over the grid, or "metropolis",
+        where hot_fraction of them start around one of `hotspots` centers
+        (normally distributed with standard deviation spread)
+    length – how far rides go: "independent" ends are drawn like starts,
+        "uniform" lengths are uniform in [0, 2 * mean_length] and
+        "exponential" lengths are exponential with mean mean_length
+    slack – latest_finish - (earliest_start + length): "uniform" in
+        [0, 2 * mean_slack] or "exponential" with mean mean_slack
+    """
+
+    def __init__(self, R, C, F, N, B, T, seed=0, spatial="uniform", hotspots=8, spread=None, hot_fraction=0.8,
+                 length="independent", mean_length=None, slack="uniform", mean_slack=None):
+        if spatial not in SPATIAL_DISTRIBUTIONS or length not in LENGTH_DISTRIBUTIONS or \
+                slack not in SLACK_DISTRIBUTIONS:
+            raise ValueError("Unknown distribution")
+        self.R, self.C, self.F, self.N, self.B, self.T = R, C, F, N, B, T
+        self.spatial = spatial
+        self.hot_fraction = hot_fraction
+        self.spread = spread if spread is not None else max(1, min(R, C) // 40)
+        self.length = length
+        self.mean_length = mean_length if mean_length is not None else max(1, (R + C) // 6)
+        self.slack = slack
+        self.mean_slack = mean_slack if mean_slack is not None else max(1, T // 20)
+
+        self.random = np.random.default_rng(seed)
+        self.hotspots = np.column_stack((self.random.integers(0, R, hotspots), self.random.integers(0, C, hotspots)))
+
+    def write(self, filename):
+        with open(filename, "w") as f:
+            f.write("%d %d %d %d %d %d\n" % (self.R, self.C, self.F, self.N, self.B, self.T))
+            for rides in self.chunks():
+                f.write(("%d %d %d %d %d %d\n" * len(rides)) % tuple(rides.ravel().tolist()))
+
+    def chunks(self):
+        """Yields the rides as (n, 6) int64 arrays of at most CHUNK_SIZE rows."""
+        for chunk_start in range(0, self.N, CHUNK_SIZE):
+            yield self.__rides(min(CHUNK_SIZE, self.N - chunk_start))
+
+    def __rides(self, count):
+        start_r, start_c = self.__positions(count)
+        if self.length == "independent":
+            end_r, end_c = self.__positions(count)
+        else:
+            if self.length == "uniform":
+                lengths = self.random.integers(0, 2 * self.mean_length + 1, count)
+            else:
+                lengths = np.rint(self.random.exponential(self.mean_length, count)).astype(np.int64)
+            row_part = np.rint(self.random.random(count) * lengths).astype(np.int64)
+            row_sign = self.random.choice((-1, 1), count)
+            column_sign = self.random.choice((-1, 1), count)
+            end_r = np.clip(start_r + row_sign * row_part, 0, self.R - 1)
+            end_c = np.clip(start_c + column_sign * (lengths - row_part), 0, self.C - 1)
+        lengths = np.abs(start_r - end_r) + np.abs(start_c - end_c)
+
+        if self.slack == "uniform":
+            slacks = self.random.integers(0, 2 * self.mean_slack + 1, count)
+        else:
+            slacks = np.rint(self.random.exponential(self.mean_slack, count)).astype(np.int64)
+        latest_possible_start = np.maximum(self.T - lengths - slacks, 1)
+        earliest_start = np.minimum((self.random.random(count) * latest_possible_start).astype(np.int64), self.T - 1)
+        latest_finish = np.maximum(np.minimum(earliest_start + lengths + slacks, self.T), earliest_start + lengths)
+
+        return np.column_stack((start_r, start_c, end_r, end_c, earliest_start, latest_finish))
+
+    def __positions(self, count):
+        rows = self.random.integers(0, self.R, count)
+        columns = self.random.integers(0, self.C, count)
+        if self.spatial == "metropolis":
+            hot = self.random.random(count) < self.hot_fraction
+            centers = self.hotspots[self.random.integers(0, len(self.hotspots), count)]
+            offsets = np.rint(self.random.normal(0, self.spread, (count, 2))).astype(np.int64)
+            rows = np.where(hot, np.clip(centers[:, 0] + offsets[:, 0], 0, self.R - 1), rows)
+            columns = np.where(hot, np.clip(centers[:, 1] + offsets[:, 1], 0, self.C - 1), columns)
+        return rows, columns
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Writes a random Self driving car problem.")
+    parser.add_argument("output", help="the .in file to write")
+    parser.add_argument("--rows", type=int, default=10000, help="R")
+    parser.add_argument("--columns", type=int, default=10000, help="C")
+    parser.add_argument("--vehicles", type=int, default=400, help="F")
+    parser.add_argument("--rides", type=int, default=10000, help="N")
+    parser.add_argument("--bonus", type=int, default=2, help="B")
+    parser.add_argument("--steps", type=int, default=50000, help="T")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spatial", choices=SPATIAL_DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--hotspots", type=int, default=8)
+    parser.add_argument("--spread", type=int, help="hotspot standard deviation (default: min(R, C) / 40)")
+    parser.add_argument("--hot-fraction", type=float, default=0.8)
+    parser.add_argument("--length", choices=LENGTH_DISTRIBUTIONS, default="independent")
+    parser.add_argument("--mean-length", type=int, help="default: (R + C) / 6")
+    parser.add_argument("--slack", choices=SLACK_DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--mean-slack", type=int, help="default: T / 20")
+    args = parser.parse_args(argv[1:])
+
+    InstanceGenerator(args.rows, args.columns, args.vehicles, args.rides, args.bonus, args.steps, seed=args.seed,
+                      spatial=args.spatial, hotspots=args.hotspots, spread=args.spread,
+                      hot_fraction=args.hot_fraction, length=args.length, mean_length=args.mean_length,
+                      slack=args.slack, mean_slack=args.mean_slack).write(args.output)
+    print(args.output)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from instance_generator import InstanceGenerator
+from instance_loader import load_instance
+
+
+class TestInstanceGenerator(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def generate(self, name, **settings):
+        filename = os.path.join(self.directory, name)
+        InstanceGenerator(300, 200, 10, 70000, 5, 4000, **settings).write(filename)
+        return load_instance(filename, use_cache=False)
+
+    def test_rides_respect_the_problem_constraints(self):
+        for length in ("independent", "uniform", "exponential"):
+            header, rides = self.generate(length + ".in", seed=3, spatial="metropolis", length=length,
+                                          slack="exponential")
+            R, C, F, N, B, T = header
+            self.assertEqual((300, 200, 10, 70000, 5, 4000), header)
+            self.assertEqual((N, 6), rides.shape)
+            lengths = np.abs(rides[:, 0] - rides[:, 2]) + np.abs(rides[:, 1] - rides[:, 3])
+            self.assertTrue((rides[:, [0, 2]] < R).all() and (rides[:, [1, 3]] < C).all() and (rides >= 0).all())
+            self.assertTrue((rides[:, 4] < T).all() and (rides[:, 5] <= T).all())
+            self.assertTrue((rides[:, 5] >= rides[:, 4] + lengths).all())
+
+    def test_same_seed_same_instance(self):
+        first = self.generate("first.in", seed=9)[1]
+        second = self.generate("second.in", seed=9)[1]
+        third = self.generate("third.in", seed=10)[1]
+        self.assertTrue((first == second).all())
+        self.assertFalse((first == third).all())
+
+    def test_metropolis_starts_are_clustered(self):
+        uniform = self.generate("uniform.in", spatial="uniform")[1]
+        metropolis = self.generate("metropolis.in", spatial="metropolis", hotspots=2)[1]
+        busiest_cell = lambda rides: np.unique((rides[:, 0] // 10) * 1000 + rides[:, 1] // 10,
+                                               return_counts=True)[1].max()
+        self.assertGreater(busiest_cell(metropolis), 5 * busiest_cell(uniform))
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Credits: TheSpace team from Melpignano
+
+import hashlib
+import os
+
+import numpy as np
+
+CACHE_DIRECTORY = ".instance_cache"
+
+
+def parse_instance(problem_statement):
+    """Parses the text of a Self driving car problem.
+
+    returns:
+    header – (R, C, F, N, B, T)
+    rides – a contiguous (N, 6) int64 array, one row per ride:
+        a b x y s f (start row, start column, finish row, finish column,
+        earliest start, latest finish)
+    """
+    if isinstance(problem_statement, str):
+        problem_statement = problem_statement.encode()
+    values = np.fromstring(problem_statement, dtype=np.int64, sep=" ")
+    if len(values) < 6:
+        raise ValueError("The problem statement has no complete header")
+    header = tuple(int(val) for val in values[:6])
+    N = header[3]
+    if len(values) < 6 * (N + 1):
+        raise ValueError("The problem statement states " + str(N) + " rides but has fewer")
+
+    return header, values[6:6 * (N + 1)].reshape(N, 6)
+
+
+def load_instance(filename, use_cache=True):
+    """Reads a Self driving car problem file, see parse_instance.
+
+    The parsed instance is saved next to the file, in CACHE_DIRECTORY, as a
+    .npy sidecar named after the hash of the file content. Later loads of the
+    same content memory-map the sidecar instead of parsing the text.
+    """
+    with open(filename, "rb") as f:
+        problem_statement = f.read()
+    if not use_cache:
+        return parse_instance(problem_statement)
+
+    sidecar = sidecar_path(filename, problem_statement)
+    if os.path.exists(sidecar):
+        instance = np.load(sidecar, mmap_mode="r")
+        return tuple(int(val) for val in instance[0]), instance[1:]
+
+    header, rides = parse_instance(problem_statement)
+    instance = np.empty((len(rides) + 1, 6), dtype=np.int64)
+    instance[0] = header
+    instance[1:] = rides
+    try:
+        os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+        temporary_sidecar = sidecar + "." + str(os.getpid()) + ".tmp"
+        with open(temporary_sidecar, "wb") as f:
+            np.save(f, instance)
+        os.replace(temporary_sidecar, sidecar)
+    except OSError:
+        # A read only input directory only costs us the cache.
+        pass
+
+    return header, rides
+
+
+def sidecar_path(filename, problem_statement):
+    content_hash = hashlib.blake2b(problem_statement, digest_size=16).hexdigest()
+    directory, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(directory, CACHE_DIRECTORY, name + "." + content_hash + ".npy")
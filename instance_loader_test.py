@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from instance_loader import CACHE_DIRECTORY, load_instance, parse_instance
+
+
+class TestInstanceLoader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "tiny.in")
+        with open(self.filename, "w") as f:
+            f.write("3 4 2 3 2 10\n0 0 1 3 2 9\n1 2 1 0 0 9\n2 0 2 2 2 9\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_parse_instance(self):
+        header, rides = parse_instance("2 2 1 1 0 3\n0 0 1 1 0 2")
+        self.assertEqual((2, 2, 1, 1, 0, 3), header)
+        self.assertEqual([[0, 0, 1, 1, 0, 2]], rides.tolist())
+
+    def test_parse_instance_with_missing_rides(self):
+        with self.assertRaises(ValueError):
+            parse_instance("2 2 1 2 0 3\n0 0 1 1 0 2")
+
+    def test_load_instance_uses_the_sidecar(self):
+        header, rides = load_instance(self.filename)
+        sidecars = os.listdir(os.path.join(self.directory, CACHE_DIRECTORY))
+        self.assertEqual(1, len(sidecars))
+
+        cached_header, cached_rides = load_instance(self.filename)
+        self.assertEqual(header, cached_header)
+        self.assertTrue(isinstance(cached_rides, np.memmap))
+        self.assertEqual(rides.tolist(), cached_rides.tolist())
+
+    def test_changed_content_gets_a_new_sidecar(self):
+        load_instance(self.filename)
+        with open(self.filename, "a") as f:
+            f.write("\n")
+        header, rides = load_instance(self.filename)
+        self.assertEqual(2, len(os.listdir(os.path.join(self.directory, CACHE_DIRECTORY))))
+        self.assertEqual(3, len(rides))
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
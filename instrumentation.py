@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+import argparse
+import cProfile
+import inspect
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+
+class Instrumentation:
+    """Phase timers and counters of a solver run.
+
+    Solvers time their phases with `with instrumentation.phase(name):` and
+    add to counters with count(name, amount) once per phase, never per ride,
+    so that an instrumented run costs about the same as a plain one. With a
+    profile_directory every phase also runs under cProfile and its profile
+    is written to <profile_directory>/<phase>.prof; timings then include the
+    profiler overhead.
+    """
+
+    def __init__(self, profile_directory=None):
+        self.profile_directory = profile_directory
+        self.phases = {}
+        self.counters = {}
+
+    @contextmanager
+    def phase(self, name):
+        profile = cProfile.Profile() if self.profile_directory is not None else None
+        started_at = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started_at
+            if profile is not None:
+                os.makedirs(self.profile_directory, exist_ok=True)
+                profile.dump_stats(os.path.join(self.profile_directory, name + ".prof"))
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self):
+        return {"phases": dict(self.phases), "counters": dict(self.counters),
+                "profiled": self.profile_directory is not None}
+
+
+class NoInstrumentation:
+    """Stands in for Instrumentation when nobody is looking."""
+
+    @contextmanager
+    def phase(self, name):
+        yield
+
+    def count(self, name, amount=1):
+        pass
+
+
+NO_INSTRUMENTATION = NoInstrumentation()
+
+
+def instrumented_run(strategy, instance, output, instrumentation):
+    """Solves an instance and writes its output, with phases for the strategies that don't report their own."""
+    from carsandrides import load_strategy
+
+    module = load_strategy(strategy)
+    if "instrumentation" in inspect.signature(module.assign_rides_to_cars).parameters:
+        cars = module.assign_rides_to_cars(instance, instrumentation=instrumentation)
+    else:
+        with instrumentation.phase("solve"):
+            cars = module.assign_rides_to_cars(instance)
+    with instrumentation.phase("output"):
+        module.write_output_assignements(output, cars)
+    return cars
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Times the phases of a solver and reports them as JSON.")
+    parser.add_argument("instance", help="the .in file")
+    parser.add_argument("--strategy", default="v7", help="strategy name or module name")
+    parser.add_argument("--output", help="where to write the solution (default: files/<instance>.out)")
+    parser.add_argument("--json", help="write the report to this file instead of printing it")
+    parser.add_argument("--profile-dir", help="also write a cProfile file per phase to this directory")
+    args = parser.parse_args(argv[1:])
+
+    output = args.output or os.path.join("files", os.path.splitext(os.path.basename(args.instance))[0] + ".out")
+    instrumentation = Instrumentation(args.profile_dir)
+    instrumented_run(args.strategy, args.instance, output, instrumentation)
+
+    report = dict(instrumentation.report(), strategy=args.strategy, instance=args.instance, output=output)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from instrumentation import Instrumentation, instrumented_run
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output = os.path.join(self.directory, "b.out")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_v7_reports_its_phases_and_counters(self):
+        instrumentation = Instrumentation()
+        instrumented_run("v7", "files/b_should_be_easy.in", self.output, instrumentation)
+        report = instrumentation.report()
+        self.assertEqual(["parse", "sort", "unstarted_cars", "started_cars", "output"], list(report["phases"]))
+        # 100 unstarted cars, then the 100 cars are scored for each of the other 200 rides.
+        self.assertEqual(100 + 100 * 200, report["counters"]["score_for_ride"])
+        self.assertEqual(6, report["counters"]["infeasible_rides_skipped"])
+        self.assertFalse(report["profiled"])
+
+    def test_other_strategies_and_profiles(self):
+        profile_directory = os.path.join(self.directory, "profiles")
+        instrumentation = Instrumentation(profile_directory)
+        instrumented_run("v4", "files/a_example.in", self.output, instrumentation)
+        self.assertEqual(["solve", "output"], list(instrumentation.report()["phases"]))
+        self.assertEqual(["output.prof", "solve.prof"], sorted(os.listdir(profile_directory)))
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
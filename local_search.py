@@ -0,0 +1,432 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+import argparse
+import bisect
+import math
+import random
+import sys
+import time
+
+from bounds import target_score, upper_bounds
+from checkpoint import Checkpoint, load_checkpoint
+from instance_loader import load_instance
+from solution_format import read_routes
+
+
+class Problem:
+    """Ride data of an instance as plain Python lists, for fast scalar access."""
+
+    def __init__(self, header, rides):
+        self.R, self.C, self.F, self.N, self.B, self.T = header
+        self.start_r, self.start_c, self.end_r, self.end_c, self.earliest_start, self.latest_finish = \
+            [list(column) for column in zip(*rides.tolist())] if len(rides) else [[]] * 6
+        self.length = [abs(self.start_r[i] - self.end_r[i]) + abs(self.start_c[i] - self.end_c[i])
+                       for i in range(self.N)]
+
+
+class Route:
+    """The rides of one car, with their timing cached per position.
+
+    arrival[k] is the step at which the car reaches the start of its k-th
+    ride, free[k] the step at which it is free again after it, and prefix[k]
+    the score of the rides before position k. The scoring rules are those of
+    ScoreSubmissionComputer.
+    """
+
+    def __init__(self, problem, rides):
+        self.problem = problem
+        self.rides = list(rides)
+        self.arrival = []
+        self.free = []
+        self.prefix = [0]
+        self.retime(0)
+
+    def __len__(self):
+        return len(self.rides)
+
+    def score(self):
+        return self.prefix[-1]
+
+    def state_before(self, position):
+        """Returns the (free step, row, column) of the car before its position-th ride."""
+        if position == 0:
+            return 0, 0, 0
+        ride = self.rides[position - 1]
+        return self.free[position - 1], self.problem.end_r[ride], self.problem.end_c[ride]
+
+    def retime(self, position):
+        """Recomputes the cached timing of the rides from position on."""
+        problem = self.problem
+        del self.arrival[position:]
+        del self.free[position:]
+        del self.prefix[position + 1:]
+        free, r, c = self.state_before(position)
+        score = self.prefix[position]
+        for ride in self.rides[position:]:
+            arrival = free + abs(r - problem.start_r[ride]) + abs(c - problem.start_c[ride])
+            free = max(arrival, problem.earliest_start[ride]) + problem.length[ride]
+            score = score + ride_score(problem, ride, arrival, free)
+            self.arrival.append(arrival)
+            self.free.append(free)
+            self.prefix.append(score)
+            r, c = problem.end_r[ride], problem.end_c[ride]
+
+    def rescore(self, position, inserted, resume):
+        """Returns the score of rides[:position] + inserted + rides[resume:].
+
+        Only the changed part of the route is re-timed. Once an old ride is
+        reached at the same step as before, or the car would still wait for
+        its earliest start as it did before (the delay fits in its slack),
+        the rest of the route scores as cached.
+        """
+        problem = self.problem
+        score = self.prefix[position]
+        free, r, c = self.state_before(position)
+        for ride in inserted:
+            arrival = free + abs(r - problem.start_r[ride]) + abs(c - problem.start_c[ride])
+            free = max(arrival, problem.earliest_start[ride]) + problem.length[ride]
+            score = score + ride_score(problem, ride, arrival, free)
+            r, c = problem.end_r[ride], problem.end_c[ride]
+
+        same_predecessor = len(inserted) == 0 and position == resume
+        for k in range(resume, len(self.rides)):
+            ride = self.rides[k]
+            arrival = free + abs(r - problem.start_r[ride]) + abs(c - problem.start_c[ride])
+            if same_predecessor and (arrival == self.arrival[k] or self.__absorbs_delay(ride, arrival, self.arrival[k])):
+                return score + self.prefix[-1] - self.prefix[k]
+            free = max(arrival, problem.earliest_start[ride]) + problem.length[ride]
+            score = score + ride_score(problem, ride, arrival, free)
+            r, c = problem.end_r[ride], problem.end_c[ride]
+            same_predecessor = True
+
+        return score
+
+    def __absorbs_delay(self, ride, arrival, cached_arrival):
+        # Both arrivals wait for the earliest start, so the car is free at the
+        # same step and gets the bonus either way.
+        problem = self.problem
+        on_time_by = problem.latest_finish[ride] - problem.length[ride]
+        return arrival <= problem.earliest_start[ride] and cached_arrival <= problem.earliest_start[ride] and \
+            (arrival < on_time_by) == (cached_arrival < on_time_by)
+
+    def replace(self, position, inserted, resume):
+        """Turns the route into rides[:position] + inserted + rides[resume:]."""
+        self.rides[position:resume] = inserted
+        self.retime(position)
+
+    def position_for(self, earliest_start):
+        """Returns the position at which a ride starting at earliest_start fits in time."""
+        return bisect.bisect_right(self.free, earliest_start)
+
+
+def ride_score(problem, ride, arrival, free):
+    length = problem.length[ride]
+    if arrival + length < problem.latest_finish[ride] and free <= problem.T:
+        if arrival <= problem.earliest_start[ride]:
+            return length + problem.B
+        return length
+    return 0
+
+
+class Move:
+    """A change to one or two routes, with the score it gains.
+
+    changes are (route index, position, inserted rides, resume) as for
+    Route.replace; taken and released are the rides that leave and join the
+    pool of unassigned rides.
+    """
+
+    def __init__(self, kind, delta, changes, taken=(), released=()):
+        self.kind = kind
+        self.delta = delta
+        self.changes = changes
+        self.taken = taken
+        self.released = released
+
+
+class LocalSearch:
+    """Improves routes with relocate, swap, 2-opt* and insertion moves.
+
+    Every move is scored with Route.rescore, which re-times only the part of
+    the affected routes after the change. Moves are drawn at random and
+    applied when they gain score; ejecting a ride that scores nothing is also
+    applied when it loses nothing, since it frees the car for other rides.
+    """
+
+    MOVES = ("relocate", "swap", "two_opt_star", "insert", "eject")
+
+    def __init__(self, problem, routes, seed=0):
+        self.problem = problem
+        routes = [list(rides) for rides in routes]
+        routes.extend([] for _ in range(problem.F - len(routes)))
+        self.routes = [Route(problem, rides) for rides in routes]
+        assigned = set(ride for rides in routes for ride in rides)
+        self.unassigned = [ride for ride in range(problem.N) if ride not in assigned]
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.score = sum(route.score() for route in self.routes)
+        self.iterations = 0
+        self.tried = dict.fromkeys(self.MOVES, 0)
+        self.accepted = dict.fromkeys(self.MOVES, 0)
+        self.gained = dict.fromkeys(self.MOVES, 0)
+
+    def solution(self):
+        return [list(route.rides) for route in self.routes]
+
+    def state(self):
+        """Returns what resume needs to carry on the search, as JSON-friendly values."""
+        version, internal_state, gauss = self.random.getstate()
+        return {"seed": self.seed, "iterations": self.iterations,
+                "random_state": [version, list(internal_state), gauss],
+                "unassigned": self.unassigned, "tried": self.tried, "accepted": self.accepted, "gained": self.gained}
+
+    @classmethod
+    def resume(cls, problem, state):
+        """Returns the search saved with state() and the routes of a checkpoint."""
+        search = cls(problem, state["routes"], state["seed"])
+        version, internal_state, gauss = state["random_state"]
+        search.random.setstate((version, tuple(internal_state), gauss))
+        search.iterations = state["iterations"]
+        search.unassigned = list(state["unassigned"])
+        search.tried.update(state["tried"])
+        search.accepted.update(state["accepted"])
+        search.gained.update(state["gained"])
+        return search
+
+    def propose(self, kind=None):
+        """Draws a random move of the given kind, or None when there is none to draw."""
+        kind = kind or self.random.choice(self.MOVES)
+        self.tried[kind] = self.tried[kind] + 1
+        return getattr(self, "_propose_" + kind)()
+
+    def apply(self, move):
+        for route_index, position, inserted, resume in move.changes:
+            self.routes[route_index].replace(position, inserted, resume)
+        for ride in move.taken:
+            self.unassigned.remove(ride)
+        self.unassigned.extend(move.released)
+        self.score = self.score + move.delta
+        self.accepted[move.kind] = self.accepted[move.kind] + 1
+        self.gained[move.kind] = self.gained[move.kind] + move.delta
+
+    def improve(self, time_budget, deadline=None, checkpoint=None, target_score=None):
+        """Applies improving moves for time_budget seconds and returns statistics.
+
+        The search stops early once the score reaches target_score. With a
+        Checkpoint, the routes and the search state are saved whenever it is
+        due, and always at the end.
+        """
+        started_at = time.time()
+        deadline = min(deadline or float("inf"), started_at + time_budget)
+        target_score = target_score if target_score is not None else float("inf")
+        initial_score = self.score
+        iterations = 0
+        while self.score < target_score and (iterations % 256 != 0 or time.time() < deadline):
+            if iterations % 256 == 0 and checkpoint is not None and checkpoint.due(self.score):
+                checkpoint.save(self.score, self.solution(), self.state())
+            iterations = iterations + 1
+            self.iterations = self.iterations + 1
+            move = self.propose()
+            if move is not None and (move.delta > 0 or (move.delta == 0 and move.kind == "eject")):
+                self.apply(move)
+        if checkpoint is not None:
+            checkpoint.save(self.score, self.solution(), self.state())
+
+        elapsed = time.time() - started_at
+        return {
+            "initial_score": initial_score,
+            "score": self.score,
+            "gained": self.score - initial_score,
+            "elapsed": elapsed,
+            "score_per_second": (self.score - initial_score) / elapsed if elapsed > 0 else 0.0,
+            "iterations": iterations,
+            "moves": dict((kind, {"tried": self.tried[kind], "accepted": self.accepted[kind],
+                                  "gained": self.gained[kind]}) for kind in self.MOVES),
+        }
+
+    def anneal(self, time_budget, start_temperature, end_temperature, deadline=None, target_score=None):
+        """Runs simulated annealing for time_budget seconds and returns the best (score, solution) seen.
+
+        The temperature falls geometrically from start_temperature to
+        end_temperature over the budget, and a move that loses score is
+        applied with probability exp(delta / temperature). The search stops
+        early once the best score reaches target_score.
+        """
+        started_at = time.time()
+        deadline = min(deadline or float("inf"), started_at + time_budget)
+        target_score = target_score if target_score is not None else float("inf")
+        best_score, best_solution = self.score, self.solution()
+        temperature = start_temperature
+        iterations = 0
+        while best_score < target_score and (iterations % 256 != 0 or time.time() < deadline):
+            if iterations % 256 == 0:
+                progress = min(1.0, (time.time() - started_at) / max(deadline - started_at, 1e-9))
+                temperature = start_temperature * (end_temperature / start_temperature) ** progress
+            iterations = iterations + 1
+            self.iterations = self.iterations + 1
+            move = self.propose()
+            if move is None:
+                continue
+            if move.delta >= 0 or self.random.random() < math.exp(move.delta / temperature):
+                self.apply(move)
+                if self.score > best_score:
+                    best_score, best_solution = self.score, self.solution()
+        return best_score, best_solution
+
+    def perturb(self, count):
+        """Applies count random moves whatever they gain or lose."""
+        for _ in range(count):
+            move = self.propose()
+            if move is not None:
+                self.apply(move)
+
+    def _random_ride(self):
+        route_index = self.random.randrange(len(self.routes))
+        route = self.routes[route_index]
+        if len(route) == 0:
+            return None
+        return route_index, self.random.randrange(len(route))
+
+    def _other_route(self, route_index):
+        other_route_index = self.random.randrange(len(self.routes) - 1)
+        return other_route_index + 1 if other_route_index >= route_index else other_route_index
+
+    def _two_route_delta(self, first_index, first_change, second_index, second_change):
+        first, second = self.routes[first_index], self.routes[second_index]
+        return first.rescore(*first_change) + second.rescore(*second_change) - first.score() - second.score()
+
+    def _propose_relocate(self):
+        picked = self._random_ride()
+        if picked is None:
+            return None
+        route_index, position = picked
+        route = self.routes[route_index]
+        ride = route.rides[position]
+        target_index = self.random.randrange(len(self.routes))
+        target = self.routes[target_index]
+        target_position = target.position_for(self.problem.earliest_start[ride])
+
+        if target_index == route_index:
+            rides = route.rides[:position] + route.rides[position + 1:]
+            target_position = min(target_position, len(rides))
+            rides.insert(target_position, ride)
+            first, resume = min(position, target_position), max(position, target_position) + 1
+            change = (first, rides[first:resume], resume)
+            return Move("relocate", route.rescore(*change) - route.score(), [(route_index,) + change])
+
+        removal = (position, [], position + 1)
+        insertion = (target_position, [ride], target_position)
+        delta = self._two_route_delta(route_index, removal, target_index, insertion)
+        return Move("relocate", delta, [(route_index,) + removal, (target_index,) + insertion])
+
+    def _propose_swap(self):
+        picked = self._random_ride()
+        if picked is None or len(self.routes) < 2:
+            return None
+        route_index, position = picked
+        ride = self.routes[route_index].rides[position]
+        target_index = self._other_route(route_index)
+        target = self.routes[target_index]
+        if len(target) == 0:
+            return None
+        target_position = min(target.position_for(self.problem.earliest_start[ride]), len(target) - 1)
+        target_ride = target.rides[target_position]
+
+        change = (position, [target_ride], position + 1)
+        target_change = (target_position, [ride], target_position + 1)
+        delta = self._two_route_delta(route_index, change, target_index, target_change)
+        return Move("swap", delta, [(route_index,) + change, (target_index,) + target_change])
+
+    def _propose_two_opt_star(self):
+        if len(self.routes) < 2:
+            return None
+        route_index = self.random.randrange(len(self.routes))
+        route = self.routes[route_index]
+        position = self.random.randrange(len(route) + 1)
+        target_index = self._other_route(route_index)
+        target = self.routes[target_index]
+        target_position = target.position_for(route.state_before(position)[0])
+
+        change = (position, target.rides[target_position:], len(route))
+        target_change = (target_position, route.rides[position:], len(target))
+        delta = self._two_route_delta(route_index, change, target_index, target_change)
+        return Move("two_opt_star", delta, [(route_index,) + change, (target_index,) + target_change])
+
+    def _propose_insert(self):
+        if len(self.unassigned) == 0:
+            return None
+        ride = self.unassigned[self.random.randrange(len(self.unassigned))]
+        route_index = self.random.randrange(len(self.routes))
+        route = self.routes[route_index]
+        position = route.position_for(self.problem.earliest_start[ride])
+
+        change = (position, [ride], position)
+        return Move("insert", route.rescore(*change) - route.score(), [(route_index,) + change], taken=(ride,))
+
+    def _propose_eject(self):
+        picked = self._random_ride()
+        if picked is None:
+            return None
+        route_index, position = picked
+        route = self.routes[route_index]
+        if route.prefix[position + 1] != route.prefix[position]:
+            return None
+
+        change = (position, [], position + 1)
+        return Move("eject", route.rescore(*change) - route.score(), [(route_index,) + change],
+                    released=(route.rides[position],))
+
+
+def improve_cars(cars, filename, time_budget, seed=0):
+    """Improves the assigned_rides of the cars of a solved instance in place."""
+    problem = Problem(*load_instance(filename))
+    search = LocalSearch(problem, [car.assigned_rides for car in cars], seed)
+    statistics = search.improve(time_budget)
+    for car, rides in zip(cars, search.solution()):
+        car.assigned_rides = rides
+    return statistics
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Improves a solution with local search.")
+    parser.add_argument("instance", help="the .in file")
+    parser.add_argument("solution", help="the .out file to improve")
+    parser.add_argument("--output", help="where to write the improved solution (default: overwrite it)")
+    parser.add_argument("--time-budget", type=float, default=10.0, help="seconds of search")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint-interval", type=float, default=60.0,
+                        help="seconds between saves of the best solution so far")
+    parser.add_argument("--checkpoint-gain", type=int, help="also save as soon as the score gains this much")
+    parser.add_argument("--resume", action="store_true", help="carry on from the checkpoint of the output")
+    parser.add_argument("--target-gap", type=float,
+                        help="stop once within this fraction of the upper bound, e.g. 0.01")
+    args = parser.parse_args(argv[1:])
+
+    header, rides = load_instance(args.instance)
+    problem = Problem(header, rides)
+    target = target_score(upper_bounds(header, rides)["best"], args.target_gap) if args.target_gap is not None \
+        else None
+    output = args.output or args.solution
+    state = load_checkpoint(output) if args.resume else None
+    if state is not None:
+        search = LocalSearch.resume(problem, state)
+    else:
+        search = LocalSearch(problem, read_routes(args.solution), args.seed)
+    statistics = search.improve(args.time_budget,
+                                checkpoint=Checkpoint(output, args.checkpoint_interval, args.checkpoint_gain),
+                                target_score=target)
+
+    print("Score: " + str(statistics["initial_score"]) + " -> " + str(statistics["score"]) +
+          " (+" + str(statistics["gained"]) + " in " + "%.1f" % statistics["elapsed"] + "s, " +
+          "%.1f" % statistics["score_per_second"] + " per second)")
+    for kind, counts in statistics["moves"].items():
+        print("  " + kind + ": " + str(counts["accepted"]) + "/" + str(counts["tried"]) +
+              " accepted, +" + str(counts["gained"]))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import random
+import sys
+import time
+import unittest
+
+from instance_loader import load_instance
+from local_search import LocalSearch, Problem, Route, read_routes
+from score_submission import VectorizedScoreSubmissionComputer
+
+
+def as_submission(routes):
+    return "\n".join(str(len(rides)) + " " + " ".join(map(str, rides)) for rides in routes)
+
+
+class TestRoute(unittest.TestCase):
+    def test_rescore_matches_a_full_retime(self):
+        problem = Problem(*load_instance("files/b_should_be_easy.in"))
+        generator = random.Random(2)
+        for _ in range(300):
+            rides = generator.sample(range(problem.N), generator.randint(0, 12))
+            route = Route(problem, rides)
+            position = generator.randint(0, len(rides))
+            resume = generator.randint(position, len(rides))
+            inserted = generator.sample([ride for ride in range(problem.N) if ride not in rides],
+                                        generator.randint(0, 2))
+            expected = Route(problem, rides[:position] + inserted + rides[resume:]).score()
+            self.assertEqual(expected, route.rescore(position, inserted, resume))
+
+            route.replace(position, inserted, resume)
+            self.assertEqual(expected, route.score())
+
+
+class TestLocalSearch(unittest.TestCase):
+    def test_improves_and_keeps_scores_consistent(self):
+        problem = Problem(*load_instance("files/b_should_be_easy.in"))
+        routes = read_routes("score_submission_test_files/b_should_be_easy_176877.out")
+        search = LocalSearch(problem, [rides[:len(rides) // 2] for rides in routes], seed=4)
+        initial_score = search.score
+        statistics = search.improve(0.5)
+
+        scorer = VectorizedScoreSubmissionComputer(open("files/b_should_be_easy.in").read())
+        self.assertEqual(statistics["score"], scorer.compute(as_submission(search.solution())))
+        self.assertGreater(search.score, initial_score)
+
+        assigned = [ride for rides in search.solution() for ride in rides]
+        self.assertEqual(len(assigned), len(set(assigned)))
+        self.assertEqual(set(range(problem.N)), set(assigned) | set(search.unassigned))
+
+    def test_anneal_returns_its_best_solution(self):
+        problem = Problem(*load_instance("files/b_should_be_easy.in"))
+        routes = read_routes("score_submission_test_files/b_should_be_easy_176877.out")
+        search = LocalSearch(problem, [rides[:len(rides) // 2] for rides in routes], seed=4)
+        initial_score = search.score
+        best_score, best_routes = search.anneal(0.5, 50.0, 0.5)
+
+        scorer = VectorizedScoreSubmissionComputer(open("files/b_should_be_easy.in").read())
+        self.assertEqual(best_score, scorer.compute(as_submission(best_routes)))
+        self.assertGreater(best_score, initial_score)
+        self.assertGreaterEqual(best_score, search.score)
+
+    def test_stops_at_the_target_score(self):
+        problem = Problem(*load_instance("files/b_should_be_easy.in"))
+        routes = read_routes("score_submission_test_files/b_should_be_easy_176877.out")
+        search = LocalSearch(problem, [rides[:len(rides) // 2] for rides in routes], seed=4)
+        target = search.score + 1000
+        started_at = time.time()
+        statistics = search.improve(30.0, target_score=target)
+        self.assertLess(time.time() - started_at, 10.0)
+        self.assertGreaterEqual(statistics["score"], target)
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
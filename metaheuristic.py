@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+from bounds import target_score, upper_bounds
+from carsandrides import load_strategy
+from checkpoint import Checkpoint, load_checkpoint
+from instance_loader import load_instance
+from local_search import LocalSearch, Problem
+from solution_format import read_routes
+
+METHODS = ("anneal", "iterated")
+
+# Problems already loaded by this process, by instance path.
+problems = {}
+
+
+def problem_for(instance):
+    if instance not in problems:
+        problems[instance] = Problem(*load_instance(instance))
+    return problems[instance]
+
+
+def seed_routes(instance, strategy=None, solution=None):
+    """Returns the routes to start from: a previous solution, in either format, or what a strategy assigns."""
+    if solution is not None:
+        return read_routes(solution)
+    return [list(car.assigned_rides) for car in load_strategy(strategy).assign_rides_to_cars(instance)]
+
+
+def run_chain(task):
+    """Runs one chain from routes until its deadline, or its target score, and returns its best (score, routes).
+
+    "anneal" runs simulated annealing between the two temperatures of the
+    task. "iterated" alternates `period` seconds of local search with
+    `perturbation` random moves, going back to the best routes whenever the
+    search ends below them.
+    """
+    instance, routes, method, seed, deadline, start_temperature, end_temperature, period, perturbation, target = task
+    search = LocalSearch(problem_for(instance), routes, seed)
+    if method == "anneal":
+        return search.anneal(deadline - time.time(), start_temperature, end_temperature, deadline, target)
+
+    target = target if target is not None else float("inf")
+    best_score, best_routes = search.score, search.solution()
+    while best_score < target and time.time() < deadline:
+        search.improve(min(period, deadline - time.time()), deadline, target_score=target)
+        if search.score > best_score:
+            best_score, best_routes = search.score, search.solution()
+        elif search.score < best_score:
+            search = LocalSearch(search.problem, best_routes, search.random.randrange(1 << 30))
+        search.perturb(perturbation)
+    return best_score, best_routes
+
+
+class Metaheuristic:
+    """Runs independent search chains on a process pool within a wall-clock budget.
+
+    The budget is cut in epochs of sync_interval seconds. Every chain runs
+    an epoch with its own seed, then all of them restart from the best
+    routes any chain found so far. The chains evaluate moves with
+    Route.rescore, so a move only re-times the route suffix it changes.
+    A chain that is still running when the budget is over is terminated and
+    the best routes of the epochs before are returned. With a target_score,
+    typically target_score(bound, gap) from bounds, the search also stops as
+    soon as a chain reaches it.
+    """
+
+    def __init__(self, instance, method="anneal", processes=None, sync_interval=10.0, start_temperature=None,
+                 end_temperature=0.5, period=1.0, perturbation=20, seed=0, target_score=None):
+        if method not in METHODS:
+            raise ValueError("Unknown method " + method)
+        self.instance = instance
+        self.method = method
+        self.processes = processes or os.cpu_count() or 1
+        self.sync_interval = sync_interval
+        problem = problem_for(instance)
+        self.start_temperature = start_temperature or max(1.0, sum(problem.length) / max(1, problem.N) / 4.0)
+        self.end_temperature = min(end_temperature, self.start_temperature)
+        self.period = period
+        self.perturbation = perturbation
+        self.seed = seed
+        self.target_score = target_score
+
+    def run(self, routes, deadline, checkpoint=None, epoch=0, history=None):
+        """Searches from routes until deadline and returns the best (score, routes) and the score per epoch.
+
+        With a Checkpoint, the best routes and the epoch are saved whenever it
+        is due, and always at the end; resume passes back the epoch and the
+        history of a checkpoint so the chains carry on with fresh seeds.
+        """
+        best_routes = [list(rides) for rides in routes]
+        best_score = LocalSearch(problem_for(self.instance), best_routes).score
+        history = list(history or [best_score])
+        started_at = time.time()
+        pool = multiprocessing.Pool(self.processes)
+        try:
+            while time.time() < deadline and not self.reached(best_score):
+                epoch_start = time.time()
+                epoch_deadline = min(deadline, epoch_start + self.sync_interval)
+                tasks = [(self.instance, best_routes, self.method, self.seed + epoch * self.processes + chain,
+                          epoch_deadline, self.__temperature(epoch_start, started_at, deadline),
+                          self.__temperature(epoch_deadline, started_at, deadline), self.period, self.perturbation,
+                          self.target_score)
+                         for chain in range(self.processes)]
+                try:
+                    results = pool.map_async(run_chain, tasks).get(max(0.0, deadline - time.time()) + 1.0)
+                except multiprocessing.TimeoutError:
+                    break
+                score, chain_routes = max(results, key=lambda result: result[0])
+                if score > best_score:
+                    best_score, best_routes = score, chain_routes
+                history.append(best_score)
+                epoch = epoch + 1
+                if checkpoint is not None and checkpoint.due(best_score):
+                    checkpoint.save(best_score, best_routes, self.state(epoch, history))
+        finally:
+            pool.terminate()
+            pool.join()
+        if checkpoint is not None:
+            checkpoint.save(best_score, best_routes, self.state(epoch, history))
+        return best_score, best_routes, history
+
+    def reached(self, score):
+        return self.target_score is not None and score >= self.target_score
+
+    def state(self, epoch, history):
+        return {"instance": self.instance, "method": self.method, "seed": self.seed, "epoch": epoch,
+                "history": history}
+
+    def __temperature(self, at, started_at, deadline):
+        progress = min(1.0, (at - started_at) / max(deadline - started_at, 1e-9))
+        return self.start_temperature * (self.end_temperature / self.start_temperature) ** progress
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Improves a solution with parallel metaheuristic chains.")
+    parser.add_argument("instance", help="the .in file")
+    parser.add_argument("--strategy", default="v7", help="strategy that builds the starting solution")
+    parser.add_argument("--solution", help="start from this .out file instead")
+    parser.add_argument("--output", help="where to write the solution (default: files/<instance>.out)")
+    parser.add_argument("--method", choices=METHODS, default="anneal")
+    parser.add_argument("--time-budget", type=float, default=60.0, help="wall-clock seconds, seeding included")
+    parser.add_argument("--processes", type=int, help="chains run in parallel (default: one per CPU)")
+    parser.add_argument("--sync-interval", type=float, default=10.0, help="seconds between best solution shares")
+    parser.add_argument("--start-temperature", type=float, help="default: a quarter of the mean ride length")
+    parser.add_argument("--end-temperature", type=float, default=0.5)
+    parser.add_argument("--period", type=float, default=1.0, help="seconds of local search between perturbations")
+    parser.add_argument("--perturbation", type=int, default=20, help="random moves per perturbation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint-interval", type=float, default=60.0,
+                        help="seconds between saves of the best solution so far")
+    parser.add_argument("--checkpoint-gain", type=int, help="also save as soon as the score gains this much")
+    parser.add_argument("--resume", action="store_true", help="carry on from the checkpoint of the output")
+    parser.add_argument("--target-gap", type=float,
+                        help="stop once within this fraction of the upper bound, e.g. 0.01")
+    args = parser.parse_args(argv[1:])
+
+    deadline = time.time() + args.time_budget
+    output = args.output or os.path.join("files", os.path.splitext(os.path.basename(args.instance))[0] + ".out")
+    state = load_checkpoint(output) if args.resume else None
+    if state is not None:
+        routes, epoch, history = state["routes"], state["epoch"], state["history"]
+    else:
+        routes, epoch, history = seed_routes(args.instance, args.strategy, args.solution), 0, None
+    target = None
+    if args.target_gap is not None:
+        target = target_score(upper_bounds(*load_instance(args.instance))["best"], args.target_gap)
+    metaheuristic = Metaheuristic(args.instance, args.method, args.processes, args.sync_interval,
+                                  args.start_temperature, args.end_temperature, args.period, args.perturbation,
+                                  args.seed, target)
+    score, routes, history = metaheuristic.run(routes, deadline,
+                                               Checkpoint(output, args.checkpoint_interval, args.checkpoint_gain),
+                                               epoch, history)
+
+    print("Score: " + " -> ".join(map(str, history)))
+    print(output + " " + str(score))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
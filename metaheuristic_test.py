@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+from checkpoint import Checkpoint, load_checkpoint
+from local_search import LocalSearch
+from metaheuristic import Metaheuristic, problem_for, seed_routes
+from score_submission import VectorizedScoreSubmissionComputer
+from solution_format import read_routes
+
+
+def as_submission(routes):
+    return "\n".join(str(len(rides)) + " " + " ".join(map(str, rides)) for rides in routes)
+
+
+class TestMetaheuristic(unittest.TestCase):
+    instance = "files/b_should_be_easy.in"
+
+    def test_seed_routes(self):
+        solution = "score_submission_test_files/b_should_be_easy_176877.out"
+        self.assertEqual(read_routes(solution), seed_routes(self.instance, solution=solution))
+        self.assertEqual(100, len(seed_routes(self.instance, "v7")))
+
+    def test_chains_improve_within_the_budget(self):
+        routes = [rides[:len(rides) // 2] for rides in seed_routes(self.instance, "v7")]
+        scorer = VectorizedScoreSubmissionComputer(open(self.instance).read())
+        for method in ("anneal", "iterated"):
+            started_at = time.time()
+            score, best_routes, history = Metaheuristic(self.instance, method, processes=2, sync_interval=0.5,
+                                                        period=0.2).run(routes, started_at + 1.5)
+            self.assertLess(time.time() - started_at, 3.0)
+            self.assertEqual(score, scorer.compute(as_submission(best_routes)))
+            self.assertGreater(score, scorer.compute(as_submission(routes)))
+            self.assertEqual(sorted(history), history)
+
+    def test_stops_at_the_target_score(self):
+        routes = [rides[:len(rides) // 2] for rides in seed_routes(self.instance, "v7")]
+        target = LocalSearch(problem_for(self.instance), routes).score + 1000
+        started_at = time.time()
+        score, _, history = Metaheuristic(self.instance, "iterated", processes=1, sync_interval=5.0, period=0.1,
+                                          target_score=target).run(routes, started_at + 30.0)
+        self.assertLess(time.time() - started_at, 10.0)
+        self.assertGreaterEqual(score, target)
+        self.assertEqual(2, len(history))
+
+    def test_checkpoint_and_resume(self):
+        directory = tempfile.mkdtemp()
+        try:
+            solution = os.path.join(directory, "b.out")
+            routes = [rides[:len(rides) // 2] for rides in seed_routes(self.instance, "v7")]
+            metaheuristic = Metaheuristic(self.instance, "iterated", processes=1, sync_interval=0.3, period=0.1)
+            score, _, history = metaheuristic.run(routes, time.time() + 1.0, Checkpoint(solution, interval=0.0))
+            state = load_checkpoint(solution)
+            self.assertEqual((score, history, len(history) - 1), (state["score"], state["history"], state["epoch"]))
+            self.assertEqual(state["routes"], read_routes(solution))
+
+            resumed_score, _, resumed_history = metaheuristic.run(state["routes"], time.time() + 0.7,
+                                                                  Checkpoint(solution), state["epoch"],
+                                                                  state["history"])
+            self.assertEqual(history, resumed_history[:len(history)])
+            self.assertGreater(load_checkpoint(solution)["epoch"], state["epoch"])
+        finally:
+            shutil.rmtree(directory)
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+import argparse
+import heapq
+import json
+import random
+import sys
+import time
+
+from fleet import PrunedFleet, UNDOABLE_SCORE
+from self_driving_cars_and_rides_v7 import Ride
+
+
+class Car:
+    """A car of an online fleet: where and when it is next free, but not the rides it took."""
+
+    __slots__ = ("next_r", "next_c", "__free_by_step")
+
+    def __init__(self):
+        self.next_r = 0
+        self.next_c = 0
+        self.__free_by_step = 0
+
+    def free_by_step(self):
+        return self.__free_by_step
+
+    def assign_ride(self, ride):
+        arriving_at = self.__free_by_step + abs(self.next_r - ride.start_r) + abs(self.next_c - ride.start_c)
+        self.__free_by_step = max(arriving_at, ride.earliest_start) + ride.length()
+        self.next_r = ride.end_r
+        self.next_c = ride.end_c
+
+
+class LatencySample:
+    """Decision latencies in seconds, in a uniform reservoir sample of at most size of them."""
+
+    def __init__(self, size=4096, seed=0):
+        self.size = size
+        self.samples = []
+        self.count = 0
+        self.maximum = 0.0
+        self.random = random.Random(seed)
+
+    def add(self, latency):
+        self.count = self.count + 1
+        self.maximum = max(self.maximum, latency)
+        if len(self.samples) < self.size:
+            self.samples.append(latency)
+        else:
+            position = self.random.randrange(self.count)
+            if position < self.size:
+                self.samples[position] = latency
+
+    def percentiles(self, percents=(50, 90, 99)):
+        """Returns {"p50": seconds, ..., "max": seconds}, estimated from the sample."""
+        ordered = sorted(self.samples)
+        report = dict(("p" + str(percent),
+                       ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100.0))] if ordered else 0.0)
+                      for percent in percents)
+        report["max"] = self.maximum
+        return report
+
+
+class OnlineDispatcher:
+    """Dispatches an endless feed of rides to a fleet of F cars with bounded memory.
+
+    The feed is expected to come roughly in order of earliest_start: no
+    ride comes more than `lateness` steps behind the largest earliest_start
+    seen so far, the watermark. A ride is decided as soon as the watermark
+    has passed it by `lateness` steps, since no ride still to come can be
+    due before it, so on a sorted feed and the default lateness of 0 every
+    ride is decided as it comes, however long the feed then pauses. At
+    most `window` rides are kept pending: when more are, the one with the
+    smallest earliest_start is decided at once, and a ride that comes later
+    than promised is decided when it is the earliest of the window.
+
+    A ride goes to the car PrunedFleet picks, as in v8, and the decision is
+    handed out at once: nothing but the window, the position and free step
+    of every car and samples of latencies is kept, however many rides
+    stream through. latencies holds the time spent choosing a car, and
+    waits the time rides spent pending before that.
+    """
+
+    def __init__(self, F, window=64, lateness=0, latency_samples=4096, seed=0):
+        self.fleet = PrunedFleet([Car() for _ in range(F)])
+        self.window = window
+        self.lateness = lateness
+        self.watermark = None
+        self.pending = []
+        self.latencies = LatencySample(latency_samples, seed)
+        self.waits = LatencySample(latency_samples, seed)
+        self.decided = 0
+        self.assigned = 0
+
+    def push(self, ride):
+        """Adds a ride to the window and returns the (ride index, car) decisions it lets out."""
+        heapq.heappush(self.pending, (ride.earliest_start, ride.index, time.perf_counter(), ride))
+        if self.watermark is None or ride.earliest_start > self.watermark:
+            self.watermark = ride.earliest_start
+        decisions = []
+        while len(self.pending) > self.window or \
+                (self.pending and self.pending[0][0] + self.lateness <= self.watermark):
+            decisions.append(self.__decide())
+        return decisions
+
+    def flush(self):
+        """Decides every pending ride, once the feed is over."""
+        return [self.__decide() for _ in range(len(self.pending))]
+
+    def dispatch(self, rides):
+        """Yields the (ride index, car) decisions of a feed of rides; car is -1 for a ride no car can do."""
+        for ride in rides:
+            for decision in self.push(ride):
+                yield decision
+        for decision in self.flush():
+            yield decision
+
+    def report(self):
+        return {"decided": self.decided, "assigned": self.assigned, "pending": len(self.pending),
+                "latency": self.latencies.percentiles(), "wait": self.waits.percentiles()}
+
+    def __decide(self):
+        _, _, received_at, ride = heapq.heappop(self.pending)
+        started_at = time.perf_counter()
+        slot, score = self.fleet.best_car_for_ride(ride)
+        if score < UNDOABLE_SCORE:
+            self.fleet.assign_ride(slot, ride)
+            self.assigned = self.assigned + 1
+        else:
+            slot = -1
+        self.decided = self.decided + 1
+        self.latencies.add(time.perf_counter() - started_at)
+        self.waits.add(started_at - received_at)
+        return ride.index, slot
+
+
+def read_feed(lines):
+    """Reads a problem from lines as it comes: returns the header and an iterator of Rides.
+
+    The header is the usual R C F N B T line; N is not used, the feed ends
+    with the lines. Rides are numbered in the order they come.
+    """
+    lines = iter(lines)
+    header = None
+    for line in lines:
+        if line.strip():
+            header = tuple(int(value) for value in line.split())
+            break
+    if header is None or len(header) != 6:
+        raise ValueError("The feed has no R C F N B T header")
+
+    def rides():
+        index = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            ride = Ride()
+            ride.start_r, ride.start_c, ride.end_r, ride.end_c, ride.earliest_start, ride.latest_finish = \
+                (int(value) for value in line.split())
+            ride.index = index
+            index = index + 1
+            yield ride
+
+    return header, rides()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Dispatches rides from a feed as they come, one 'ride car' line "
+                                                 "per assigned ride, and reports decision and wait latencies on "
+                                                 "stderr.")
+    parser.add_argument("feed", nargs="?", help="a problem file (default: stdin)")
+    parser.add_argument("--window", type=int, default=64, help="most rides kept pending before deciding")
+    parser.add_argument("--lateness", type=int, default=0,
+                        help="steps of earliest_start a ride may come behind the latest one seen")
+    parser.add_argument("--latency-samples", type=int, default=4096, help="latencies kept for the percentiles")
+    args = parser.parse_args(argv[1:])
+
+    feed = open(args.feed) if args.feed else sys.stdin
+    header, rides = read_feed(feed)
+    dispatcher = OnlineDispatcher(header[2], args.window, args.lateness, args.latency_samples)
+    try:
+        for ride_index, car in dispatcher.dispatch(rides):
+            if car >= 0:
+                sys.stdout.write("%d %d\n" % (ride_index, car))
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if feed is not sys.stdin:
+            feed.close()
+    sys.stdout.flush()
+    sys.stderr.write(json.dumps(dispatcher.report()) + "\n")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
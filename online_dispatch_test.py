@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import io
+import itertools
+import json
+import random
+import sys
+import tracemalloc
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+import online_dispatch
+from online_dispatch import LatencySample, OnlineDispatcher, read_feed
+from score_submission import VectorizedScoreSubmissionComputer
+import self_driving_cars_and_rides_v8 as v8
+from self_driving_cars_and_rides_v7 import Ride
+
+
+def sorted_feed(filename):
+    """Returns the lines of a problem with its rides sorted by earliest start, and the original ride indexes."""
+    lines = [line for line in open(filename).read().splitlines() if line.strip()]
+    order = sorted(range(len(lines) - 1), key=lambda ride: int(lines[1 + ride].split()[4]))
+    return [lines[0]] + [lines[1 + ride] for ride in order], order
+
+
+def endless_rides(seed):
+    generator = random.Random(seed)
+    for index in itertools.count():
+        ride = Ride()
+        ride.start_r, ride.start_c = generator.randrange(1000), generator.randrange(1000)
+        ride.end_r, ride.end_c = generator.randrange(1000), generator.randrange(1000)
+        ride.earliest_start = index // 4 + generator.randrange(50)
+        ride.latest_finish = ride.earliest_start + ride.length() + generator.randrange(500)
+        ride.index = index
+        yield ride
+
+
+class TestOnlineDispatcher(unittest.TestCase):
+    def test_sorted_feed_scores_like_v8(self):
+        filename = "files/c_no_hurry.in"
+        lines, order = sorted_feed(filename)
+        header, rides = read_feed(lines)
+        routes = [[] for _ in range(header[2])]
+        for ride, car in OnlineDispatcher(header[2]).dispatch(rides):
+            if car >= 0:
+                routes[car].append(order[ride])
+
+        scorer = VectorizedScoreSubmissionComputer(open(filename).read())
+        as_text = lambda routes: "\n".join(str(len(rides)) + " " + " ".join(map(str, rides)) for rides in routes)
+        self.assertEqual(scorer.compute(as_text([car.assigned_rides for car in v8.assign_rides_to_cars(filename)])),
+                         scorer.compute(as_text(routes)))
+
+    def test_window_sorts_a_roughly_ordered_feed(self):
+        lines, _ = sorted_feed("files/b_should_be_easy.in")
+        header, rides = read_feed(lines)
+        expected = list(OnlineDispatcher(header[2], window=1).dispatch(rides))
+
+        rides = list(read_feed(lines)[1])
+        blocks = [rides[start:start + 8] for start in range(0, len(rides), 8)]
+        for block in blocks:
+            random.Random(len(block)).shuffle(block)
+        shuffled = [ride for block in blocks for ride in block]
+        decisions = list(OnlineDispatcher(header[2], window=8, lateness=header[5]).dispatch(shuffled))
+        self.assertEqual(expected, decisions)
+
+    def test_watermark_decides_rides_without_waiting_for_the_window(self):
+        lines, _ = sorted_feed("files/b_should_be_easy.in")
+        header, rides = read_feed(lines)
+        rides = list(rides)
+        dispatcher = OnlineDispatcher(header[2], window=64)
+        expected = []
+        for ride in rides:
+            # Each ride of a sorted feed is decided as it comes, before the next one.
+            decisions = dispatcher.push(ride)
+            self.assertEqual([ride.index], [ride_index for ride_index, _ in decisions])
+            expected.extend(decisions)
+        self.assertEqual([], dispatcher.flush())
+
+        blocks = [rides[start:start + 8] for start in range(0, len(rides), 8)]
+        for block in blocks:
+            random.Random(len(block)).shuffle(block)
+        shuffled = [ride for block in blocks for ride in block]
+        lateness = max(max(ride.earliest_start for ride in shuffled[:position]) - shuffled[position].earliest_start
+                       for position in range(1, len(shuffled)))
+        dispatcher = OnlineDispatcher(header[2], window=len(shuffled), lateness=lateness)
+        self.assertEqual(expected, list(dispatcher.dispatch(shuffled)))
+        self.assertLess(max(dispatcher.waits.samples), 1.0)
+        self.assertEqual(len(shuffled), dispatcher.latencies.count)
+
+    def test_memory_stays_flat_on_an_endless_feed(self):
+        dispatcher = OnlineDispatcher(20, window=16, lateness=50, latency_samples=256)
+        decisions = dispatcher.dispatch(endless_rides(1))
+        for _ in itertools.islice(decisions, 3000):
+            pass
+        tracemalloc.start()
+        try:
+            for _ in itertools.islice(decisions, 1000):
+                pass
+            after_warm_up = tracemalloc.get_traced_memory()[0]
+            for _ in itertools.islice(decisions, 10000):
+                pass
+            self.assertLess(tracemalloc.get_traced_memory()[0] - after_warm_up, 16 * 1024)
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(16, len(dispatcher.pending))
+        self.assertEqual(256, len(dispatcher.latencies.samples))
+        self.assertEqual(256, len(dispatcher.waits.samples))
+        self.assertEqual(14000, dispatcher.decided)
+
+    def test_latency_percentiles(self):
+        latencies = LatencySample(size=1000)
+        for latency in range(1, 101):
+            latencies.add(latency / 1000.0)
+        self.assertEqual({"p50": 0.051, "p90": 0.091, "p99": 0.1, "max": 0.1}, latencies.percentiles())
+
+    def test_main_streams_assignments(self):
+        class Recorder(io.StringIO):
+            def __init__(self):
+                io.StringIO.__init__(self)
+                self.flushed = ""
+
+            def flush(self):
+                self.flushed = self.getvalue()
+
+        stdout, stderr = Recorder(), io.StringIO()
+        flushed_before_reading = []
+
+        def feed():
+            for line in open("files/a_example.in"):
+                flushed_before_reading.append(stdout.flushed)
+                yield line
+
+        stdin = sys.stdin
+        sys.stdin = feed()
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                online_dispatch.main(["online_dispatch", "--window", "2"])
+        finally:
+            sys.stdin = stdin
+        report = json.loads(stderr.getvalue())
+        self.assertEqual((3, 0), (report["decided"], report["pending"]))
+        self.assertEqual(sorted(report["latency"]), sorted(report["wait"]))
+        # a_example is out of order, but every ride is at or behind the
+        # watermark as it comes: its line is out before the next ride is read.
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(report["assigned"], len(lines))
+        self.assertEqual(["", ""] + ["".join(line + "\n" for line in lines[:count]) for count in (1, 2)],
+                         flushed_before_reading)
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Credits: TheSpace team from Melpignano
+
+import heapq
+
+
+class RideIndex:
+    """Index of unassigned rides bucketed by start cell and earliest start window.
+
+    The grid is cut in square cells of cell_size intersections and time in
+    windows of window steps. Each (cell, window) bucket remembers the latest
+    step at which its rides can still be started (latest_finish - length), so
+    a query skips whole buckets that a car cannot reach in time, and walks
+    the cells in rings of increasing distance from the car so it can stop as
+    soon as the remaining rings cannot hold a better candidate.
+    """
+
+    def __init__(self, rides, cell_size=None, window=None):
+        rides = list(rides)
+        max_coordinate = max([max(ride.start_r, ride.start_c) for ride in rides] + [0])
+        max_earliest_start = max([ride.earliest_start for ride in rides] + [0])
+        self.cell_size = cell_size or max(1, max_coordinate // 32 + 1)
+        self.window = window or max(1, max_earliest_start // 32 + 1)
+        self.max_cell = max_coordinate // self.cell_size
+
+        self.cells = {}
+        self.latest_start_in_cell = {}
+        self.latest_start_in_bucket = {}
+        self.latest_start = -1
+        self.ride_bucket = {}
+        for ride in rides:
+            self.add(ride)
+
+    def __len__(self):
+        return len(self.ride_bucket)
+
+    def __contains__(self, ride):
+        return ride.index in self.ride_bucket
+
+    def add(self, ride):
+        cell = (ride.start_r // self.cell_size, ride.start_c // self.cell_size)
+        window = ride.earliest_start // self.window
+        latest_start = ride.latest_finish - ride.length()
+
+        self.cells.setdefault(cell, {}).setdefault(window, {})[ride.index] = ride
+        self.ride_bucket[ride.index] = (cell, window)
+        self.max_cell = max(self.max_cell, cell[0], cell[1])
+        self.latest_start = max(self.latest_start, latest_start)
+        self.latest_start_in_cell[cell] = max(self.latest_start_in_cell.get(cell, -1), latest_start)
+        self.latest_start_in_bucket[cell, window] = max(self.latest_start_in_bucket.get((cell, window), -1),
+                                                        latest_start)
+
+    def remove(self, ride):
+        """Removes an assigned ride; the latest start bounds are left as they are."""
+        cell, window = self.ride_bucket.pop(ride.index)
+        windows = self.cells[cell]
+        del windows[window][ride.index]
+        if len(windows[window]) == 0:
+            del windows[window]
+            del self.latest_start_in_bucket[cell, window]
+        if len(windows) == 0:
+            del self.cells[cell]
+            del self.latest_start_in_cell[cell]
+
+    def query(self, r, c, t, limit=None):
+        """Returns the rides a car at (r, c), free at step t, can still finish on time.
+
+        Rides come as (start_step, ride) pairs sorted by the step at which the
+        ride would start, max(t + distance, earliest_start), then by ride
+        index. With a limit only the best `limit` ones are returned.
+        """
+        candidates = []
+        car_cell_r, car_cell_c = r // self.cell_size, c // self.cell_size
+
+        last_ring = max(car_cell_r, abs(self.max_cell - car_cell_r)) + \
+            max(car_cell_c, abs(self.max_cell - car_cell_c))
+        for ring in range(0, last_ring + 1):
+            ring_arrival = t + max(0, (ring - 2) * self.cell_size)
+            if ring_arrival > self.latest_start:
+                break
+            if limit is not None and len(candidates) == limit and ring_arrival > -candidates[0][0]:
+                break
+
+            for cell in self.__ring_cells(car_cell_r, car_cell_c, ring):
+                if cell not in self.cells:
+                    continue
+                cell_arrival = t + self.__distance_to_cell(r, c, cell)
+                if cell_arrival > self.latest_start_in_cell[cell]:
+                    continue
+
+                for window, rides in self.cells[cell].items():
+                    if cell_arrival > self.latest_start_in_bucket[cell, window]:
+                        continue
+                    if limit is not None and len(candidates) == limit and \
+                            max(cell_arrival, window * self.window) > -candidates[0][0]:
+                        continue
+
+                    for ride in rides.values():
+                        arrival = t + abs(ride.start_r - r) + abs(ride.start_c - c)
+                        if arrival + ride.length() > ride.latest_finish:
+                            continue
+                        key = (-max(arrival, ride.earliest_start), -ride.index)
+                        if limit is None or len(candidates) < limit:
+                            heapq.heappush(candidates, key + (ride,))
+                        elif key > candidates[0][:2]:
+                            heapq.heapreplace(candidates, key + (ride,))
+
+        candidates.sort(reverse=True, key=lambda candidate: candidate[:2])
+        return [(-start_step, ride) for start_step, _, ride in candidates]
+
+    def __ring_cells(self, cell_r, cell_c, ring):
+        if ring == 0:
+            yield cell_r, cell_c
+            return
+        for delta_r in range(-ring, ring + 1):
+            row = cell_r + delta_r
+            if row < 0 or row > self.max_cell:
+                continue
+            delta_c = ring - abs(delta_r)
+            if cell_c + delta_c <= self.max_cell:
+                yield row, cell_c + delta_c
+            if delta_c != 0 and cell_c - delta_c >= 0:
+                yield row, cell_c - delta_c
+
+    def __distance_to_cell(self, r, c, cell):
+        low_r, low_c = cell[0] * self.cell_size, cell[1] * self.cell_size
+        high_r, high_c = low_r + self.cell_size - 1, low_c + self.cell_size - 1
+        return max(low_r - r, 0, r - high_r) + max(low_c - c, 0, c - high_c)
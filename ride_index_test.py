@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import random
+import sys
+import unittest
+
+from ride_index import RideIndex
+from score_submission import Ride
+
+
+def random_rides(generator, count):
+    rides = []
+    for index in range(count):
+        ride = Ride()
+        ride.start_r, ride.start_c = generator.randint(0, 199), generator.randint(0, 99)
+        ride.end_r, ride.end_c = generator.randint(0, 199), generator.randint(0, 99)
+        ride.earliest_start = generator.randint(0, 500)
+        ride.latest_finish = ride.earliest_start + ride.length() + generator.randint(0, 100)
+        ride.index = index
+        rides.append(ride)
+    return rides
+
+
+def brute_force_query(rides, r, c, t):
+    candidates = []
+    for ride in rides:
+        arrival = t + abs(ride.start_r - r) + abs(ride.start_c - c)
+        if arrival + ride.length() <= ride.latest_finish:
+            candidates.append((max(arrival, ride.earliest_start), ride.index))
+    return sorted(candidates)
+
+
+class TestRideIndex(unittest.TestCase):
+    def test_query_matches_brute_force(self):
+        generator = random.Random(5)
+        rides = random_rides(generator, 400)
+        index = RideIndex(rides, cell_size=16, window=50)
+
+        remaining = list(rides)
+        for _ in range(60):
+            r, c, t = generator.randint(0, 260), generator.randint(0, 130), generator.randint(0, 600)
+            expected = brute_force_query(remaining, r, c, t)
+            found = [(start_step, ride.index) for start_step, ride in index.query(r, c, t)]
+            self.assertEqual(expected, found)
+            limited = [(start_step, ride.index) for start_step, ride in index.query(r, c, t, limit=5)]
+            self.assertEqual(expected[:5], limited)
+
+            for ride in generator.sample(remaining, 5):
+                index.remove(ride)
+                remaining.remove(ride)
+        self.assertEqual(len(remaining), len(index))
+
+    def test_removed_ride_is_not_returned(self):
+        rides = random_rides(random.Random(1), 3)
+        index = RideIndex(rides)
+        index.remove(rides[1])
+        self.assertFalse(rides[1] in index)
+        self.assertNotIn(1, [ride.index for _, ride in index.query(0, 0, 0)])
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
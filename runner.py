@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from bounds import optimality_gap, upper_bounds
+from carsandrides import STRATEGIES, load_strategy, write_output
+from instance_loader import load_instance
+from score_submission import VectorizedScoreSubmissionComputer
+from solution_format import read_solution
+
+
+def instance_name(instance_path):
+    return os.path.splitext(os.path.basename(instance_path))[0]
+
+
+def default_instances(directory="files"):
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".in"))
+
+
+def run_job(job):
+    """Solves, writes and scores one (strategy, instance) pair in the current process."""
+    strategy, instance_path, output_directory, binary = job
+    result = {"strategy": strategy, "instance": instance_name(instance_path)}
+    started_at = time.time()
+    try:
+        module = load_strategy(strategy)
+        cars = module.assign_rides_to_cars(instance_path)
+        result["solve_time"] = time.time() - started_at
+
+        strategy_directory = os.path.join(output_directory, strategy)
+        os.makedirs(strategy_directory, exist_ok=True)
+        output_path = os.path.join(strategy_directory, result["instance"] + (".npy" if binary else ".out"))
+        write_output(module, output_path, cars)
+        result["output"] = output_path
+
+        scorer = VectorizedScoreSubmissionComputer.from_instance(*load_instance(instance_path))
+        result["score"] = scorer.compute_arrays(*read_solution(output_path))
+    except Exception as error:
+        result["error"] = type(error).__name__ + ": " + str(error)
+    result["wall_time"] = time.time() - started_at
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_mb"] = peak_rss / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0)
+    return result
+
+
+def run(strategies, instances, output_directory="out", processes=None, binary=False):
+    """Runs every strategy on every instance in a process pool.
+
+    Every job gets a fresh worker process so its peak RSS is its own. With
+    binary the outputs are written in the binary solution format.
+    """
+    jobs = [(strategy, instance, output_directory, binary) for strategy in strategies for instance in instances]
+    processes = min(processes or os.cpu_count() or 1, len(jobs)) or 1
+    with multiprocessing.Pool(processes, maxtasksperchild=1) as pool:
+        results = list(pool.imap_unordered(run_job, jobs))
+
+    instance_names = [instance_name(instance) for instance in instances]
+    results.sort(key=lambda result: (strategies.index(result["strategy"]), instance_names.index(result["instance"])))
+    return results
+
+
+def add_gaps(results, instances):
+    """Adds the upper bound of its instance and the optimality gap of its score to every result."""
+    bounds = {instance_name(instance): upper_bounds(*load_instance(instance))["best"] for instance in instances}
+    for result in results:
+        result["upper_bound"] = bounds[result["instance"]]
+        if result.get("score") is not None:
+            result["gap"] = optimality_gap(result["score"], result["upper_bound"])
+    return results
+
+
+def format_summary(results):
+    lines = ["%-10s %-20s %12s %10s %10s" % ("strategy", "instance", "score", "wall (s)", "RSS (MB)")]
+    if any("upper_bound" in result for result in results):
+        lines[0] = lines[0] + " %12s %8s" % ("bound", "gap")
+    totals = {}
+    for result in results:
+        score = result.get("score")
+        lines.append("%-10s %-20s %12s %10.2f %10.1f" % (
+            result["strategy"], result["instance"], score if score is not None else "error",
+            result["wall_time"], result["peak_rss_mb"]))
+        if "upper_bound" in result:
+            lines[-1] = lines[-1] + " %12d %8s" % (
+                result["upper_bound"], "%.2f%%" % (100.0 * result["gap"]) if "gap" in result else "-")
+        if "error" in result:
+            lines.append("    " + result["error"])
+        totals[result["strategy"]] = totals.get(result["strategy"], 0) + (score or 0)
+    for strategy, total in totals.items():
+        lines.append("%-10s %-20s %12d" % (strategy, "total", total))
+    return "\n".join(lines)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Runs solver strategies on instances in parallel.")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES),
+                        help="comma separated strategy names or module names (default: all)")
+    parser.add_argument("--instances", help="comma separated instance names or .in paths (default: files/*.in)")
+    parser.add_argument("--output-dir", default="out", help="outputs go to <output-dir>/<strategy>/")
+    parser.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    parser.add_argument("--binary", action="store_true", help="write .npy binary solutions instead of .out files")
+    parser.add_argument("--gaps", action="store_true", help="also report the gap of every score to its upper bound")
+    args = parser.parse_args(argv[1:])
+
+    strategies = args.strategies.split(",")
+    if args.instances:
+        instances = [name if name.endswith(".in") else os.path.join("files", name + ".in")
+                     for name in args.instances.split(",")]
+    else:
+        instances = default_instances()
+
+    started_at = time.time()
+    results = run(strategies, instances, args.output_dir, args.processes, args.binary)
+    if args.gaps:
+        add_gaps(results, instances)
+    print(format_summary(results))
+    print("\n Sweep wall time: %.2fs" % (time.time() - started_at))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
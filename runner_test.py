@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import runner
+from solution_format import read_routes
+
+
+class TestRunner(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_runs_a_strategy_and_writes_its_outputs(self):
+        results = runner.run(["v7", "no_such_strategy"], ["files/a_example.in"], self.directory, processes=1)
+        self.assertEqual(["v7", "no_such_strategy"], [result["strategy"] for result in results])
+
+        solved, failed = results
+        output = os.path.join(self.directory, "v7", "a_example.out")
+        self.assertEqual(output, solved["output"])
+        self.assertEqual(4, solved["score"])
+        routes = read_routes(output)
+        self.assertEqual(2, len(routes))
+        self.assertLessEqual(set(ride for rides in routes for ride in rides), {0, 1, 2})
+        self.assertIn("ModuleNotFoundError", failed["error"])
+
+        summary = runner.format_summary(results)
+        self.assertIn("v7         total", summary)
+        self.assertIn("error", summary)
+
+    def test_main_writes_binary_outputs_and_json(self):
+        report = os.path.join(self.directory, "results.json")
+        runner.main(["runner", "--strategies", "v7", "--instances", "a_example", "--output-dir", self.directory,
+                     "--processes", "1", "--binary", "--gaps", "--json", report])
+        result, = json.load(open(report))
+        self.assertEqual(os.path.join(self.directory, "v7", "a_example.npy"), result["output"])
+        self.assertEqual([4, 10], [result["score"], result["upper_bound"]])
+        self.assertEqual(2, len(read_routes(result["output"])))
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -7,19 +7,30 @@
 import os
 import sys
 
+import numpy as np
+
+from instance_loader import parse_instance
+
 
 class Ride:
-    start_r = 0
-    start_c = 0
-    end_r = 0
-    end_c = 0
-    earliest_start = 0
-    latest_finish = 0
-    assigned = False
-    index = -1
+    __slots__ = ("start_r", "start_c", "end_r", "end_c", "earliest_start", "latest_finish", "assigned",
+                 "index", "__length")
+
+    def __init__(self):
+        self.start_r = 0
+        self.start_c = 0
+        self.end_r = 0
+        self.end_c = 0
+        self.earliest_start = 0
+        self.latest_finish = 0
+        self.assigned = False
+        self.index = -1
+        self.__length = None
 
     def length(self):
-        return abs(self.start_r - self.end_r) + abs(self.start_c - self.end_c)
+        if self.__length is None:
+            self.__length = abs(self.start_r - self.end_r) + abs(self.start_c - self.end_c)
+        return self.__length
 
     def __eq__(self, other):
         equal = self.start_r == other.start_r and self.start_c == other.start_c and \
@@ -33,15 +44,15 @@ class Ride:
 
 
 class Car:
-    next_r = 0
-    next_c = 0
-    __free_by_step = 0
-    __earliest_start_bonus = 0
+    __slots__ = ("next_r", "next_c", "__free_by_step", "__earliest_start_bonus", "assigned_rides")
 
     def free_by_step(self):
         return self.__free_by_step
 
     def __init__(self, earliest_start_bonus):
+        self.next_r = 0
+        self.next_c = 0
+        self.__free_by_step = 0
         self.assigned_rides = []
         self.__earliest_start_bonus = earliest_start_bonus
 
@@ -98,15 +109,13 @@ class ProblemParser:
             s – the earliest start ( 0 ≤ s < T )
             f – the latest finish ( 0 ≤ f ≤ T ) , ( f ≥ s + | x − a | + | y − b |)
         """
-        lines = problem_statement.split("\n")
-        R, C, F, N, B, T = [int(val) for val in lines[0].split()]
+        (R, C, F, N, B, T), ride_rows = parse_instance(problem_statement)
         rides = []
-        
-        for i in range(1, N + 1):
+
+        for i, ride_row in enumerate(ride_rows.tolist()):
             ride = Ride()
-            ride.start_r, ride.start_c, ride.end_r, ride.end_c, ride.earliest_start, ride.latest_finish = \
-                [int(val) for val in lines[i].split()]
-            ride.index = i - 1
+            ride.start_r, ride.start_c, ride.end_r, ride.end_c, ride.earliest_start, ride.latest_finish = ride_row
+            ride.index = i
             rides.append(ride)
 
         return R, C, F, N, B, T, rides
@@ -120,7 +129,7 @@ class ScoreSubmissionComputer:
         total_score = 0
         submission_lines = submission.split("\n")
         for submission_line in submission_lines:
-            submission_line_parts = map(int, submission_line.split())
+            submission_line_parts = list(map(int, submission_line.split()))
             car = Car(B)
             if len(submission_line_parts) == 0:
                 continue
@@ -134,7 +143,277 @@ class ScoreSubmissionComputer:
                 total_score = total_score + new_score
 
         return total_score
-        
+
+
+def parse_submission(submission):
+    """Turns a submission into a flat array of ride indexes and per car offsets.
+
+    The rides of the i-th (non empty) submission line are
+    ride_indexes[offsets[i]:offsets[i + 1]].
+    """
+    ride_indexes = []
+    offsets = [0]
+    for submission_line in submission.split("\n"):
+        submission_line_parts = [int(val) for val in submission_line.split()]
+        if len(submission_line_parts) == 0:
+            continue
+        if len(submission_line_parts) != submission_line_parts[0] + 1:
+            raise ValueError("Stated number of rides doesn't match the actual number of ride index")
+        ride_indexes.extend(submission_line_parts[1:])
+        offsets.append(len(ride_indexes))
+
+    return np.array(ride_indexes, dtype=np.int64), np.array(offsets, dtype=np.int64)
+
+
+def check_submission_arrays(ride_indexes, offsets):
+    """Raises ValueError unless offsets split ride_indexes into cars, see parse_submission."""
+    if len(offsets) == 0:
+        raise ValueError("No offsets")
+    if offsets[0] != 0:
+        raise ValueError("The first offset is " + str(offsets[0]) + ", not 0")
+    if np.any(np.diff(offsets) < 0):
+        raise ValueError("Offsets go backwards")
+    if offsets[-1] != len(ride_indexes):
+        raise ValueError("The last offset is " + str(offsets[-1]) + " but there are " + str(len(ride_indexes)) +
+                         " ride indexes")
+
+
+class VectorizedScoreSubmissionComputer:
+    """Scores submissions for one parsed problem with NumPy array operations.
+
+    It gives the same totals as ScoreSubmissionComputer. The step at which
+    every car becomes free after each of its rides follows
+
+        free_k = max(free_k-1 + distance_k, earliest_start_k) + length_k
+
+    which is computed for all the cars at once as a per car cumulative sum of
+    distance + length plus a per car cumulative maximum of the waiting time.
+    """
+
+    def __init__(self, problem):
+        self.header, self.rides = parse_instance(problem)
+        self.B = self.header[4]
+        self.T = self.header[5]
+
+    @classmethod
+    def from_instance(cls, header, rides):
+        """Builds a scorer from an instance already parsed by instance_loader."""
+        computer = cls.__new__(cls)
+        computer.header, computer.rides = tuple(header), rides
+        computer.B = computer.header[4]
+        computer.T = computer.header[5]
+        return computer
+
+    def compute(self, submission):
+        return self.compute_arrays(*parse_submission(submission))
+
+    def compute_arrays(self, ride_indexes, offsets):
+        check_submission_arrays(ride_indexes, offsets)
+        return int(self.ride_scores(ride_indexes, offsets).sum())
+
+    def compute_many(self, submissions):
+        """Scores many submissions in a single pass over their concatenated rides."""
+        all_ride_indexes = []
+        all_offsets = [np.zeros(1, dtype=np.int64)]
+        submission_ends = []
+        rides_so_far = 0
+        for submission in submissions:
+            ride_indexes, offsets = parse_submission(submission)
+            all_ride_indexes.append(ride_indexes)
+            all_offsets.append(offsets[1:] + rides_so_far)
+            rides_so_far = rides_so_far + len(ride_indexes)
+            submission_ends.append(rides_so_far)
+
+        if len(submission_ends) == 0:
+            return []
+        ride_scores = self.ride_scores(np.concatenate(all_ride_indexes), np.concatenate(all_offsets))
+        cumulative_scores = np.concatenate(([0], np.cumsum(ride_scores)))
+        submission_ends = np.array(submission_ends)
+        submission_starts = np.concatenate(([0], submission_ends[:-1]))
+        return [int(score) for score in cumulative_scores[submission_ends] - cumulative_scores[submission_starts]]
+
+    def ride_scores(self, ride_indexes, offsets):
+        """Returns the score earned by every ride of the flat submission arrays."""
+        rides_per_car = np.diff(offsets)
+        car_of_ride = np.repeat(np.arange(len(rides_per_car)), rides_per_car)
+        first_of_car = np.zeros(len(ride_indexes), dtype=bool)
+        first_of_car[offsets[:-1][rides_per_car > 0]] = True
+
+        start_r, start_c, end_r, end_c, earliest_start, latest_finish = self.rides[ride_indexes].T
+        length = np.abs(start_r - end_r) + np.abs(start_c - end_c)
+
+        previous_r = np.where(first_of_car, 0, np.roll(end_r, 1))
+        previous_c = np.where(first_of_car, 0, np.roll(end_c, 1))
+        distance = np.abs(previous_r - start_r) + np.abs(previous_c - start_c)
+
+        travelled = self.__per_car_cumsum(distance + length, offsets, car_of_ride)
+        waited = np.maximum(self.__per_car_cummax(earliest_start + length - travelled, car_of_ride), 0)
+        free_by_step = travelled + waited
+        previous_free_by_step = np.where(first_of_car, 0, np.roll(free_by_step, 1))
+
+        arriving_to_ride_start_at = previous_free_by_step + distance
+        on_time = (arriving_to_ride_start_at + length < latest_finish) & (free_by_step <= self.T)
+        bonus = np.where(arriving_to_ride_start_at <= earliest_start, self.B, 0)
+        return np.where(on_time, length + bonus, 0).astype(np.int64)
+
+    def __per_car_cumsum(self, values, offsets, car_of_ride):
+        cumulative = np.cumsum(values)
+        before_car = np.concatenate(([0], cumulative))[offsets[:-1]]
+        return cumulative - before_car[car_of_ride]
+
+    def __per_car_cummax(self, values, car_of_ride):
+        if len(values) == 0:
+            return values
+        # Lift every car above the previous ones so that a single running
+        # maximum never carries over from one car to the next.
+        lowest = values.min()
+        lift = int(values.max() - lowest) + 1
+        if lift * (int(car_of_ride[-1]) + 1) < np.iinfo(np.int64).max:
+            lifted = car_of_ride * lift
+            return np.maximum.accumulate(values - lowest + lifted) - lifted + lowest
+        cumulative_max = np.empty_like(values)
+        car_starts = np.flatnonzero(np.diff(car_of_ride, prepend=-1))
+        for car_start, car_end in zip(car_starts, np.append(car_starts[1:], len(values))):
+            cumulative_max[car_start:car_end] = np.maximum.accumulate(values[car_start:car_end])
+        return cumulative_max
+
+
+class SubmissionReport:
+    """The score of a submission with every problem found in it.
+
+    violations are (line number, message) pairs, with line numbers
+    starting at 1; line 0 is about the submission as a whole.
+    """
+
+    def __init__(self):
+        self.score = 0
+        self.violations = []
+        self.cars = 0
+        self.rides = 0
+
+    def is_valid(self):
+        return len(self.violations) == 0
+
+
+class StreamingScoreSubmissionComputer:
+    """Scores a submission read from a file handle, with bounded memory.
+
+    Lines are read and scored in chunks of about chunk_rides rides with the
+    VectorizedScoreSubmissionComputer rules, and the rides already used are
+    kept in a bitset of N bits. Lines that are not integers, state the
+    wrong number of rides or come after the F-th car are reported and
+    skipped; rides out of range or already used are reported and skipped.
+    A valid submission gets the same score as ScoreSubmissionComputer.
+    """
+
+    def __init__(self, problem, chunk_rides=1 << 20):
+        self.scorer = VectorizedScoreSubmissionComputer(problem)
+        self.chunk_rides = chunk_rides
+
+    @classmethod
+    def from_instance(cls, header, rides, chunk_rides=1 << 20):
+        computer = cls.__new__(cls)
+        computer.scorer = VectorizedScoreSubmissionComputer.from_instance(header, rides)
+        computer.chunk_rides = chunk_rides
+        return computer
+
+    def compute(self, submission_file):
+        """Returns the SubmissionReport of the lines read from submission_file."""
+        N, F = self.scorer.header[3], self.scorer.header[2]
+        used_rides = np.zeros((N + 7) // 8, dtype=np.uint8)
+        report = SubmissionReport()
+        chunk = []
+        chunk_size = 0
+
+        for line_number, submission_line in enumerate(submission_file, 1):
+            submission_line_parts = submission_line.split()
+            if len(submission_line_parts) == 0:
+                continue
+            try:
+                submission_line_parts = np.array(submission_line_parts, dtype=np.int64)
+            except (ValueError, OverflowError):
+                report.violations.append((line_number, "Not a list of integers"))
+                continue
+            if len(submission_line_parts) != submission_line_parts[0] + 1:
+                report.violations.append((line_number, "States " + str(submission_line_parts[0]) +
+                                          " rides but lists " + str(len(submission_line_parts) - 1)))
+                continue
+            report.cars = report.cars + 1
+            if report.cars > F:
+                report.violations.append((line_number, "More cars than the " + str(F) + " in the fleet"))
+                continue
+
+            chunk.append((line_number, submission_line_parts[1:]))
+            chunk_size = chunk_size + len(submission_line_parts) - 1
+            if chunk_size >= self.chunk_rides:
+                self.__score_chunk(chunk, used_rides, report)
+                chunk = []
+                chunk_size = 0
+
+        self.__score_chunk(chunk, used_rides, report)
+        report.violations.sort(key=lambda violation: violation[0])
+        return report
+
+    def compute_arrays(self, ride_indexes, offsets):
+        """Returns the SubmissionReport of a solution given as arrays, see parse_submission.
+
+        Car i is reported as line i + 1, the line it has in the text format.
+        Offsets that do not split ride_indexes into cars are reported on
+        line 0, and nothing is scored.
+        """
+        F = self.scorer.header[2]
+        used_rides = np.zeros((self.scorer.header[3] + 7) // 8, dtype=np.uint8)
+        report = SubmissionReport()
+        try:
+            check_submission_arrays(ride_indexes, offsets)
+        except ValueError as error:
+            report.violations.append((0, str(error)))
+            return report
+        report.cars = len(offsets) - 1
+        for car in range(F, report.cars):
+            report.violations.append((car + 1, "More cars than the " + str(F) + " in the fleet"))
+
+        car = 0
+        while car < min(F, report.cars):
+            end = int(np.searchsorted(offsets, offsets[car] + self.chunk_rides, "left"))
+            end = min(max(end, car + 1), F, report.cars)
+            chunk = [(line, np.asarray(ride_indexes[offsets[line]:offsets[line + 1]], dtype=np.int64))
+                     for line in range(car, end)]
+            self.__score_chunk([(line + 1, rides) for line, rides in chunk], used_rides, report)
+            car = end
+        report.violations.sort(key=lambda violation: violation[0])
+        return report
+
+    def __score_chunk(self, chunk, used_rides, report):
+        if len(chunk) == 0:
+            return
+        N = self.scorer.header[3]
+        ride_indexes = np.concatenate([rides for _, rides in chunk])
+        line_numbers = np.repeat([line_number for line_number, _ in chunk], [len(rides) for _, rides in chunk])
+        car_of_ride = np.repeat(np.arange(len(chunk)), [len(rides) for _, rides in chunk])
+
+        in_range = (ride_indexes >= 0) & (ride_indexes < N)
+        for line_number, ride_index in zip(line_numbers[~in_range], ride_indexes[~in_range]):
+            report.violations.append((int(line_number), "Ride " + str(ride_index) + " does not exist"))
+
+        valid = in_range.copy()
+        checked_indexes = np.where(in_range, ride_indexes, 0)
+        already_used = (used_rides[checked_indexes >> 3] >> (checked_indexes & 7).astype(np.uint8)) & 1
+        first_in_chunk = np.zeros(len(ride_indexes), dtype=bool)
+        in_range_positions = np.flatnonzero(in_range)
+        first_in_chunk[in_range_positions[np.unique(ride_indexes[in_range], return_index=True)[1]]] = True
+        duplicate = in_range & ((already_used == 1) | ~first_in_chunk)
+        for line_number, ride_index in zip(line_numbers[duplicate], ride_indexes[duplicate]):
+            report.violations.append((int(line_number), "Ride " + str(ride_index) + " is already assigned"))
+        valid &= ~duplicate
+        np.bitwise_or.at(used_rides, checked_indexes[valid] >> 3,
+                         (1 << (checked_indexes[valid] & 7)).astype(np.uint8))
+
+        rides_per_car = np.bincount(car_of_ride[valid], minlength=len(chunk))
+        offsets = np.concatenate(([0], np.cumsum(rides_per_car)))
+        report.score = report.score + int(self.scorer.ride_scores(ride_indexes[valid], offsets).sum())
+        report.rides = report.rides + int(valid.sum())
+
 
 def main(argv):
     in_file_names = set()
@@ -151,10 +430,13 @@ def main(argv):
         out_file = in_file[:-3] + ".out"
         if out_file in out_file_names:
             problem = open("files/" + in_file).read()
-            submission = open("files/" + out_file).read()
-            score = ScoreSubmissionComputer().compute(problem, submission)
+            with open("files/" + out_file) as submission:
+                report = StreamingScoreSubmissionComputer(problem).compute(submission)
+            score = report.score
             total_score = total_score + score
             print("Score: " + str(score) + " for file: " + in_file)
+            for line_number, violation in report.violations:
+                print("    line " + str(line_number) + ": " + violation)
     print ("\n Total score: " + str(total_score))
     
 if __name__ == '__main__':
@@ -1,8 +1,10 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import io
 import unittest
 import sys
-from score_submission import ScoreSubmissionComputer, Ride, ProblemParser
+from score_submission import ScoreSubmissionComputer, Ride, ProblemParser, VectorizedScoreSubmissionComputer, \
+    StreamingScoreSubmissionComputer, parse_submission
 
 class TestProblemParser(unittest.TestCase):
     def test_parse_problem(self):
@@ -91,6 +93,67 @@ class TestScoreSubmission(unittest.TestCase):
         score = ScoreSubmissionComputer().compute(problem, submission)
         self.assertEquals(score, 21465945)         
 
+class TestVectorizedScoreSubmission(unittest.TestCase):
+    golden_submissions = [
+        ("a_example", "a_example_10.out", 10),
+        ("b_should_be_easy", "b_should_be_easy_176877.out", 176877),
+        ("c_no_hurry", "c_no_hurry_8130306.out", 8130306),
+        ("d_metropolis", "d_metropolis_8349276.out", 8349276),
+        ("e_high_bonus", "e_high_bonus_21465945.out", 21465945),
+    ]
+
+    def test_parse_submission(self):
+        ride_indexes, offsets = parse_submission("2 0 2\n\n0\n1 1\n")
+        self.assertEqual([0, 2, 1], list(ride_indexes))
+        self.assertEqual([0, 2, 2, 3], list(offsets))
+
+    def test_score_incorrect_ride_number(self):
+        problem = "2 2 1 1 0 3\n0 0 1 1 0 2"
+        with self.assertRaises(ValueError):
+            VectorizedScoreSubmissionComputer(problem).compute("1 0 0")
+
+    def test_score_trivial_cases(self):
+        self.assertEqual(2, VectorizedScoreSubmissionComputer("2 2 1 1 0 3\n0 0 1 1 0 3").compute("1 0"))
+        self.assertEqual(0, VectorizedScoreSubmissionComputer("2 2 1 1 0 3\n0 0 1 1 0 1").compute("1 0"))
+        self.assertEqual(3, VectorizedScoreSubmissionComputer("2 2 1 1 1 3\n0 0 1 1 0 3").compute("1 0"))
+        self.assertEqual(0, VectorizedScoreSubmissionComputer("2 2 1 1 1 1\n0 0 1 1 0 3").compute("1 0"))
+
+    def test_score_golden_submissions(self):
+        for instance, output, expected_score in self.golden_submissions:
+            problem = open("files/" + instance + ".in").read()
+            submission = open("score_submission_test_files/" + output).read()
+            self.assertEqual(expected_score, VectorizedScoreSubmissionComputer(problem).compute(submission))
+
+    def test_compute_many(self):
+        problem = open("files/b_should_be_easy.in").read()
+        submission = open("score_submission_test_files/b_should_be_easy_176877.out").read()
+        scores = VectorizedScoreSubmissionComputer(problem).compute_many([submission, "", "1 0", submission])
+        self.assertEqual([176877, 0, 1011, 176877], scores)
+
+
+class TestStreamingScoreSubmission(unittest.TestCase):
+    problem = "3 3 2 4 1 100\n0 0 1 1 0 50\n1 1 2 2 0 50\n0 0 0 2 0 50\n2 2 0 0 0 90\n"
+
+    def test_score_golden_submissions(self):
+        for instance, output, expected_score in TestVectorizedScoreSubmission.golden_submissions:
+            problem = open("files/" + instance + ".in").read()
+            for chunk_rides in (1 << 20, 7):
+                with open("score_submission_test_files/" + output) as submission_file:
+                    report = StreamingScoreSubmissionComputer(problem, chunk_rides).compute(submission_file)
+                self.assertEqual(expected_score, report.score)
+                self.assertTrue(report.is_valid())
+
+    def test_violations(self):
+        submission = "2 0 1\n2 1 7\nx y\n3 0 3\n1 2\n1 3\n"
+        for chunk_rides in (1 << 20, 1):
+            report = StreamingScoreSubmissionComputer(self.problem, chunk_rides).compute(io.StringIO(submission))
+            self.assertEqual([(2, "Ride 7 does not exist"), (2, "Ride 1 is already assigned"),
+                              (3, "Not a list of integers"), (4, "States 3 rides but lists 2"),
+                              (5, "More cars than the 2 in the fleet"), (6, "More cars than the 2 in the fleet")],
+                             report.violations)
+            self.assertEqual(5, report.score)
+
+
 def main(argv):
     unittest.main()
 
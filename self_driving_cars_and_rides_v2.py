@@ -4,33 +4,38 @@
 #
 # Credits: TheSpace team from Melpignano
 
-import tqdm
-from random import randint
-import matplotlib.pyplot as plt
-import numpy as np
-import sympy
-from random import shuffle
+from event_simulation import EventDrivenSimulation
 
 class Ride:
-    start_r = 0
-    start_c = 0
-    end_r = 0
-    end_c = 0
-    earliest_start = 0
-    latest_finish = 0
-    assigned = False
-    index = -1
-    score = 0
+    __slots__ = ("start_r", "start_c", "end_r", "end_c", "earliest_start", "latest_finish", "assigned",
+                 "index", "score", "__length")
+
+    def __init__(self):
+        self.start_r = 0
+        self.start_c = 0
+        self.end_r = 0
+        self.end_c = 0
+        self.earliest_start = 0
+        self.latest_finish = 0
+        self.assigned = False
+        self.index = -1
+        self.score = 0
+        self.__length = None
 
     def distance(self):
-        return abs(self.start_r - self.end_r) + abs(self.start_c - self.end_c)
+        if self.__length is None:
+            self.__length = abs(self.start_r - self.end_r) + abs(self.start_c - self.end_c)
+        return self.__length
 
 
 class Car:
-    next_r = 0
-    next_c = 0
-    free_by_step = 0
-    assigned_rides = ""
+    __slots__ = ("next_r", "next_c", "free_by_step", "assigned_rides")
+
+    def __init__(self):
+        self.next_r = 0
+        self.next_c = 0
+        self.free_by_step = 0
+        self.assigned_rides = ""
 
 
 def read_input_self_driving_data(filename):
@@ -97,25 +102,20 @@ def assign_rides_to_cars(filename):
     # print(len(cars))
     # print(R, C, F, N, B, T, rides)
 
-    for t in range(T):
-        free_cars = [x for x in cars if x.free_by_step <= t]
-        for car in free_cars:
-            unassigned_rides = [x for x in rides if x.assigned == False]
-
-            for ride in unassigned_rides:
-                ride.score = score(car, ride, t)
+    unassigned_rides = list(rides)
 
-            positive_score_unassigned_rides = [x for x in unassigned_rides if x.score >= 0]
-
-            if len(positive_score_unassigned_rides) > 0:
-                sorted(positive_score_unassigned_rides, key=lambda ride: ride.score)
-                ride = positive_score_unassigned_rides[0]
-            else:
-                if len(unassigned_rides) == 0:
-                    return cars
+    def dispatch(t, free_cars):
+        for car in free_cars:
+            if len(unassigned_rides) == 0:
+                return False
 
-                sorted(unassigned_rides, key=lambda ride: ride.score, reverse=True)
-                ride = unassigned_rides[0]
+            # The first unassigned ride the car can reach before its earliest start,
+            # otherwise the first unassigned ride.
+            ride = unassigned_rides[0]
+            for candidate_ride in unassigned_rides:
+                if score(car, candidate_ride, t) >= 0:
+                    ride = candidate_ride
+                    break
 
             # car.assigned_rides.append(ride.index)
             car.assigned_rides = car.assigned_rides + " " + str(ride.index)
@@ -124,8 +124,11 @@ def assign_rides_to_cars(filename):
             car.free_by_step = compute_free_by(car, ride, t)
 
             ride.assigned = True
-    
-    return cars
+            unassigned_rides.remove(ride)
+
+        return True
+
+    return EventDrivenSimulation(cars, T).run(dispatch)
 
 
 def write_output_assignements(filename, cars):
@@ -136,22 +139,23 @@ def write_output_assignements(filename, cars):
             f.write(str(len(assigned_rides.split())) + assigned_rides + "\n")
 
 
-cars = assign_rides_to_cars('files/a_example.in')
-write_output_assignements('files/a_example.out', cars)
-print('files/a_example.out')
+if __name__ == '__main__':
+    cars = assign_rides_to_cars('files/a_example.in')
+    write_output_assignements('files/a_example.out', cars)
+    print('files/a_example.out')
 
-cars = assign_rides_to_cars('files/b_should_be_easy.in')
-write_output_assignements('files/b_should_be_easy.out', cars)
-print('files/b_should_be_easy.out')
+    cars = assign_rides_to_cars('files/b_should_be_easy.in')
+    write_output_assignements('files/b_should_be_easy.out', cars)
+    print('files/b_should_be_easy.out')
 
-cars = assign_rides_to_cars('files/c_no_hurry.in')
-write_output_assignements('files/c_no_hurry.out', cars)
-print('files/c_no_hurry.out')
+    cars = assign_rides_to_cars('files/c_no_hurry.in')
+    write_output_assignements('files/c_no_hurry.out', cars)
+    print('files/c_no_hurry.out')
 
-cars = assign_rides_to_cars('files/d_metropolis.in')
-write_output_assignements('files/d_metropolis.out', cars)
-print('files/d_metropolis.out')
+    cars = assign_rides_to_cars('files/d_metropolis.in')
+    write_output_assignements('files/d_metropolis.out', cars)
+    print('files/d_metropolis.out')
 
-cars = assign_rides_to_cars('files/e_high_bonus.in')
-write_output_assignements('files/e_high_bonus.out', cars)
-print('files/e_high_bonus.out')
\ No newline at end of file
+    cars = assign_rides_to_cars('files/e_high_bonus.in')
+    write_output_assignements('files/e_high_bonus.out', cars)
+    print('files/e_high_bonus.out')
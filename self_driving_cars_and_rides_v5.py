@@ -4,34 +4,37 @@
 #
 # Credits: TheSpace team from Melpignano
 
-import tqdm
-from random import randint
-import matplotlib.pyplot as plt
-import numpy as np
-import sympy
-from random import shuffle
+from instance_loader import load_instance
 
 
 class Ride:
-    start_r = 0
-    start_c = 0
-    end_r = 0
-    end_c = 0
-    earliest_start = 0
-    latest_finish = 0
-    assigned = False
-    index = -1
+    __slots__ = ("start_r", "start_c", "end_r", "end_c", "earliest_start", "latest_finish", "assigned",
+                 "index", "__length")
+
+    def __init__(self):
+        self.start_r = 0
+        self.start_c = 0
+        self.end_r = 0
+        self.end_c = 0
+        self.earliest_start = 0
+        self.latest_finish = 0
+        self.assigned = False
+        self.index = -1
+        self.__length = None
 
     def distance(self):
-        return abs(self.start_r - self.end_r) + abs(self.start_c - self.end_c)
+        if self.__length is None:
+            self.__length = abs(self.start_r - self.end_r) + abs(self.start_c - self.end_c)
+        return self.__length
 
 
 class Car:
-    next_r = 0
-    next_c = 0
-    free_by_step = 0
+    __slots__ = ("next_r", "next_c", "free_by_step", "assigned_rides")
 
     def __init__(self):
+        self.next_r = 0
+        self.next_c = 0
+        self.free_by_step = 0
         self.assigned_rides = []
 
     def assign_ride(self, ride):
@@ -70,15 +73,13 @@ def read_input_self_driving_data(filename):
         s – the earliest start ( 0 ≤ s < T )
         f – the latest finish ( 0 ≤ f ≤ T ) , ( f ≥ s + | x − a | + | y − b |)
     """
-    lines = open(filename).readlines()
-    R, C, F, N, B, T = [int(val) for val in lines[0].split()]
+    (R, C, F, N, B, T), ride_rows = load_instance(filename)
     city = []
-    
-    for i in range(1, N + 1):
+
+    for i, ride_row in enumerate(ride_rows.tolist()):
         ride = Ride()
-        ride.start_r, ride.start_c, ride.end_r, ride.end_c, ride.earliest_start, ride.latest_finish = \
-            [int(val) for val in lines[i].split()]
-        ride.index = i - 1
+        ride.start_r, ride.start_c, ride.end_r, ride.end_c, ride.earliest_start, ride.latest_finish = ride_row
+        ride.index = i
         city.append(ride)
 
     return R, C, F, N, B, T, city
@@ -117,22 +118,23 @@ def write_output_assignements(filename, cars):
             f.write(str(len(assigned_rides)) + " " + assigned_rides_indexes + "\n")
 
 
-cars = assign_rides_to_cars('files/a_example.in')
-write_output_assignements('files/a_example.out', cars)
-print('files/a_example.out')
+if __name__ == '__main__':
+    cars = assign_rides_to_cars('files/a_example.in')
+    write_output_assignements('files/a_example.out', cars)
+    print('files/a_example.out')
 
-cars = assign_rides_to_cars('files/b_should_be_easy.in')
-write_output_assignements('files/b_should_be_easy.out', cars)
-print('files/b_should_be_easy.out')
+    cars = assign_rides_to_cars('files/b_should_be_easy.in')
+    write_output_assignements('files/b_should_be_easy.out', cars)
+    print('files/b_should_be_easy.out')
 
-cars = assign_rides_to_cars('files/c_no_hurry.in')
-write_output_assignements('files/c_no_hurry.out', cars)
-print('files/c_no_hurry.out')
+    cars = assign_rides_to_cars('files/c_no_hurry.in')
+    write_output_assignements('files/c_no_hurry.out', cars)
+    print('files/c_no_hurry.out')
 
-cars = assign_rides_to_cars('files/d_metropolis.in')
-write_output_assignements('files/d_metropolis.out', cars)
-print('files/d_metropolis.out')
+    cars = assign_rides_to_cars('files/d_metropolis.in')
+    write_output_assignements('files/d_metropolis.out', cars)
+    print('files/d_metropolis.out')
 
-cars = assign_rides_to_cars('files/e_high_bonus.in')
-write_output_assignements('files/e_high_bonus.out', cars)
-print('files/e_high_bonus.out')
\ No newline at end of file
+    cars = assign_rides_to_cars('files/e_high_bonus.in')
+    write_output_assignements('files/e_high_bonus.out', cars)
+    print('files/e_high_bonus.out')
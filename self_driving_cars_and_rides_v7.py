@@ -4,35 +4,43 @@
 #
 # Credits: TheSpace team from Melpignano
 
-import tqdm
-from random import randint
-import matplotlib.pyplot as plt
-import numpy as np
-import sympy
-from random import shuffle
+from instance_loader import load_instance
+from fleet import Fleet, UNDOABLE_SCORE
+from instrumentation import NO_INSTRUMENTATION
 
 debugging = False
 
 class Ride:
-    start_r = 0
-    start_c = 0
-    end_r = 0
-    end_c = 0
-    earliest_start = 0
-    latest_finish = 0
-    assigned = False
-    index = -1
+    __slots__ = ("start_r", "start_c", "end_r", "end_c", "earliest_start", "latest_finish", "assigned",
+                 "index", "__length")
+
+    def __init__(self):
+        self.start_r = 0
+        self.start_c = 0
+        self.end_r = 0
+        self.end_c = 0
+        self.earliest_start = 0
+        self.latest_finish = 0
+        self.assigned = False
+        self.index = -1
+        self.__length = None
 
     def length(self):
-        return abs(self.start_r - self.end_r) + abs(self.start_c - self.end_c)
+        if self.__length is None:
+            self.__length = abs(self.start_r - self.end_r) + abs(self.start_c - self.end_c)
+        return self.__length
 
 
 class Car:
-    next_r = 0
-    next_c = 0
-    __free_by_step = 0
+    __slots__ = ("next_r", "next_c", "__free_by_step", "assigned_rides")
+
+    def free_by_step(self):
+        return self.__free_by_step
 
     def __init__(self):
+        self.next_r = 0
+        self.next_c = 0
+        self.__free_by_step = 0
         self.assigned_rides = []
 
     def assign_ride(self, ride):
@@ -54,14 +62,18 @@ class Car:
         return abs(self.next_r - r) + abs(self.next_c - c)
 
     def score_for_ride(self, ride):
+        return self.score_and_arrival_for_ride(ride)[0]
+
+    def score_and_arrival_for_ride(self, ride):
+        """Returns the score of the ride and the step at which the car reaches its start."""
         distance_from_my_next_stop_to_ride_start = self.__distance_to(ride.start_r, ride.start_c)
         arriving_to_ride_start_at = self.__free_by_step + distance_from_my_next_stop_to_ride_start
         if arriving_to_ride_start_at <= ride.earliest_start:
-            return 1
+            return 1, arriving_to_ride_start_at
         arriving_to_ride_end_at = arriving_to_ride_start_at + ride.length()
         if arriving_to_ride_end_at <= ride.latest_finish:
-            return 2
-        return 3
+            return 2, arriving_to_ride_start_at
+        return 3, arriving_to_ride_start_at
 
 
 def read_input_self_driving_data(filename):
@@ -81,15 +93,13 @@ def read_input_self_driving_data(filename):
         s – the earliest start ( 0 ≤ s < T )
         f – the latest finish ( 0 ≤ f ≤ T ) , ( f ≥ s + | x − a | + | y − b |)
     """
-    lines = open(filename).readlines()
-    R, C, F, N, B, T = [int(val) for val in lines[0].split()]
+    (R, C, F, N, B, T), ride_rows = load_instance(filename)
     city = []
-    
-    for i in range(1, N + 1):
+
+    for i, ride_row in enumerate(ride_rows.tolist()):
         ride = Ride()
-        ride.start_r, ride.start_c, ride.end_r, ride.end_c, ride.earliest_start, ride.latest_finish = \
-            [int(val) for val in lines[i].split()]
-        ride.index = i - 1
+        ride.start_r, ride.start_c, ride.end_r, ride.end_c, ride.earliest_start, ride.latest_finish = ride_row
+        ride.index = i
         city.append(ride)
 
     return R, C, F, N, B, T, city
@@ -104,48 +114,64 @@ def build_cars(number_of_cars):
     return cars
 
 
-def assign_rides_to_cars(filename):
-    R, C, F, N, B, T, rides = read_input_self_driving_data(filename)
-    cars = build_cars(F)
+def assign_rides_to_cars(filename, instrumentation=NO_INSTRUMENTATION):
+    with instrumentation.phase("parse"):
+        R, C, F, N, B, T, rides = read_input_self_driving_data(filename)
+        cars = build_cars(F)
 
-    rides.sort(key = lambda ride: ride.earliest_start)
+    with instrumentation.phase("sort"):
+        rides.sort(key = lambda ride: ride.earliest_start)
 
-    assign_rides_to_unstarted_cars(cars, rides)
+    with instrumentation.phase("unstarted_cars"):
+        assign_rides_to_unstarted_cars(cars, rides, instrumentation)
 
-    assign_rides_to_already_started_cars(cars, rides)
+    with instrumentation.phase("started_cars"):
+        assign_rides_to_already_started_cars(cars, rides, instrumentation)
     
     return cars
 
-def assign_rides_to_already_started_cars(cars, rides):
+def assign_rides_to_already_started_cars(cars, rides, instrumentation=NO_INSTRUMENTATION):
     if len(cars) >= len(rides):
         return
 
+    fleet = Fleet(cars)
+    skipped = 0
     for ride_index in range(len(cars), len(rides)):
         current_ride = rides[ride_index]
-        cars.sort(key = lambda car: car.score_for_ride(current_ride))
-        best_car = cars[0]
-        if best_car.score_for_ride(current_ride) < 3:
+        best_car_slot, best_score = fleet.best_car_for_ride(current_ride)
+        if best_score < UNDOABLE_SCORE:
+            if debugging:
+                print("Assigned to already started car with score: " + str(best_score))
+            fleet.assign_ride(best_car_slot, current_ride)
+        else:
+            skipped = skipped + 1
             if debugging:
-                print("Assigned to already started car with score: " + str(best_car.score_for_ride(current_ride)))
-            best_car.assign_ride(current_ride)
-        elif debugging:
-            print("Undoable task " + str(ride_index) + " with already started cars")
+                print("Undoable task " + str(ride_index) + " with already started cars")
+
+    cars[:] = fleet.cars_in_order()
+    instrumentation.count("score_for_ride", len(fleet) * (len(rides) - len(cars)))
+    instrumentation.count("infeasible_rides_skipped", skipped)
 
 
-def assign_rides_to_unstarted_cars(cars, rides):
+def assign_rides_to_unstarted_cars(cars, rides, instrumentation=NO_INSTRUMENTATION):
     ride_index = 0
+    skipped = 0
     for car in cars:
         current_ride = rides[ride_index]
-        if car.score_for_ride(current_ride) < 3:
+        score = car.score_for_ride(current_ride)
+        if score < 3:
             if debugging:
-                print("Assigned to unstarted car with score: " + str(car.score_for_ride(current_ride)))
+                print("Assigned to unstarted car with score: " + str(score))
             car.assign_ride(current_ride)
         else:
+            skipped = skipped + 1
             if debugging:
                 print("Undoable task " + str(ride_index) + " with unstarted cars")
         ride_index = ride_index + 1
         if ride_index == len(rides):
             break
+    instrumentation.count("score_for_ride", ride_index)
+    instrumentation.count("infeasible_rides_skipped", skipped)
 
 
 def write_output_assignements(filename, cars):
@@ -157,22 +183,23 @@ def write_output_assignements(filename, cars):
             f.write(str(len(assigned_rides)) + " " + assigned_rides_indexes + "\n")
 
 
-cars = assign_rides_to_cars('files/a_example.in')
-write_output_assignements('files/a_example.out', cars)
-print('files/a_example.out')
+if __name__ == '__main__':
+    cars = assign_rides_to_cars('files/a_example.in')
+    write_output_assignements('files/a_example.out', cars)
+    print('files/a_example.out')
 
-cars = assign_rides_to_cars('files/b_should_be_easy.in')
-write_output_assignements('files/b_should_be_easy.out', cars)
-print('files/b_should_be_easy.out')
+    cars = assign_rides_to_cars('files/b_should_be_easy.in')
+    write_output_assignements('files/b_should_be_easy.out', cars)
+    print('files/b_should_be_easy.out')
 
-cars = assign_rides_to_cars('files/c_no_hurry.in')
-write_output_assignements('files/c_no_hurry.out', cars)
-print('files/c_no_hurry.out')
+    cars = assign_rides_to_cars('files/c_no_hurry.in')
+    write_output_assignements('files/c_no_hurry.out', cars)
+    print('files/c_no_hurry.out')
 
-cars = assign_rides_to_cars('files/d_metropolis.in')
-write_output_assignements('files/d_metropolis.out', cars)
-print('files/d_metropolis.out')
+    cars = assign_rides_to_cars('files/d_metropolis.in')
+    write_output_assignements('files/d_metropolis.out', cars)
+    print('files/d_metropolis.out')
 
-cars = assign_rides_to_cars('files/e_high_bonus.in')
-write_output_assignements('files/e_high_bonus.out', cars)
-print('files/e_high_bonus.out')
\ No newline at end of file
+    cars = assign_rides_to_cars('files/e_high_bonus.in')
+    write_output_assignements('files/e_high_bonus.out', cars)
+    print('files/e_high_bonus.out')
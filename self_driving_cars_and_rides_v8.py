@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+from fleet import PrunedFleet, UNDOABLE_SCORE
+from instrumentation import NO_INSTRUMENTATION
+from self_driving_cars_and_rides_v7 import (assign_rides_to_unstarted_cars, build_cars, read_input_self_driving_data,
+                                            write_output_assignements)
+
+debugging = False
+
+
+def assign_rides_to_cars(filename, instrumentation=NO_INSTRUMENTATION):
+    with instrumentation.phase("parse"):
+        R, C, F, N, B, T, rides = read_input_self_driving_data(filename)
+        cars = build_cars(F)
+
+    with instrumentation.phase("sort"):
+        rides.sort(key = lambda ride: ride.earliest_start)
+
+    with instrumentation.phase("unstarted_cars"):
+        assign_rides_to_unstarted_cars(cars, rides, instrumentation)
+
+    with instrumentation.phase("started_cars"):
+        assign_rides_to_already_started_cars(cars, rides, instrumentation)
+
+    return cars
+
+
+def assign_rides_to_already_started_cars(cars, rides, instrumentation=NO_INSTRUMENTATION):
+    """Gives every ride to the bonus car that waits the least, or else to the car that gets there first.
+
+    Unlike v7, only the cars that are free early enough for the ride are
+    scored, see PrunedFleet.
+    """
+    if len(cars) >= len(rides):
+        return
+
+    fleet = PrunedFleet(cars)
+    skipped = 0
+    for ride_index in range(len(cars), len(rides)):
+        current_ride = rides[ride_index]
+        best_car_slot, best_score = fleet.best_car_for_ride(current_ride)
+        if best_score < UNDOABLE_SCORE:
+            if debugging:
+                print("Assigned to already started car with score: " + str(best_score))
+            fleet.assign_ride(best_car_slot, current_ride)
+        else:
+            skipped = skipped + 1
+            if debugging:
+                print("Undoable task " + str(ride_index) + " with already started cars")
+
+    instrumentation.count("score_for_ride", fleet.evaluated)
+    instrumentation.count("infeasible_rides_skipped", skipped)
+
+
+if __name__ == '__main__':
+    for name in ("a_example", "b_should_be_easy", "c_no_hurry", "d_metropolis", "e_high_bonus"):
+        cars = assign_rides_to_cars('files/' + name + '.in')
+        write_output_assignements('files/' + name + '.out', cars)
+        print('files/' + name + '.out')
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: disable=print-statement
+#
+# Credits: TheSpace team from Melpignano
+
+import argparse
+import io
+import sys
+
+import numpy as np
+
+from checkpoint import atomic_write
+from score_submission import check_submission_arrays, parse_submission
+
+# Solutions written to files with this extension use the binary format.
+BINARY_EXTENSION = ".npy"
+NPY_MAGIC = b"\x93NUMPY"
+
+
+def is_binary_path(filename):
+    return filename.endswith(BINARY_EXTENSION)
+
+
+def is_binary_file(filename):
+    with open(filename, "rb") as f:
+        return f.read(len(NPY_MAGIC)) == NPY_MAGIC
+
+
+def routes_to_arrays(routes):
+    """Turns per car lists of ride indexes into the flat ride_indexes and offsets of parse_submission."""
+    offsets = np.zeros(len(routes) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(rides) for rides in routes])
+    ride_indexes = np.fromiter((ride for rides in routes for ride in rides), dtype=np.int64, count=int(offsets[-1]))
+    return ride_indexes, offsets
+
+
+def arrays_to_routes(ride_indexes, offsets):
+    ride_indexes, offsets = np.asarray(ride_indexes).tolist(), np.asarray(offsets).tolist()
+    return [ride_indexes[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def read_solution(filename, mmap=True):
+    """Reads a solution in either format and returns its ride_indexes and offsets, see parse_submission.
+
+    A binary solution is one int32 .npy array: the number of cars, the
+    cars + 1 offsets, then the ride indexes of all the cars one after the
+    other. With mmap the two arrays returned are views of the memory-mapped
+    file and only the offsets are read, to check them. Raises ValueError
+    when the offsets do not split the ride indexes into the cars.
+    """
+    if not is_binary_file(filename):
+        with open(filename) as f:
+            return parse_submission(f.read())
+    solution = np.load(filename, mmap_mode="r" if mmap else None)
+    if solution.ndim != 1 or len(solution) == 0:
+        raise ValueError(filename + " is not a flat solution array")
+    cars = int(solution[0])
+    if cars < 0 or len(solution) < cars + 2:
+        raise ValueError(filename + " states " + str(cars) + " cars but holds " + str(len(solution) - 1) + " values")
+    ride_indexes, offsets = solution[cars + 2:], solution[1:cars + 2]
+    check_submission_arrays(ride_indexes, offsets)
+    return ride_indexes, offsets
+
+
+def write_solution(filename, ride_indexes, offsets):
+    """Writes a solution, in the binary format if filename ends with BINARY_EXTENSION.
+
+    The text format is the one of write_output_assignements. Readers only
+    ever see the old or the new file.
+    """
+    if is_binary_path(filename):
+        solution = np.empty(len(offsets) + 1 + len(ride_indexes), dtype=np.int32)
+        solution[0] = len(offsets) - 1
+        solution[1:len(offsets) + 1] = offsets
+        solution[len(offsets) + 1:] = ride_indexes
+        data = io.BytesIO()
+        np.save(data, solution)
+        atomic_write(filename, data.getvalue())
+    else:
+        rides = np.asarray(ride_indexes).tolist()
+        offsets = np.asarray(offsets).tolist()
+        atomic_write(filename, "".join(str(offsets[i + 1] - offsets[i]) + " " +
+                                       " ".join(map(str, rides[offsets[i]:offsets[i + 1]])) + "\n"
+                                       for i in range(len(offsets) - 1)))
+
+
+def read_routes(filename):
+    return arrays_to_routes(*read_solution(filename))
+
+
+def write_routes(filename, routes):
+    """Writes an output file with the required format, or a binary solution, see write_solution."""
+    write_solution(filename, *routes_to_arrays(routes))
+
+
+def write_cars(filename, cars):
+    """Writes the assigned_rides of cars, see write_solution."""
+    write_routes(filename, [car.assigned_rides for car in cars])
+
+
+def convert(source, destination):
+    """Rewrites a solution in the format of destination; the routes are the same in both formats."""
+    write_solution(destination, *read_solution(source, mmap=False))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Converts solutions between the .out text and the binary format.")
+    parser.add_argument("source", help="solution to read, in either format")
+    parser.add_argument("destination", help="solution to write, binary if it ends with " + BINARY_EXTENSION)
+    args = parser.parse_args(argv[1:])
+
+    convert(args.source, args.destination)
+    print(args.destination)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from carsandrides import solve
+from instance_loader import load_instance
+from local_search import LocalSearch, Problem, read_routes
+from score_submission import StreamingScoreSubmissionComputer, VectorizedScoreSubmissionComputer
+from batch_scoring import score_submissions
+from solution_format import convert, is_binary_file, read_solution, write_routes
+
+
+class TestSolutionFormat(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_text_to_binary_and_back_is_lossless(self):
+        solve("v7", "files/c_no_hurry.in", self.path("c.out"))
+        convert(self.path("c.out"), self.path("c.npy"))
+        convert(self.path("c.npy"), self.path("c_again.out"))
+        self.assertTrue(is_binary_file(self.path("c.npy")))
+        self.assertFalse(is_binary_file(self.path("c.out")))
+        self.assertEqual(open(self.path("c.out")).read(), open(self.path("c_again.out")).read())
+
+        ride_indexes, offsets = read_solution(self.path("c.npy"))
+        self.assertIsInstance(ride_indexes, np.memmap)
+        text_ride_indexes, text_offsets = read_solution(self.path("c.out"))
+        self.assertEqual(text_ride_indexes.tolist(), ride_indexes.tolist())
+        self.assertEqual(text_offsets.tolist(), offsets.tolist())
+
+    def test_solver_search_and_scorers_take_binary_solutions(self):
+        header, rides = load_instance("files/b_should_be_easy.in")
+        solve("v7", "files/b_should_be_easy.in", self.path("b.npy"))
+        self.assertEqual(176877, VectorizedScoreSubmissionComputer.from_instance(header, rides).compute_arrays(
+            *read_solution(self.path("b.npy"))))
+
+        routes = read_routes(self.path("b.npy"))
+        self.assertEqual(176877, LocalSearch(Problem(header, rides), routes).score)
+        write_routes(self.path("b_routes.npy"), routes)
+        self.assertEqual(routes, read_routes(self.path("b_routes.npy")))
+
+    def test_streaming_reports_match_for_both_formats(self):
+        header, rides = load_instance("files/a_example.in")
+        routes = [[0, 7], [2, 1, 0], [], [3]]
+        write_routes(self.path("a.out"), routes)
+        write_routes(self.path("a.npy"), routes)
+        scorer = StreamingScoreSubmissionComputer.from_instance(header, rides, chunk_rides=2)
+        with open(self.path("a.out")) as f:
+            text_report = scorer.compute(f)
+        binary_report = scorer.compute_arrays(*read_solution(self.path("a.npy")))
+        for report in (text_report, binary_report):
+            self.assertEqual([(1, "Ride 7 does not exist"), (2, "Ride 0 is already assigned"),
+                              (3, "More cars than the 2 in the fleet"), (4, "More cars than the 2 in the fleet")],
+                             report.violations)
+        self.assertEqual((text_report.score, text_report.cars, text_report.rides),
+                         (binary_report.score, binary_report.cars, binary_report.rides))
+
+    def test_malformed_binary_solutions_are_rejected(self):
+        header, rides = load_instance("files/a_example.in")
+        malformed = {
+            # 5 cars but a single offset.
+            "a_example_short.npy": ([5, 0], None),
+            "a_example_backwards.npy": ([2, 0, 3, 1, 0, 1, 2], ([0, 1, 2], [0, 3, 1])),
+            "a_example_past_the_end.npy": ([2, 0, 5, 6, 0], ([0], [0, 5, 6])),
+            "a_example_not_from_zero.npy": ([1, 1, 2, 0, 1], ([0, 1], [1, 2])),
+        }
+        for name, (solution, arrays) in malformed.items():
+            np.save(self.path(name), np.array(solution, dtype=np.int32))
+            with self.assertRaises(ValueError):
+                read_solution(self.path(name))
+            if arrays is not None:
+                ride_indexes, offsets = (np.array(array, dtype=np.int64) for array in arrays)
+                report = StreamingScoreSubmissionComputer.from_instance(header, rides).compute_arrays(
+                    ride_indexes, offsets)
+                self.assertEqual((0, False), (report.score, report.is_valid()))
+                self.assertEqual(0, report.violations[0][0])
+                with self.assertRaises(ValueError):
+                    VectorizedScoreSubmissionComputer.from_instance(header, rides).compute_arrays(
+                        ride_indexes, offsets)
+
+        results = score_submissions([self.path(name) for name in sorted(malformed)],
+                                    {"a_example": "files/a_example.in"}, processes=1)
+        self.assertEqual([(0, False, 1)] * len(malformed),
+                         [(result["score"], result["valid"], result["violations"]) for result in results])
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)
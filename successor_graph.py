@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Credits: TheSpace team from Melpignano
+
+import numpy as np
+
+
+class SuccessorGraph:
+    """Which rides a car can do right after each ride, as CSR arrays.
+
+    A car that starts ride i at its earliest start is free at end_i =
+    earliest_start_i + length_i. Ride j can follow ride i when such a car,
+    driving empty from the end of i, still scores j: end_i + deadhead(i, j)
+    + length_j < latest_finish_j (the ScoreSubmissionComputer rule) and
+    j is over by T. The successors of i are the k of them that waste the
+    fewest steps driving empty or waiting, sorted by that waste and then by
+    ride index:
+
+        successors[indptr[i]:indptr[i + 1]]  the rides j
+        deadhead[...]  distance from the end of i to the start of j
+        bonus[...]     whether the car is at j by its earliest start
+        waste[...]     max(end_i + deadhead, earliest_start_j) - end_i
+
+    Rows are built in chunks so that no pass holds more than max_cells
+    pairs. Rides are visited by end_i and candidates by latest_finish, so
+    each chunk only looks at the rides that can still be scored after its
+    earliest end. With a horizon, rides whose earliest start is more than
+    horizon steps after end_i are ignored as well.
+    """
+
+    def __init__(self, header, rides, k=16, max_cells=1 << 22, horizon=None):
+        R, C, F, N, self.B, self.T = header
+        rides = np.asarray(rides, dtype=np.int64).reshape(-1, 6)
+        start_r, start_c, end_r, end_c, earliest_start, latest_finish = rides.T
+        length = np.abs(start_r - end_r) + np.abs(start_c - end_c)
+        end = earliest_start + length
+        self.N = len(rides)
+        self.k = k
+
+        by_latest_finish = np.argsort(latest_finish, kind="stable")
+        sorted_latest_finish = latest_finish[by_latest_finish]
+        by_end = np.argsort(end, kind="stable")
+
+        chunk_sources, chunk_successors, chunk_deadhead, chunk_waste = [], [], [], []
+        rows_per_chunk = max(1, max_cells // max(1, self.N))
+        for chunk_start in range(0, self.N, rows_per_chunk):
+            rows = by_end[chunk_start:chunk_start + rows_per_chunk]
+            columns = by_latest_finish[np.searchsorted(sorted_latest_finish, end[rows[0]], side="right"):]
+            if horizon is not None:
+                columns = columns[earliest_start[columns] <= end[rows[-1]] + horizon]
+            if len(columns) == 0:
+                continue
+
+            deadhead = np.abs(end_r[rows][:, None] - start_r[columns]) + \
+                np.abs(end_c[rows][:, None] - start_c[columns])
+            arrival = end[rows][:, None] + deadhead
+            start = np.maximum(arrival, earliest_start[columns])
+            feasible = (arrival + length[columns] < latest_finish[columns]) & \
+                (start + length[columns] <= self.T) & (columns != rows[:, None])
+            if horizon is not None:
+                feasible &= earliest_start[columns] <= end[rows][:, None] + horizon
+            waste = start - end[rows][:, None]
+
+            # The k least wasteful, ordered by waste then ride index.
+            keys = np.where(feasible, waste * self.N + columns, np.iinfo(np.int64).max)
+            if len(columns) > k:
+                best = np.argpartition(keys, k - 1, axis=1)[:, :k]
+            else:
+                best = np.broadcast_to(np.arange(len(columns)), keys.shape)
+            best = np.take_along_axis(best, np.argsort(np.take_along_axis(keys, best, axis=1), axis=1), axis=1)
+            kept = np.take_along_axis(feasible, best, axis=1)
+            best_waste = np.take_along_axis(waste, best, axis=1)
+
+            chunk_sources.append(np.repeat(rows, kept.sum(axis=1)))
+            chunk_successors.append(columns[best][kept])
+            chunk_deadhead.append(np.take_along_axis(deadhead, best, axis=1)[kept])
+            chunk_waste.append(best_waste[kept])
+
+        sources = np.concatenate(chunk_sources + [np.zeros(0, dtype=np.int64)])
+        order = np.argsort(sources, kind="stable")
+        sources = sources[order]
+        self.successors = np.concatenate(chunk_successors + [np.zeros(0, dtype=np.int64)])[order]
+        self.deadhead = np.concatenate(chunk_deadhead + [np.zeros(0, dtype=np.int64)])[order]
+        self.waste = np.concatenate(chunk_waste + [np.zeros(0, dtype=np.int64)])[order]
+        self.bonus = end[sources] + self.deadhead <= earliest_start[self.successors]
+        self.indptr = np.zeros(self.N + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=self.N), out=self.indptr[1:])
+
+    def __len__(self):
+        return len(self.successors)
+
+    def successors_of(self, ride):
+        """Returns the (successors, deadhead, bonus, waste) arrays of a ride."""
+        edges = slice(self.indptr[ride], self.indptr[ride + 1])
+        return self.successors[edges], self.deadhead[edges], self.bonus[edges], self.waste[edges]
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import sys
+import unittest
+
+import numpy as np
+
+from instance_loader import load_instance
+from successor_graph import SuccessorGraph
+
+
+def brute_force_successors(header, rides, ride, k):
+    T = header[5]
+    a, b, x, y, s, f = rides[ride]
+    end = s + abs(a - x) + abs(b - y)
+    candidates = []
+    for other, (other_a, other_b, other_x, other_y, other_s, other_f) in enumerate(rides.tolist()):
+        length = abs(other_a - other_x) + abs(other_b - other_y)
+        deadhead = abs(x - other_a) + abs(y - other_b)
+        start = max(end + deadhead, other_s)
+        if other != ride and end + deadhead + length < other_f and start + length <= T:
+            candidates.append((start - end, other, deadhead, end + deadhead <= other_s))
+    return sorted(candidates)[:k]
+
+
+class TestSuccessorGraph(unittest.TestCase):
+    def test_matches_brute_force(self):
+        header, rides = load_instance("files/b_should_be_easy.in")
+        graph = SuccessorGraph(header, rides, k=6, max_cells=1000)
+        for ride in range(0, header[3], 7):
+            successors, deadhead, bonus, waste = graph.successors_of(ride)
+            expected = brute_force_successors(header, rides, ride, 6)
+            self.assertEqual(expected, list(zip(waste.tolist(), successors.tolist(), deadhead.tolist(),
+                                                bonus.tolist())))
+
+    def test_chunks_and_horizon(self):
+        header, rides = load_instance("files/c_no_hurry.in")
+        rides = rides[:1500]
+        graph = SuccessorGraph(header, rides, k=4)
+        chunked = SuccessorGraph(header, rides, k=4, max_cells=5000)
+        for name in ("indptr", "successors", "deadhead", "bonus", "waste"):
+            self.assertTrue((getattr(graph, name) == getattr(chunked, name)).all())
+
+        near = SuccessorGraph(header, rides, k=4, horizon=100)
+        sources = np.repeat(np.arange(len(rides)), np.diff(near.indptr))
+        ends = rides[:, 4] + np.abs(rides[:, 0] - rides[:, 2]) + np.abs(rides[:, 1] - rides[:, 3])
+        self.assertTrue((rides[near.successors, 4] <= ends[sources] + 100).all())
+        self.assertGreater(len(near), 0)
+
+
+def main(argv):
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main(sys.argv)